@@ -0,0 +1,371 @@
+import itertools
+import numpy as np
+from aplications.models import EvaluatorAccess, EvaluatorHeuristicResponse, Heuristic, Subprinciple, User
+
+# Puntaje máximo de un subprincipio (escala de 1 a 10 del formulario del evaluador, como en 'exportPDF.js')
+MAX_SUBPRINCIPLE_SCORE = 10
+
+# Niveles de severidad según el porcentaje de incumplimiento (mismos umbrales que 'getSeverityRecommendation.2.js')
+SEVERITY_LEVELS = (
+    ("Baja", "No es un problema de usabilidad."),
+    ("Baja-Media", "Problema 'Cosmético'; no necesita ser resuelto a menos que se disponga de tiempo extra en el proyecto."),
+    ("Media", "Problema de usabilidad menor: arreglarlo tiene baja prioridad."),
+    ("Alta", "Problema de usabilidad mayor: es importante arreglarlo."),
+    ("Crítica", "Catástrofe de usabilidad: es imprescindible arreglarlo."),
+)
+
+# Umbral del puntaje z modificado para marcar a un evaluador como atípico (Iglewicz y Hoaglin)
+OUTLIER_Z_SCORE = 3.5
+
+# Interpretación del alfa de Krippendorff (Krippendorff, 2004)
+AGREEMENT_LEVELS = ((0.8, "Alto"), (0.667, "Aceptable"), (float('-inf'), "Bajo"))
+
+
+# Matriz de puntajes evaluador × (pregunta, subprincipio) de una prueba de diseño con heurísticas
+class ScoreMatrix:
+    """
+    Puntajes completos de una prueba de diseño en forma de matriz de NumPy.
+
+    Atributos:
+        evaluator_ids (ndarray): ID del evaluador de cada fila.
+        question_ids (ndarray): ID de la pregunta de cada columna.
+        subprinciple_ids (ndarray): ID del subprincipio de cada columna.
+        heuristic_ids (ndarray): ID de la heurística de cada columna.
+        scores (ndarray): Matriz de puntajes (float); NaN donde el evaluador no respondió.
+    """
+
+    def __init__(self, evaluator_ids, question_ids, subprinciple_ids, heuristic_ids, scores):
+        self.evaluator_ids = evaluator_ids
+        self.question_ids = question_ids
+        self.subprinciple_ids = subprinciple_ids
+        self.heuristic_ids = heuristic_ids
+        self.scores = scores
+
+
+# Función para cargar la matriz de puntajes de una prueba de diseño
+def load_score_matrix(test_id):
+    """
+    Carga con una sola consulta las respuestas completas de los evaluadores que finalizaron la prueba
+    (acceso bloqueado) y las coloca en una matriz evaluador × (pregunta, subprincipio). La heurística de cada
+    columna se obtiene con una segunda consulta sobre los subprincipios respondidos.
+
+    Returns:
+        ScoreMatrix | None: La matriz, o None si no hay respuestas completas.
+    """
+    finalized = EvaluatorAccess.objects.filter(test_id=test_id, acceso_bloqueado=True).values('evaluator_id')
+    rows = list(
+        EvaluatorHeuristicResponse.objects
+        .filter(test_id=test_id, is_complete=True, evaluator_id__in=finalized)
+        .values_list('evaluator_id', 'question_id', 'subprinciple_id', 'score')
+    )
+    if not rows:
+        return None
+    data = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 4).reshape(-1, 4)
+
+    # Índices de fila y columna; la columna (pregunta, subprincipio) se codifica en un solo entero,
+    # porque 'np.unique' sobre un eje es mucho más lento que sobre un vector
+    evaluator_ids, row_index = np.unique(data[:, 0], return_inverse=True)
+    width = int(data[:, 2].max()) + 1
+    column_keys, column_index = np.unique(data[:, 1] * width + data[:, 2], return_inverse=True)
+    question_ids, subprinciple_ids = np.divmod(column_keys, width)
+
+    # Heurística de cada subprincipio con una consulta sobre los subprincipios de la prueba, sin unir cada respuesta
+    heuristic_by_subprinciple = dict(Subprinciple.objects.filter(id__in=np.unique(subprinciple_ids).tolist()).values_list('id', 'heuristic_id'))
+    heuristic_ids = np.array([heuristic_by_subprinciple[subprinciple_id] for subprinciple_id in subprinciple_ids.tolist()], dtype=np.int64)
+
+    scores = np.full((len(evaluator_ids), len(column_keys)), np.nan)
+    scores[row_index.reshape(-1), column_index.reshape(-1)] = data[:, 3]
+    return ScoreMatrix(evaluator_ids, question_ids, subprinciple_ids, heuristic_ids, scores)
+
+
+# Función para clasificar porcentajes de incumplimiento en niveles de severidad
+def severity_index(non_compliance):
+    """
+    Devuelve, para cada porcentaje de incumplimiento, el índice de su nivel en SEVERITY_LEVELS:
+    < 1 Baja, <= 10 Baja-Media, <= 50 Media, <= 90 Alta y el resto Crítica.
+    """
+    non_compliance = np.asarray(non_compliance)
+    return np.select(
+        [non_compliance < 1, non_compliance <= 10, non_compliance <= 50, non_compliance <= 90],
+        [0, 1, 2, 3],
+        default=4
+    )
+
+
+# Función para calcular las estadísticas de grupos de columnas de la matriz
+def _grouped_stats(column_counts, column_sums, column_squares, groups, n_groups):
+    """
+    Suma por grupo los conteos, sumas y sumas de cuadrados de cada columna y calcula, de forma vectorizada,
+    el promedio, la desviación estándar poblacional y los porcentajes de cumplimiento e incumplimiento.
+    """
+    counts = np.bincount(groups, weights=column_counts, minlength=n_groups)
+    sums = np.bincount(groups, weights=column_sums, minlength=n_groups)
+    squares = np.bincount(groups, weights=column_squares, minlength=n_groups)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums / counts
+        std = np.sqrt(np.maximum(squares / counts - mean ** 2, 0))
+        compliance = sums / (counts * MAX_SUBPRINCIPLE_SCORE) * 100
+    non_compliance = 100 - compliance
+    return {
+        "responses": counts.astype(np.int64),
+        "mean": mean,
+        "std": std,
+        "compliance": compliance,
+        "non_compliance": non_compliance,
+        "severity": severity_index(non_compliance),
+    }
+
+
+# Función para convertir la fila 'index' de unas estadísticas agrupadas en un diccionario JSON
+def _stats_item(stats, index):
+    severity, description = SEVERITY_LEVELS[int(stats["severity"][index])]
+    return {
+        "responses": int(stats["responses"][index]),
+        "mean": round(float(stats["mean"][index]), 4),
+        "std": round(float(stats["std"][index]), 4),
+        "compliance": round(float(stats["compliance"][index]), 2),
+        "non_compliance": round(float(stats["non_compliance"][index]), 2),
+        "severity": severity,
+        "severity_description": description,
+    }
+
+
+# Función para construir las estadísticas de cumplimiento y severidad de una prueba de diseño con heurísticas
+def build_heuristic_analytics(design_test, questions, matrix):
+    """
+    Calcula sobre la matriz de puntajes, sin bucles por respuesta:
+
+    - El cumplimiento de cada heurística, de cada pregunta y de cada heurística dentro de cada pregunta:
+      suma de puntajes / (respuestas × MAX_SUBPRINCIPLE_SCORE) × 100.
+    - El promedio y la desviación estándar de los puntajes de cada grupo.
+    - El nivel de severidad según el porcentaje de incumplimiento (100 - cumplimiento).
+    - El cumplimiento de cada evaluador, con su promedio y desviación estándar entre evaluadores.
+
+    Args:
+        design_test (DesignTest): Prueba de diseño.
+        questions (list[DesignQuestion]): Preguntas de la prueba, en el orden en que se devuelven.
+        matrix (ScoreMatrix): Matriz de puntajes de la prueba (ver 'load_score_matrix').
+
+    Returns:
+        dict: Estadísticas globales, por heurística, por pregunta y por evaluador.
+    """
+    scores = matrix.scores
+    answered = ~np.isnan(scores)
+    column_counts = answered.sum(axis=0)
+    column_sums = np.nansum(scores, axis=0)
+    column_squares = np.nansum(scores ** 2, axis=0)
+
+    # Grupos de columnas: toda la prueba, heurística, pregunta y pregunta × heurística
+    overall = _grouped_stats(column_counts, column_sums, column_squares, np.zeros(scores.shape[1], dtype=np.int64), 1)
+    heuristic_keys, heuristic_groups = np.unique(matrix.heuristic_ids, return_inverse=True)
+    by_heuristic = _grouped_stats(column_counts, column_sums, column_squares, heuristic_groups.reshape(-1), len(heuristic_keys))
+    question_keys, question_groups = np.unique(matrix.question_ids, return_inverse=True)
+    by_question = _grouped_stats(column_counts, column_sums, column_squares, question_groups.reshape(-1), len(question_keys))
+    pair_keys, pair_groups = np.unique(np.stack([matrix.question_ids, matrix.heuristic_ids], axis=1), axis=0, return_inverse=True)
+    by_pair = _grouped_stats(column_counts, column_sums, column_squares, pair_groups.reshape(-1), len(pair_keys))
+
+    # Cumplimiento de cada evaluador (filas de la matriz)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        evaluator_compliance = np.nansum(scores, axis=1) / (answered.sum(axis=1) * MAX_SUBPRINCIPLE_SCORE) * 100
+
+    heuristics = {heuristic.id: heuristic for heuristic in Heuristic.objects.filter(id__in=heuristic_keys.tolist())}
+    heuristic_position = {heuristic_id: index for index, heuristic_id in enumerate(heuristic_keys.tolist())}
+    question_position = {question_id: index for index, question_id in enumerate(question_keys.tolist())}
+    pairs_by_question = {}
+    for index, (question_id, heuristic_id) in enumerate(pair_keys.tolist()):
+        pairs_by_question.setdefault(question_id, []).append((heuristic_id, index))
+
+    response_data = {
+        "test_id": design_test.test_id,
+        "name": design_test.name,
+        "evaluators": len(matrix.evaluator_ids),
+        "max_score": MAX_SUBPRINCIPLE_SCORE,
+        "overall": _stats_item(overall, 0),
+        "heuristics": [],
+        "questions": [],
+        "evaluator_compliance": {
+            "mean": round(float(np.nanmean(evaluator_compliance)), 2),
+            "std": round(float(np.nanstd(evaluator_compliance)), 2),
+            "by_evaluator": [
+                {"evaluator_id": evaluator_id, "compliance": round(compliance, 2)}
+                for evaluator_id, compliance in zip(matrix.evaluator_ids.tolist(), evaluator_compliance.tolist())
+            ],
+        },
+    }
+
+    for heuristic_id, index in sorted(heuristic_position.items(), key=lambda item: heuristics[item[0]].code):
+        heuristic = heuristics[heuristic_id]
+        heuristic_data = {"heuristic_code": heuristic.code, "heuristic_title": heuristic.title}
+        heuristic_data.update(_stats_item(by_heuristic, index))
+        response_data["heuristics"].append(heuristic_data)
+
+    for question in questions:
+        index = question_position.get(question.question_id)
+        if index is None:
+            continue  # Pregunta sin respuestas completas
+
+        question_data = {"question_id": question.question_id, "title": question.title}
+        question_data.update(_stats_item(by_question, index))
+        question_data["heuristics"] = []
+        for heuristic_id, pair_index in sorted(pairs_by_question[question.question_id], key=lambda item: heuristics[item[0]].code):
+            pair_data = {"heuristic_code": heuristics[heuristic_id].code, "heuristic_title": heuristics[heuristic_id].title}
+            pair_data.update(_stats_item(by_pair, pair_index))
+            question_data["heuristics"].append(pair_data)
+        response_data["questions"].append(question_data)
+
+    return response_data
+
+
+# Función para calcular el acuerdo entre evaluadores de grupos de columnas de la matriz
+def _grouped_agreement(matrix, groups, n_groups):
+    """
+    Calcula por grupo de columnas (unidades = pares pregunta × subprincipio), de forma vectorizada:
+
+    - Alfa de Krippendorff con métrica de intervalo, que admite evaluadores que no respondieron alguna unidad:
+      1 - D_o / D_e, con el desacuerdo observado dentro de cada unidad y el esperado entre todos los valores.
+    - Kappa de Fleiss generalizado a un número variable de evaluadores por unidad, tomando cada puntaje como categoría.
+
+    Solo cuentan las unidades con al menos dos respuestas. Si un grupo no tiene variación (D_e = 0) o no tiene
+    unidades evaluables, el coeficiente es NaN.
+    """
+    scores = matrix.scores
+    answered = ~np.isnan(scores)
+    counts = answered.sum(axis=0).astype(np.float64)
+    sums = np.nansum(scores, axis=0)
+    squares = np.nansum(scores ** 2, axis=0)
+    pairable = counts >= 2
+
+    # Frecuencia de cada puntaje (categoría) por columna
+    rows, columns = np.nonzero(answered)
+    categories, category_index = np.unique(scores[rows, columns], return_inverse=True)
+    n_categories = len(categories)
+    frequencies = np.bincount(columns * n_categories + category_index.reshape(-1), minlength=scores.shape[1] * n_categories)
+    frequencies = frequencies.reshape(scores.shape[1], n_categories).astype(np.float64)
+
+    weights = pairable.astype(np.float64)
+    units = np.bincount(groups, weights=weights, minlength=n_groups)
+    values = np.bincount(groups, weights=counts * weights, minlength=n_groups)
+    group_sums = np.bincount(groups, weights=sums * weights, minlength=n_groups)
+    group_squares = np.bincount(groups, weights=squares * weights, minlength=n_groups)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Alfa de Krippendorff (intervalo): sum_{i != j} (x_i - x_j)^2 = 2 (m * sum x^2 - (sum x)^2)
+        unit_disagreement = np.where(pairable, 2 * (counts * squares - sums ** 2) / (counts - 1), 0)
+        observed = np.bincount(groups, weights=unit_disagreement, minlength=n_groups) / values
+        expected = 2 * (values * group_squares - group_sums ** 2) / (values * (values - 1))
+        alpha = np.where(expected > 0, 1 - observed / expected, np.nan)
+
+        # Kappa de Fleiss: acuerdo observado por unidad frente al acuerdo esperado por las proporciones de cada categoría
+        unit_agreement = np.where(pairable, ((frequencies ** 2).sum(axis=1) - counts) / (counts * (counts - 1)), 0)
+        observed_agreement = np.bincount(groups, weights=unit_agreement, minlength=n_groups) / units
+        category_totals = np.zeros((n_groups, n_categories))
+        np.add.at(category_totals, groups, frequencies * weights[:, None])
+        expected_agreement = ((category_totals / category_totals.sum(axis=1, keepdims=True)) ** 2).sum(axis=1)
+        kappa = np.where(expected_agreement < 1, (observed_agreement - expected_agreement) / (1 - expected_agreement), np.nan)
+
+    return {"units": units.astype(np.int64), "alpha": alpha, "fleiss_kappa": kappa}
+
+
+# Función para detectar evaluadores cuyos puntajes se alejan del consenso
+def _outlier_evaluators(matrix):
+    """
+    Para cada evaluador calcula la desviación absoluta media entre sus puntajes y el promedio de los demás
+    evaluadores en las mismas unidades (promedio "dejando uno fuera"), y la compara con la del resto mediante
+    el puntaje z modificado (mediana y MAD). Se marca como atípico si supera OUTLIER_Z_SCORE.
+    """
+    scores = matrix.scores
+    answered = ~np.isnan(scores)
+    counts = answered.sum(axis=0)
+    sums = np.nansum(scores, axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        others_mean = (sums[None, :] - scores) / (counts[None, :] - 1)
+        comparable = answered & (counts[None, :] >= 2)
+        deviation = np.where(comparable, np.abs(scores - others_mean), 0).sum(axis=1) / comparable.sum(axis=1)
+
+    # Sin unidades comparables (por ejemplo, con un solo evaluador) la desviación y el puntaje z son NaN
+    valid = deviation[~np.isnan(deviation)]
+    z_score = np.full_like(deviation, np.nan)
+    if valid.size:
+        median = np.median(valid)
+        mad = np.median(np.abs(valid - median))
+        z_score = 0.6745 * (deviation - median) / mad if mad > 0 else np.where(np.isnan(deviation), np.nan, 0.0)
+    return deviation, z_score
+
+
+# Función para convertir un coeficiente de acuerdo en un valor JSON
+def _agreement_item(agreement, index):
+    alpha = float(agreement["alpha"][index])
+    kappa = float(agreement["fleiss_kappa"][index])
+    return {
+        "units": int(agreement["units"][index]),
+        "alpha": None if np.isnan(alpha) else round(alpha, 4),
+        "fleiss_kappa": None if np.isnan(kappa) else round(kappa, 4),
+        "agreement": None if np.isnan(alpha) else next(label for limit, label in AGREEMENT_LEVELS if alpha >= limit),
+    }
+
+
+# Función para calcular el acuerdo entre evaluadores de una prueba de diseño con heurísticas
+def build_agreement(design_test, questions, matrix):
+    """
+    Calcula el acuerdo entre evaluadores (alfa de Krippendorff y kappa de Fleiss) de la prueba completa, de cada
+    heurística y de cada pregunta, y detecta a los evaluadores atípicos, todo sobre la matriz de puntajes.
+
+    Args:
+        design_test (DesignTest): Prueba de diseño.
+        questions (list[DesignQuestion]): Preguntas de la prueba, en el orden en que se devuelven.
+        matrix (ScoreMatrix): Matriz de puntajes de la prueba (ver 'load_score_matrix').
+
+    Returns:
+        dict: Coeficientes de acuerdo y evaluadores atípicos.
+    """
+    n_columns = matrix.scores.shape[1]
+    overall = _grouped_agreement(matrix, np.zeros(n_columns, dtype=np.int64), 1)
+    heuristic_keys, heuristic_groups = np.unique(matrix.heuristic_ids, return_inverse=True)
+    by_heuristic = _grouped_agreement(matrix, heuristic_groups.reshape(-1), len(heuristic_keys))
+    question_keys, question_groups = np.unique(matrix.question_ids, return_inverse=True)
+    by_question = _grouped_agreement(matrix, question_groups.reshape(-1), len(question_keys))
+    deviation, z_score = _outlier_evaluators(matrix)
+
+    heuristics = {heuristic.id: heuristic for heuristic in Heuristic.objects.filter(id__in=heuristic_keys.tolist())}
+    usernames = dict(User.objects.filter(id__in=matrix.evaluator_ids.tolist()).values_list('id', 'username'))
+
+    response_data = {
+        "test_id": design_test.test_id,
+        "name": design_test.name,
+        "evaluators": len(matrix.evaluator_ids),
+        "overall": _agreement_item(overall, 0),
+        "heuristics": [],
+        "questions": [],
+        "outlier_threshold": OUTLIER_Z_SCORE,
+        "evaluator_deviation": [],
+    }
+
+    for index, heuristic_id in sorted(enumerate(heuristic_keys.tolist()), key=lambda item: heuristics[item[1]].code):
+        heuristic_data = {"heuristic_code": heuristics[heuristic_id].code, "heuristic_title": heuristics[heuristic_id].title}
+        heuristic_data.update(_agreement_item(by_heuristic, index))
+        response_data["heuristics"].append(heuristic_data)
+
+    question_position = {question_id: index for index, question_id in enumerate(question_keys.tolist())}
+    for question in questions:
+        index = question_position.get(question.question_id)
+        if index is None:
+            continue  # Pregunta sin respuestas completas
+        question_data = {"question_id": question.question_id, "title": question.title}
+        question_data.update(_agreement_item(by_question, index))
+        response_data["questions"].append(question_data)
+
+    # Evaluadores ordenados de mayor a menor desviación
+    for index in np.argsort(-np.nan_to_num(z_score, nan=-np.inf), kind='stable').tolist():
+        evaluator_id = int(matrix.evaluator_ids[index])
+        response_data["evaluator_deviation"].append({
+            "evaluator_id": evaluator_id,
+            "username": usernames.get(evaluator_id),
+            "mean_absolute_deviation": None if np.isnan(deviation[index]) else round(float(deviation[index]), 4),
+            "z_score": None if np.isnan(z_score[index]) else round(float(z_score[index]), 4),
+            "outlier": bool(z_score[index] > OUTLIER_Z_SCORE),
+        })
+
+    return response_data
+
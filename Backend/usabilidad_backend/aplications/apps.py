@@ -1,4 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+# Función para sincronizar el catálogo de heurísticas después de aplicar las migraciones
+def sincronizar_catalogo(sender, plan=None, **kwargs):
+    if any(backwards for _, backwards in plan or []):
+        return  # Migraciones revertidas: las tablas del catálogo pueden no existir o no coincidir con los modelos
+    from .initial_data import cargar_datos_heuristicos
+    cargar_datos_heuristicos()
+
 
 class AplicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -7,13 +20,34 @@ class AplicationsConfig(AppConfig):
     def ready(self):
         """
         Este método se ejecuta cuando la aplicación está lista.
-        
-        - Importa y ejecuta la función 'cargar_datos_heuristicos', que carga las heurísticas y subprincipios en la base de datos.
-        - Esto asegura que, cada vez que la aplicación se inicia, los datos heurísticos estén disponibles y sincronizados en la base de datos.
-        
-        El método 'ready' se llama cuando la configuración de la aplicación está completa y es un buen lugar para realizar
-        inicializaciones adicionales, como cargar datos iniciales, señales, etc.
+
+        - Registra la sincronización del catálogo de heurísticas después de 'migrate', de modo que una base de datos
+          nueva queda con las heurísticas y subprincipios cargados. Al revertir migraciones no se sincroniza.
+        - Si HEURISTICS_SYNC_ON_STARTUP está activo, comprueba la huella del catálogo al iniciar. Cuando no ha
+          cambiado cuesta una sola consulta; si las tablas aún no existen se omite (lo hará 'migrate').
+        - Conecta la invalidación de la caché de resultados ('result_cache') a los cambios de las pruebas,
+          preguntas, accesos (al finalizar o desbloquear) y evaluadores.
+        - Aplica SQLITE_PRAGMAS (WAL, busy_timeout, etc.) a cada conexión SQLite nueva ('sqlite_tuning').
+
+        La sincronización también puede ejecutarse a mano con 'python manage.py sync_heuristics'.
         """
-        # Importar y cargar los datos iniciales de heurísticas
-        from .initial_data import cargar_datos_heuristicos
-        cargar_datos_heuristicos()  # Llamada a la función que carga los datos heurísticos en la base de datos
+        post_migrate.connect(sincronizar_catalogo, sender=self)
+
+        from .sqlite_tuning import configure_connection
+        connection_created.connect(configure_connection)
+
+        from . import result_cache
+        from .models import DesignQuestion, DesignTest, EvaluatorAccess, User
+        post_save.connect(result_cache.invalidate_design_test, sender=DesignTest)
+        post_save.connect(result_cache.invalidate_question, sender=DesignQuestion)
+        post_delete.connect(result_cache.invalidate_question, sender=DesignQuestion)
+        post_save.connect(result_cache.invalidate_access, sender=EvaluatorAccess)
+        post_delete.connect(result_cache.invalidate_access, sender=EvaluatorAccess)
+        post_save.connect(result_cache.invalidate_user, sender=User)
+
+        if getattr(settings, 'HEURISTICS_SYNC_ON_STARTUP', True):
+            from .initial_data import cargar_datos_heuristicos
+            try:
+                cargar_datos_heuristicos()  # Sincroniza el catálogo solo si su contenido cambió
+            except DatabaseError:
+                pass  # Base de datos sin migrar
@@ -0,0 +1,166 @@
+import atexit
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+
+# Sesión de navegador administrada por el pool
+class BrowserSession:
+    """
+    Envuelve un WebDriver de Chrome y lleva la cuenta de cuántas capturas ha realizado.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+
+    def is_healthy(self):
+        """
+        Comprueba que el navegador sigue respondiendo ejecutando un script trivial.
+        """
+        try:
+            return self.driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def reset(self):
+        """
+        Deja el navegador en un estado limpio para el siguiente préstamo.
+        """
+        self.driver.switch_to.default_content()
+        self.driver.get('about:blank')
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            logger.exception("Error cerrando el navegador")
+
+
+# Pool acotado de navegadores sin interfaz gráfica reutilizables entre solicitudes
+class BrowserPool:
+    """
+    Mantiene como máximo 'size' sesiones de Chrome abiertas para que las capturas no paguen el arranque del navegador.
+
+    - Las sesiones se crean bajo demanda y, una vez devueltas, quedan disponibles para la siguiente solicitud.
+    - Antes de prestar una sesión se verifica que sigue viva; si no, se reemplaza.
+    - Cada sesión se recicla (se cierra y se vuelve a crear) después de 'max_uses' capturas.
+    - Si se alcanzan 'size' sesiones ocupadas, las solicitudes esperan como máximo 'timeout' segundos.
+    """
+
+    def __init__(self, size, max_uses, timeout):
+        self.size = size
+        self.max_uses = max_uses
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()  # Se reutiliza primero la sesión más reciente (la más "caliente")
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._driver_path = None
+
+    def _chromedriver_path(self):
+        """
+        Resuelve la ruta de chromedriver una sola vez por proceso.
+        """
+        with self._lock:
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            return self._driver_path
+
+    def _create_session(self):
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')  # Ejecutar en modo sin interfaz gráfica
+        chrome_options.add_argument('--no-sandbox')  # Para servidores
+        chrome_options.add_argument('--disable-dev-shm-usage')  # Optimización en entornos con poca memoria
+        chrome_options.add_argument('--disable-gpu')  # Evitar el uso de la GPU
+
+        service = ChromeService(executable_path=self._chromedriver_path())
+        return BrowserSession(webdriver.Chrome(service=service, options=chrome_options))
+
+    def _acquire(self):
+        # Reutilizar una sesión ociosa y sana; descartar las que ya no responden
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                return self._create_session()
+            if session.is_healthy():
+                return session
+            session.quit()
+
+    @contextmanager
+    def session(self):
+        """
+        Presta un WebDriver del pool durante el bloque 'with' y lo devuelve al terminar.
+
+        Si el bloque lanza una excepción, la sesión se descarta en lugar de devolverse al pool.
+
+        Raises:
+            TimeoutError: Si no hay ninguna sesión libre en 'timeout' segundos.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError('No hay navegadores disponibles para la captura.')
+
+        try:
+            session = self._acquire()
+            try:
+                yield session.driver
+            except BaseException:
+                session.quit()  # El navegador puede haber quedado en un estado inconsistente
+                raise
+            self._release(session)
+        finally:
+            self._slots.release()
+
+    def _release(self, session):
+        session.uses += 1
+        if session.uses >= self.max_uses:
+            session.quit()  # Reciclar el navegador después de N usos
+            return
+        try:
+            session.reset()
+        except Exception:
+            session.quit()
+            return
+        self._idle.put(session)
+
+    def close(self):
+        """
+        Cierra todas las sesiones ociosas del pool.
+        """
+        while True:
+            try:
+                self._idle.get_nowait().quit()
+            except queue.Empty:
+                return
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Función para obtener el pool de navegadores del proceso
+def get_browser_pool():
+    """
+    Devuelve el pool de navegadores compartido por el proceso, creándolo la primera vez.
+
+    El tamaño, el número de usos antes de reciclar y la espera máxima se configuran en settings con
+    SCREENSHOT_POOL_SIZE, SCREENSHOT_POOL_MAX_USES y SCREENSHOT_POOL_TIMEOUT.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                size=getattr(settings, 'SCREENSHOT_POOL_SIZE', 2),
+                max_uses=getattr(settings, 'SCREENSHOT_POOL_MAX_USES', 50),
+                timeout=getattr(settings, 'SCREENSHOT_POOL_TIMEOUT', 60),
+            )
+            atexit.register(_pool.close)
+        return _pool
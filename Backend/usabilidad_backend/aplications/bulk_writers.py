@@ -0,0 +1,288 @@
+from django.db import connections, router, transaction
+from aplications.models import EvaluatorHeuristicResponse, EvaluatorStandardResponse, DesignQuestion
+from aplications.heuristic_catalog import get_subprinciple_lookup
+from aplications import result_cache, result_summary
+from aplications.sqlite_tuning import lock_for_write
+
+# Función para normalizar un ID recibido en el JSON (el frontend puede enviarlo como texto)
+def _as_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+# Función para resolver varios códigos de subprincipio sin consultar la base de datos
+def get_subprinciples_by_code(codes):
+    """
+    Obtiene los subprincipios correspondientes a un conjunto de códigos desde la tabla de búsqueda del catálogo
+    (ver 'heuristic_catalog.get_subprinciple_lookup').
+
+    Si algún código no está en la tabla, esta se recarga una vez por si el catálogo se sincronizó desde otro proceso.
+
+    Args:
+        codes (iterable[str]): Códigos de subprincipio a resolver.
+
+    Returns:
+        dict: Diccionario código -> SubprincipleRef. Los códigos que no existen no aparecen en el diccionario.
+    """
+    codes = set(codes)
+    lookup = get_subprinciple_lookup()
+    if not codes.issubset(lookup):
+        lookup = get_subprinciple_lookup(reload=True)
+    return {code: lookup[code] for code in codes if code in lookup}
+
+
+# Función para elegir cómo escribir un upsert con 'INSERT ... ON CONFLICT DO UPDATE'
+def _native_upsert_mode(model):
+    """
+    Indica cómo se puede escribir el modelo con un upsert nativo de la base de datos:
+
+    - 'orm': el ORM lo admite ('bulk_create' con 'update_conflicts', Django 4.1 o superior).
+    - 'sql': el ORM no lo admite pero el motor sí (PostgreSQL, SQLite 3.24+); se escribe la sentencia a mano.
+    - None: no hay upsert nativo y se usa la ruta por diferencias.
+    """
+    connection = connections[router.db_for_write(model)]
+    if getattr(connection.features, 'supports_update_conflicts_with_target', False):
+        return 'orm'
+    if connection.vendor == 'postgresql':
+        return 'sql'
+    if connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 24, 0):
+        return 'sql'
+    return None
+
+
+# Función para escribir un upsert nativo en SQL cuando el ORM no lo admite
+def _upsert_sql(model, objs, key_fields, update_fields):
+    """
+    Escribe las instancias con 'INSERT ... ON CONFLICT (clave) DO UPDATE SET campo = EXCLUDED.campo', en lotes
+    del tamaño que admite el motor. La sintaxis es la misma en PostgreSQL y en SQLite.
+    """
+    connection = connections[router.db_for_write(model)]
+    meta = model._meta
+    quote = connection.ops.quote_name
+    fields = [field for field in meta.concrete_fields if not field.primary_key]
+    sql = 'INSERT INTO %s (%s) VALUES %%s ON CONFLICT (%s) DO UPDATE SET %s' % (
+        quote(meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(quote(meta.get_field(name).column) for name in key_fields),
+        ', '.join('%s = EXCLUDED.%s' % (quote(meta.get_field(name).column), quote(meta.get_field(name).column)) for name in update_fields),
+    )
+    row = '(%s)' % ', '.join(['%s'] * len(fields))
+    batch_size = max(1, connection.ops.bulk_batch_size(fields, objs))
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            params = [field.get_db_prep_save(field.pre_save(obj, True), connection) for obj in batch for field in fields]
+            cursor.execute(sql % ', '.join([row] * len(batch)), params)
+
+
+# Función genérica de upsert en bloque para las tablas de respuestas de evaluadores
+def _upsert_responses(model, objects, existing, key_fields, update_fields):
+    """
+    Inserta o actualiza un conjunto de respuestas dentro de una única transacción.
+
+    Si la base de datos lo admite se usa un upsert nativo sobre la restricción de unicidad del modelo (desde el
+    ORM o, en versiones de Django sin 'update_conflicts', en SQL); si no, se compara con las filas existentes (una sola consulta) y se aplican 'bulk_create' y
+    'bulk_update' solo sobre las filas nuevas o modificadas.
+
+    Args:
+        model (Model): Modelo de respuestas (EvaluatorHeuristicResponse o EvaluatorStandardResponse).
+        objects (dict): Diccionario clave natural -> instancia sin guardar con los valores deseados.
+        existing (QuerySet): Filas ya guardadas que pueden coincidir con alguna clave.
+        key_fields (list[str]): Campos de la restricción de unicidad, en el orden de la clave.
+        update_fields (list[str]): Campos que se sobrescriben cuando la fila ya existe.
+
+    Returns:
+        int: Número de filas escritas.
+    """
+    if not objects:
+        return 0
+
+    key_attnames = [model._meta.get_field(field).attname for field in key_fields]
+    update_attnames = [model._meta.get_field(field).attname for field in update_fields]
+
+    with transaction.atomic():
+        mode = _native_upsert_mode(model)
+        if mode == 'orm':
+            model.objects.bulk_create(
+                list(objects.values()), update_conflicts=True, unique_fields=key_fields, update_fields=update_fields
+            )
+            return len(objects)
+        if mode == 'sql':
+            _upsert_sql(model, list(objects.values()), key_fields, update_fields)
+            return len(objects)
+
+        # Diferenciar contra las respuestas ya guardadas con una sola consulta
+        current = {}
+        for row in existing:
+            current.setdefault(tuple(getattr(row, attname) for attname in key_attnames), []).append(row)
+
+        to_create = []
+        to_update = []
+        for key, obj in objects.items():
+            rows = current.get(key)
+            if not rows:
+                to_create.append(obj)
+                continue
+
+            for row in rows:
+                if all(getattr(row, attname) == getattr(obj, attname) for attname in update_attnames):
+                    continue  # Sin cambios, no hace falta escribir la fila
+                for attname in update_attnames:
+                    setattr(row, attname, getattr(obj, attname))
+                to_update.append(row)
+
+        if to_create:
+            model.objects.bulk_create(to_create)
+        if to_update:
+            model.objects.bulk_update(to_update, update_fields)
+
+    return len(to_create) + len(to_update)
+
+
+# Función para guardar en bloque las respuestas heurísticas de un evaluador
+def save_heuristic_responses(access, test_id, evaluator_id, rows, is_complete):
+    """
+    Guarda o actualiza las respuestas heurísticas de un evaluador con un número constante de sentencias.
+
+    Equivale a ejecutar 'update_or_create' por cada subprincipio, pero resuelve todas las filas de una vez
+    (ver '_upsert_responses') dentro de una única transacción.
+
+    En la misma transacción aplica al resumen de resultados ('ResultSummary') la diferencia entre las respuestas
+    completas anteriores y las nuevas (ver 'result_summary.apply_changes') y, si se sobrescriben respuestas que
+    ya estaban completas, invalida los resultados guardados de la prueba ('result_cache.bump').
+
+    Args:
+        access (EvaluatorAccess): Acceso del evaluador a la prueba de diseño.
+        test_id (int): ID de la prueba de diseño.
+        evaluator_id (int): ID del evaluador.
+        rows (iterable[tuple]): Tuplas (question_id, subprinciple_id, score, comment). Si un par
+            (question_id, subprinciple_id) se repite, prevalece el último valor.
+        is_complete (bool): Indica si las respuestas se guardan como finales.
+
+    Returns:
+        int: Número de respuestas escritas.
+    """
+    evaluator_id = _as_id(evaluator_id)
+    test_id = _as_id(test_id)
+
+    objects = {}
+    for question_id, subprinciple_id, score, comment in rows:
+        question_id = _as_id(question_id)
+        objects[(test_id, evaluator_id, question_id, subprinciple_id)] = EvaluatorHeuristicResponse(
+            evaluator_id=evaluator_id,
+            test_id=test_id,
+            question_id=question_id,
+            subprinciple_id=subprinciple_id,
+            score=score,
+            comment=comment,
+            is_complete=is_complete,
+            evaluator_access=access
+        )
+
+    existing = EvaluatorHeuristicResponse.objects.filter(
+        test_id=test_id, evaluator_id=evaluator_id, question_id__in={key[2] for key in objects}
+    )
+    with transaction.atomic():
+        lock_for_write(EvaluatorHeuristicResponse)  # En SQLite, esperar a otros guardados en lugar de fallar
+        # Contribuciones completas que se sobrescriben, para restarlas del resumen de resultados
+        previous = [
+            ((question_id, subprinciple_id), score)
+            for question_id, subprinciple_id, score in existing.filter(is_complete=True).values_list('question_id', 'subprinciple_id', 'score')
+            if (test_id, evaluator_id, question_id, subprinciple_id) in objects
+        ]
+        written = _upsert_responses(
+            EvaluatorHeuristicResponse, objects, existing,
+            key_fields=['test', 'evaluator', 'question', 'subprinciple'],
+            update_fields=['score', 'comment', 'is_complete', 'evaluator_access']
+        )
+        current = [((key[2], key[3]), obj.score) for key, obj in objects.items()] if is_complete else []
+        result_summary.apply_changes(test_id, previous, current)
+        if previous:
+            result_cache.bump([test_id])  # Cambiaron respuestas completas: los resultados guardados quedaron obsoletos
+    return written
+
+
+# Función para validar varias preguntas de una prueba de diseño en una sola consulta
+def get_test_questions(test_id, question_ids):
+    """
+    Obtiene las preguntas de una prueba de diseño cuyos IDs se reciben, con una única consulta 'IN'.
+
+    Args:
+        test_id (int): ID de la prueba de diseño.
+        question_ids (iterable): IDs de pregunta recibidos en la solicitud (enteros o texto).
+
+    Returns:
+        dict: Diccionario ID recibido -> DesignQuestion. Los IDs cuya pregunta no existe o no pertenece
+        a la prueba no aparecen en el diccionario.
+    """
+    question_ids = set(question_ids)
+    ids = {_as_id(question_id) for question_id in question_ids}
+    ids = {question_id for question_id in ids if isinstance(question_id, int)}
+    if not ids:
+        return {}
+
+    questions = {question.question_id: question for question in DesignQuestion.objects.filter(test_id=test_id, question_id__in=ids)}
+    return {question_id: questions[_as_id(question_id)] for question_id in question_ids if _as_id(question_id) in questions}
+
+
+# Función para guardar en bloque las respuestas estándar de un evaluador
+def save_standard_responses(access, test_id, evaluator_id, rows, is_complete):
+    """
+    Guarda o actualiza las respuestas estándar de un evaluador con un número constante de sentencias.
+
+    Equivale a ejecutar 'update_or_create' por cada pregunta respondida: las respuestas existentes de
+    (prueba, evaluador) se resuelven una sola vez y las altas y cambios se aplican en bloque dentro de una
+    única transacción (ver '_upsert_responses').
+
+    En la misma transacción aplica al resumen de resultados ('ResultSummary') la diferencia entre las respuestas
+    completas anteriores y las nuevas (ver 'result_summary.apply_changes') y, si se sobrescriben respuestas que
+    ya estaban completas, invalida los resultados guardados de la prueba ('result_cache.bump').
+
+    Args:
+        access (EvaluatorAccess): Acceso del evaluador a la prueba de diseño.
+        test_id (int): ID de la prueba de diseño.
+        evaluator_id (int): ID del evaluador.
+        rows (iterable[tuple]): Tuplas (question, response_value, comment), donde 'question' es la
+            DesignQuestion ya validada. Si una pregunta se repite, prevalece el último valor.
+        is_complete (bool): Indica si las respuestas se guardan como finales.
+
+    Returns:
+        int: Número de respuestas escritas.
+    """
+    evaluator_id = _as_id(evaluator_id)
+    test_id = _as_id(test_id)
+
+    objects = {}
+    for question, response_value, comment in rows:
+        objects[(test_id, evaluator_id, question.question_id)] = EvaluatorStandardResponse(
+            evaluator_id=evaluator_id,
+            test_id=test_id,
+            question_id=question.question_id,
+            response_type=question.response_type,
+            response_value=response_value,
+            comment=comment,
+            is_complete=is_complete,
+            evaluator_access=access
+        )
+
+    existing = EvaluatorStandardResponse.objects.filter(test_id=test_id, evaluator_id=evaluator_id)
+    with transaction.atomic():
+        lock_for_write(EvaluatorStandardResponse)  # En SQLite, esperar a otros guardados en lugar de fallar
+        # Contribuciones completas que se sobrescriben, para restarlas del resumen de resultados
+        previous = [
+            ((question_id, None), value)
+            for question_id, value in existing.filter(is_complete=True).values_list('question_id', 'response_value')
+            if (test_id, evaluator_id, question_id) in objects
+        ]
+        written = _upsert_responses(
+            EvaluatorStandardResponse, objects, existing,
+            key_fields=['test', 'evaluator', 'question'],
+            update_fields=['response_type', 'response_value', 'comment', 'is_complete', 'evaluator_access']
+        )
+        current = [((key[2], None), obj.response_value) for key, obj in objects.items()] if is_complete else []
+        result_summary.apply_changes(test_id, previous, current)
+        if previous:
+            result_cache.bump([test_id])  # Cambiaron respuestas completas: los resultados guardados quedaron obsoletos
+    return written
@@ -0,0 +1,176 @@
+import logging
+import os
+from contextlib import ExitStack
+from django.conf import settings
+from aplications.browser_pool import get_browser_pool
+from aplications.screenshot_waits import get_wait_strategy
+from aplications import screenshot_cache
+
+logger = logging.getLogger(__name__)
+
+
+FIGMA_REPORT_PARAMS = '&scaling=scale-down&content-scaling=fixed'  # Parámetros que añade el reporte a cada pantalla
+
+
+# Función para limpiar una URL de Figma igual que 'cleanFigmaUrl' del frontend (exportPDF.js)
+def clean_figma_url(url):
+    """
+    Quita 'embed.' del dominio y '&embed-host=share' de la consulta (la primera aparición de cada uno, como
+    'String.replace' en JavaScript), para capturar la misma página que el frontend.
+    """
+    return url.replace('embed.', '', 1).replace('&embed-host=share', '', 1)
+
+
+# Función para obtener la URL con la que el reporte captura la pantalla de una pregunta
+def report_frame_url(url_frame):
+    """
+    Devuelve la URL que el reporte PDF envía a 'capture/' para la pantalla de una pregunta, de modo que las
+    capturas por lotes y las individuales compartan la caché.
+    """
+    return clean_figma_url(clean_figma_url(url_frame) + FIGMA_REPORT_PARAMS)
+
+
+# Función para capturar la pantalla de una URL con un navegador del pool
+def capture_screenshot(url, output_path, wait_strategy=None, timeout=None, viewport=None):
+    """
+    Captura la pantalla de la URL proporcionada y la guarda en una ruta específica.
+
+    Parámetros:
+    - wait_strategy: Función de espera a usar (ver 'screenshot_waits'); por defecto la de settings.
+    - timeout: Segundos máximos de espera antes de capturar; por defecto SCREENSHOT_WAIT_TIMEOUT.
+    - viewport: Tamaño de la ventana (ancho, alto); por defecto SCREENSHOT_VIEWPORT.
+    """
+    wait_strategy = wait_strategy or get_wait_strategy()
+    timeout = timeout if timeout is not None else settings.SCREENSHOT_WAIT_TIMEOUT
+    viewport = viewport or settings.SCREENSHOT_VIEWPORT
+
+    try:
+        # Tomar prestado un navegador del pool en lugar de arrancar uno nuevo en cada solicitud
+        with get_browser_pool().session() as driver:
+            # Ajustar el tamaño de la ventana y acceder a la URL
+            driver.set_window_size(*viewport)
+            driver.get(url)
+
+            # Esperar a que el prototipo de Figma esté listo (el driver queda dentro del iframe si existe)
+            wait_strategy(driver, timeout)
+
+            # Tomar la captura
+            driver.save_screenshot(output_path)
+
+    except Exception:
+        logger.exception("Error capturando la pantalla de %s", url)
+
+
+# Función para obtener una captura desde la caché o generarla si no existe
+def get_or_capture(url, viewport, wait_strategy=None, timeout=None, refresh=False):
+    """
+    Devuelve la ruta de la captura de 'url', sirviéndola desde la caché si está vigente.
+
+    Parámetros:
+    - refresh: Si es verdadero, ignora la caché y vuelve a capturar.
+
+    Returns:
+        str | None: Ruta de la imagen, o None si la captura falló.
+    """
+    image_path = None if refresh else screenshot_cache.get_cached(url, viewport)
+    if image_path is not None:
+        return image_path
+
+    # Evitar que solicitudes simultáneas de la misma URL rendericen dos veces
+    with screenshot_cache.lock(url, viewport):
+        image_path = None if refresh else screenshot_cache.get_cached(url, viewport)
+        if image_path is not None:
+            return image_path
+
+        # Capturar en un archivo temporal propio de esta solicitud
+        output_path = screenshot_cache.temp_path()
+        capture_screenshot(url, output_path, wait_strategy, timeout, viewport)
+        return _store_output(url, viewport, output_path)
+
+
+# Función para guardar en la caché una captura recién generada (o descartarla si falló)
+def _store_output(url, viewport, output_path):
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        return screenshot_cache.store(url, viewport, output_path)
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    return None
+
+
+# Función para capturar varias URLs en una misma sesión del navegador, una pestaña por URL
+def _capture_tabs(urls, viewport, wait_strategy, timeout):
+    """
+    Abre las URLs en pestañas de un único navegador del pool, de SCREENSHOT_BATCH_TABS en SCREENSHOT_BATCH_TABS,
+    para que las páginas de cada grupo carguen a la vez, y captura cada pestaña en un archivo temporal.
+
+    Returns:
+        dict: {url: ruta del archivo temporal}. Un archivo vacío indica que la captura de esa URL falló.
+    """
+    tabs_per_round = max(1, getattr(settings, 'SCREENSHOT_BATCH_TABS', 4))
+    outputs = {}
+    try:
+        with get_browser_pool().session() as driver:
+            driver.set_window_size(*viewport)
+            main_window = driver.current_window_handle
+
+            for start in range(0, len(urls), tabs_per_round):
+                # Abrir primero todas las pestañas del grupo; la navegación por script no espera a que la página cargue
+                tabs = []
+                for url in urls[start:start + tabs_per_round]:
+                    driver.switch_to.new_window('tab')
+                    driver.execute_script('window.location.href = arguments[0];', url)
+                    tabs.append((url, driver.current_window_handle))
+
+                # Capturar cada pestaña; mientras se espera una, las demás siguen cargando
+                for url, handle in tabs:
+                    driver.switch_to.window(handle)
+                    outputs[url] = screenshot_cache.temp_path()
+                    try:
+                        wait_strategy(driver, timeout)
+                        driver.save_screenshot(outputs[url])
+                    except Exception:
+                        logger.exception("Error capturando la pantalla de %s", url)
+                    driver.close()
+
+            driver.switch_to.window(main_window)
+
+    except Exception:
+        logger.exception("Error capturando las pantallas")
+    return outputs
+
+
+# Función para obtener las capturas de varias URLs desde la caché o generarlas en una sola sesión del navegador
+def get_or_capture_batch(urls, viewport, wait_strategy=None, timeout=None, refresh=False):
+    """
+    Versión por lotes de 'get_or_capture': las capturas vigentes se sirven desde la caché y las demás se
+    generan juntas en un único navegador, una pestaña por URL, en lugar de una solicitud y un navegador por URL.
+
+    Returns:
+        dict: {url: ruta de la imagen o None si la captura falló}, para cada URL distinta de 'urls'.
+    """
+    wait_strategy = wait_strategy or get_wait_strategy()
+    timeout = timeout if timeout is not None else settings.SCREENSHOT_WAIT_TIMEOUT
+
+    # Una URL por clave de caché: variantes equivalentes de la misma URL se capturan una sola vez
+    by_key = {}
+    for url in urls:
+        by_key.setdefault(screenshot_cache.cache_key(url, viewport), url)
+
+    with ExitStack() as locks:
+        # Tomar los bloqueos en orden de clave para que dos lotes simultáneos no se bloqueen entre sí
+        for key in sorted(by_key):
+            locks.enter_context(screenshot_cache.lock(by_key[key], viewport))
+
+        paths = {}
+        pending = []
+        for url in by_key.values():
+            paths[url] = None if refresh else screenshot_cache.get_cached(url, viewport)
+            if paths[url] is None:
+                pending.append(url)
+
+        if pending:
+            for url, output_path in _capture_tabs(pending, viewport, wait_strategy, timeout).items():
+                paths[url] = _store_output(url, viewport, output_path)
+
+    # Las variantes equivalentes comparten la imagen de la URL que se capturó
+    return {url: paths[by_key[screenshot_cache.cache_key(url, viewport)]] for url in urls}
@@ -0,0 +1,125 @@
+import contextvars
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'  # Alias de la réplica de solo lectura en DATABASES
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_KEY = 'db_router:primary:%s'  # Clave de la caché que fija las lecturas de un cliente a la primaria
+
+_routing = contextvars.ContextVar('db_routing', default=None)  # Estado de la solicitud en curso
+
+
+# Estado del enrutamiento de una solicitud (lo crea ReplicaRoutingMiddleware)
+class RequestRouting:
+    def __init__(self, client):
+        self.client = client  # Identificador del cliente para la lectura de las propias escrituras
+        self.use_replica = False  # La vista está marcada con 'read_only', el método es de lectura y el cliente no está fijado
+        self.wrote = False  # La solicitud ha escrito en la primaria
+
+
+# Decorador que marca una vista como de solo lectura
+def read_only(view):
+    """
+    Marca una vista para que sus solicitudes GET, HEAD y OPTIONS lean de la réplica. Las escrituras de la vista
+    (y las de los demás métodos) siguen yendo a la primaria.
+
+    Se coloca encima de '@api_view', como 'csrf_exempt', porque ReplicaRoutingMiddleware lee la marca de la
+    función que resuelve la URL.
+    """
+    view.db_read_only = True
+    return view
+
+
+# Función para saber si hay una réplica configurada
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+# Router de bases de datos: réplica para las vistas de solo lectura y primaria para todo lo demás
+class PrimaryReplicaRouter:
+    """
+    Envía a la réplica las lecturas de las solicitudes de solo lectura (ver 'read_only' y ReplicaRoutingMiddleware)
+    y a la primaria todas las escrituras y las lecturas de cualquier otro contexto: otras vistas, comandos de
+    'manage.py', la consola y las lecturas dentro de 'transaction.atomic()', que deben ver la transacción.
+
+    Sin réplica configurada, todo va a la primaria.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None or not routing.use_replica or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Siempre la primaria, también para los objetos leídos de la réplica (Django usaría su base de datos)
+        routing = _routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica contiene los mismos datos que la primaria
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica recibe el esquema por replicación, no por 'migrate'
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
+
+
+# Función para fijar a la primaria las lecturas de un cliente que acaba de escribir
+def pin_to_primary(client, seconds=None):
+    if seconds is None:
+        seconds = getattr(settings, 'DB_REPLICA_STICKY_SECONDS', 10)
+    caches[getattr(settings, 'DB_REPLICA_STICKY_CACHE', 'default')].set(STICKY_KEY % client, True, seconds)
+
+
+# Función para saber si las lecturas de un cliente están fijadas a la primaria
+def is_pinned(client):
+    return caches[getattr(settings, 'DB_REPLICA_STICKY_CACHE', 'default')].get(STICKY_KEY % client) is not None
+
+
+# Middleware que aplica el enrutamiento a la réplica y la lectura de las propias escrituras
+class ReplicaRoutingMiddleware:
+    """
+    Activa la réplica en las solicitudes GET, HEAD y OPTIONS de las vistas marcadas con 'read_only'.
+
+    Lectura de las propias escrituras: cuando una solicitud escribe en la primaria (por ejemplo, al finalizar
+    una prueba), las lecturas de ese cliente van a la primaria durante DB_REPLICA_STICKY_SECONDS, el retraso
+    máximo esperado de la réplica. Así el evaluador que finaliza ve su acceso bloqueado en el listado al que
+    le redirige el frontend, aunque la réplica aún no tenga el cambio.
+
+    El cliente se identifica por su dirección IP (REMOTE_ADDR): el frontend llama a la API desde otro origen y
+    sin credenciales, por lo que no envía cookies. La marca se guarda en la caché DB_REPLICA_STICKY_CACHE, que
+    debe ser compartida (Redis, Memcached o base de datos) si hay varios procesos del servidor.
+
+    Solo está activo si hay una réplica configurada (ver DB_REPLICA_NAME en settings.py).
+    """
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routing = RequestRouting(request.META.get('REMOTE_ADDR', ''))
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote:
+            pin_to_primary(routing.client)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routing = _routing.get()
+        if routing is not None and request.method in SAFE_METHODS and getattr(view_func, 'db_read_only', False):
+            routing.use_replica = not is_pinned(routing.client)
@@ -0,0 +1,165 @@
+import json
+from django.db import models
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.settings import api_settings
+from aplications.metrics import serialization_timer
+
+try:
+    import orjson  # Codificador JSON rápido (opcional)
+except ImportError:
+    orjson = None
+
+# Columnas cuyo valor, tal como lo devuelve la base de datos, ya es el que produce el serializer de DRF
+PLAIN_FIELDS = (
+    models.AutoField, models.BooleanField, models.CharField, models.TextField,
+    models.IntegerField, models.FloatField, models.ForeignKey,
+)
+
+# Número máximo de IDs por consulta 'IN' al reunir las relaciones muchos a muchos
+M2M_CHUNK_SIZE = 500
+
+
+# Función para crear la conversión de una fecha y hora con el mismo formato que DRF
+def datetime_converter(serializer_field):
+    """
+    Devuelve una función equivalente a 'DateTimeField.to_representation' de DRF para el formato ISO 8601,
+    pero que resuelve la zona horaria una sola vez en lugar de en cada fila.
+    """
+    output_format = getattr(serializer_field, 'format', api_settings.DATETIME_FORMAT)
+    if not isinstance(output_format, str) or output_format.lower() != ISO_8601:
+        return serializer_field.to_representation
+    field_timezone = getattr(serializer_field, 'timezone', serializer_field.default_timezone())
+
+    def convert(value):
+        if field_timezone is None or not timezone.is_aware(value):
+            return serializer_field.to_representation(value)
+        text = value.astimezone(field_timezone).isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+
+    return convert
+
+
+# Serialización rápida de solo lectura a partir de '.values()'
+class FastSerializer:
+    """
+    Produce el mismo resultado que un ModelSerializer de DRF para modelos planos, pero a partir de
+    'QuerySet.values()' y sin la introspección de campos por fila del serializer.
+
+    - Las columnas simples (texto, números, booleanos, llaves foráneas) se copian tal cual.
+    - Las demás (fechas, decimales, etc.) se convierten con el campo del serializer original, para que el
+      formato sea idéntico.
+    - Las relaciones muchos a muchos se reúnen con una consulta agregada sobre la tabla intermedia.
+      Se admiten las que el serializer representa por llave primaria o con 'SlugRelatedField'.
+
+    Es opcional por vista: solo se usa en las vistas de lectura que lo activan.
+
+    Args:
+        serializer_class: ModelSerializer cuyo resultado se reproduce.
+        fields (list[str] | None): Campos a incluir; por defecto todos los campos legibles del serializer.
+
+    Raises:
+        ValueError: Si algún campo no se corresponde con un campo del modelo.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class()
+        self.model = serializer.Meta.model
+        self.pk_name = self.model._meta.pk.name
+        self.fields = fields or [name for name, field in serializer.fields.items() if not field.write_only]
+
+        model_fields = {field.name: field for field in self.model._meta.get_fields()}
+        self.columns = []  # (clave, campo del modelo, conversión o None)
+        self.many_to_many = []  # (clave, campo del modelo, campo del modelo relacionado a devolver)
+        for name in self.fields:
+            serializer_field = serializer.fields[name]
+            model_field = model_fields.get(serializer_field.source)
+            if model_field is None or not (model_field.concrete or model_field.many_to_many):
+                raise ValueError(f"El campo '{name}' no se puede serializar desde .values().")
+
+            if model_field.many_to_many:
+                child = getattr(serializer_field, 'child_relation', None)
+                self.many_to_many.append((name, model_field, getattr(child, 'slug_field', 'pk')))
+            elif isinstance(model_field, PLAIN_FIELDS):
+                self.columns.append((name, model_field, None))
+            elif isinstance(model_field, models.DateTimeField):
+                self.columns.append((name, model_field, datetime_converter(serializer_field)))
+            else:
+                self.columns.append((name, model_field, serializer_field.to_representation))
+
+    def values(self, queryset):
+        """
+        Devuelve 'queryset.values()' con las columnas necesarias (incluida la llave primaria para las relaciones).
+        """
+        names = [model_field.name for _, model_field, _ in self.columns]
+        if self.pk_name not in names:
+            names.append(self.pk_name)
+        return queryset.values(*names)
+
+    def build(self, rows):
+        """
+        Convierte las filas de 'values()' en la lista de diccionarios que devolvería el serializer.
+        """
+        rows = list(rows)
+        related = {name: self._related_values(model_field, slug_field, [row[self.pk_name] for row in rows])
+                   for name, model_field, slug_field in self.many_to_many}
+        converters = {name: (model_field.name, convert) for name, model_field, convert in self.columns}
+
+        data = []
+        for row in rows:
+            item = {}
+            for name in self.fields:  # Mismo orden de campos que el serializer
+                if name in related:
+                    item[name] = related[name].get(row[self.pk_name], [])
+                else:
+                    column, convert = converters[name]
+                    value = row[column]
+                    item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+    def serialize(self, queryset):
+        """
+        Serializa un QuerySet completo: 'values()' seguido de 'build()'.
+        """
+        return self.build(self.values(queryset))
+
+    def serialize_instance(self, instance):
+        """
+        Serializa una instancia ya cargada (respuestas de detalle).
+        """
+        row = {model_field.name: getattr(instance, model_field.attname) for _, model_field, _ in self.columns}
+        row[self.pk_name] = instance.pk
+        return self.build([row])[0]
+
+    def _related_values(self, model_field, slug_field, ids):
+        # Una consulta por cada bloque de IDs sobre la tabla intermedia, en lugar de una por fila
+        through = model_field.remote_field.through
+        source = model_field.m2m_field_name()
+        target = model_field.m2m_reverse_field_name()
+        related = {}
+        for start in range(0, len(ids), M2M_CHUNK_SIZE):
+            pairs = (
+                through.objects
+                .filter(**{f'{source}__in': ids[start:start + M2M_CHUNK_SIZE]})
+                .order_by(f'{target}_id')
+                .values_list(f'{source}_id', f'{target}__{slug_field}')
+            )
+            for owner_id, value in pairs:
+                related.setdefault(owner_id, []).append(value)
+        return related
+
+
+# Función para convertir datos ya serializados en una respuesta JSON
+def render_json(data, status=200):
+    """
+    Devuelve una respuesta 'application/json' codificada con orjson si está instalado, o con el módulo json
+    de la biblioteca estándar en caso contrario.
+    """
+    with serialization_timer():
+        if orjson is not None:
+            body = orjson.dumps(data)
+        else:
+            body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return HttpResponse(body, content_type='application/json', status=status)
@@ -0,0 +1,100 @@
+import hashlib
+import threading
+from collections import namedtuple
+from rest_framework.renderers import JSONRenderer
+from aplications.models import CatalogFingerprint, Heuristic, Subprinciple
+from aplications.serializers import HeuristicSerializer
+
+CATALOG_NAME = 'heuristics'  # Nombre con el que se guarda la huella del catálogo en 'CatalogFingerprint'
+
+_lock = threading.Lock()
+_catalog = None
+_lookup = None  # (huella, tabla de búsqueda)
+
+# Datos de un subprincipio necesarios para guardar respuestas sin volver a consultarlo
+SubprincipleRef = namedtuple('SubprincipleRef', ['subprinciple_id', 'heuristic_id', 'heuristic_code'])
+
+
+# Catálogo de heurísticas renderizado una vez por proceso y versión del catálogo
+class RenderedCatalog:
+    """
+    JSON ya renderizado del catálogo de heurísticas con sus subprincipios, su ETag fuerte (hash del contenido) y
+    la huella del catálogo con la que se construyó.
+    """
+
+    def __init__(self, body, fingerprint):
+        self.body = body
+        self.etag = '"%s"' % hashlib.sha256(body).hexdigest()
+        self.fingerprint = fingerprint
+
+
+# Función para obtener la huella del catálogo sincronizado en la base de datos
+def stored_fingerprint():
+    """
+    Devuelve la huella guardada en 'CatalogFingerprint' por 'cargar_datos_heuristicos', o None si el catálogo
+    aún no se ha sincronizado. Es una consulta por clave única.
+    """
+    return CatalogFingerprint.objects.filter(name=CATALOG_NAME).values_list('fingerprint', flat=True).first()
+
+
+# Función para obtener el catálogo de heurísticas renderizado
+def get_catalog():
+    """
+    Devuelve el catálogo de heurísticas renderizado, construyéndolo la primera vez que se solicita en el proceso.
+
+    Cada llamada compara la huella guardada en la base de datos con la del catálogo renderizado y lo vuelve a
+    construir si no coinciden. Así todos los procesos del servidor sirven el catálogo nuevo (y su ETag) después
+    de una sincronización, aunque 'invalidate' solo se ejecute en el proceso que la hizo.
+    """
+    global _catalog
+    fingerprint = stored_fingerprint()
+    catalog = _catalog
+    if catalog is not None and catalog.fingerprint == fingerprint:
+        return catalog
+
+    with _lock:
+        if _catalog is None or _catalog.fingerprint != fingerprint:
+            heuristics = Heuristic.objects.prefetch_related('subprinciples')  # Dos consultas en lugar de una por heurística
+            _catalog = RenderedCatalog(JSONRenderer().render(HeuristicSerializer(heuristics, many=True).data), fingerprint)
+        return _catalog
+
+
+# Función para obtener la tabla de búsqueda de subprincipios por código
+def get_subprinciple_lookup(reload=False):
+    """
+    Devuelve el diccionario código -> SubprincipleRef(subprinciple_id, heuristic_id, heuristic_code) de todo
+    el catálogo, cargándolo con una sola consulta la primera vez que se solicita en el proceso.
+
+    Como 'get_catalog', vuelve a cargar la tabla cuando cambia la huella guardada del catálogo.
+
+    Si un código está repetido en la tabla se usa el subprincipio más antiguo, como en la sincronización del catálogo.
+
+    Parámetros:
+    - reload: Si es verdadero, vuelve a cargar la tabla desde la base de datos.
+    """
+    global _lookup
+    fingerprint = stored_fingerprint()
+    cached = _lookup
+    if cached is not None and cached[0] == fingerprint and not reload:
+        return cached[1]
+
+    with _lock:
+        if _lookup is None or _lookup[0] != fingerprint or reload:
+            lookup = {}
+            rows = Subprinciple.objects.order_by('id').values_list('code', 'id', 'heuristic_id', 'heuristic_id__code')
+            for code, subprinciple_id, heuristic_id, heuristic_code in rows:
+                lookup.setdefault(code, SubprincipleRef(subprinciple_id, heuristic_id, heuristic_code))
+            _lookup = (fingerprint, lookup)
+        return _lookup[1]
+
+
+# Función para descartar el catálogo renderizado y la tabla de búsqueda
+def invalidate():
+    """
+    Descarta el catálogo renderizado y la tabla de subprincipios del proceso; la siguiente solicitud los vuelve a construir.
+    Los demás procesos detectan el cambio por la huella (ver 'get_catalog').
+    """
+    global _catalog, _lookup
+    with _lock:
+        _catalog = None
+        _lookup = None
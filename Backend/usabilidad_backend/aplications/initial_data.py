@@ -1,17 +1,36 @@
-from .models import Heuristic, Subprinciple
+import hashlib
+import json
+from django.db import transaction
+from . import heuristic_catalog
+from .heuristic_catalog import CATALOG_NAME
+from .models import CatalogFingerprint, Heuristic, Subprinciple
 from .heuristics.heuristics_m import heuristics
 
+
+# Función para calcular la huella del catálogo de heurísticas
+def catalog_fingerprint(catalog=None):
+    """
+    Devuelve el hash SHA-256 del contenido del catálogo (por defecto el diccionario 'heuristics').
+
+    El diccionario se serializa con las claves ordenadas, de modo que la huella solo cambia si cambia el contenido.
+    """
+    catalog = heuristics if catalog is None else catalog
+    payload = json.dumps(catalog, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
 # Función para cargar los datos heurísticos en la base de datos
-def cargar_datos_heuristicos():
+def cargar_datos_heuristicos(force=False):
     """
     Carga los datos heurísticos y sus subprincipios en la base de datos a partir de un diccionario externo.
-    
-    Esta función recorre el diccionario 'heuristics' que contiene las heurísticas y sus subprincipios,
-    y por cada entrada, crea o actualiza las instancias de los modelos Heuristic y Subprinciple en la base de datos.
-    
-    La función garantiza que:
-    - Si la heurística o el subprincipio ya existen (basado en su código), se actualizan.
-    - Si no existen, se crean nuevas instancias.
+
+    Esta función compara la huella del diccionario 'heuristics' con la guardada en 'CatalogFingerprint':
+    - Si no ha cambiado (y no se fuerza con 'force'), no hace nada más: una sola consulta.
+    - Si ha cambiado, aplica la diferencia en una transacción, con inserciones y actualizaciones en bloque
+      identificadas por el código de la heurística o del subprincipio, y guarda la nueva huella.
+
+    Las heurísticas y subprincipios que ya no están en el diccionario no se eliminan, porque las respuestas
+    de los evaluadores los referencian.
 
     El diccionario de heurísticas está importado desde 'heuristics_m.py' y tiene la siguiente estructura:
     {
@@ -27,26 +46,69 @@ def cargar_datos_heuristicos():
             }
         }
     }
-    
-    Esta estructura permite que tanto las heurísticas como sus subprincipios se carguen de forma jerárquica.
+
+    Returns:
+        dict | None: Número de heurísticas y subprincipios creados y actualizados, o None si el catálogo
+        ya estaba sincronizado.
     """
+    fingerprint = catalog_fingerprint()
+    if not force and CatalogFingerprint.objects.filter(name=CATALOG_NAME, fingerprint=fingerprint).exists():
+        return None
+
+    with transaction.atomic():
+        stats = _sync_heuristics()
+        stats.update(_sync_subprinciples())
+        CatalogFingerprint.objects.update_or_create(name=CATALOG_NAME, defaults={'fingerprint': fingerprint})
+        transaction.on_commit(heuristic_catalog.invalidate)  # El catálogo renderizado del proceso quedó obsoleto
+    return stats
 
-    # Recorrer todas las heurísticas en el diccionario importado
+
+# Función para sincronizar las heurísticas del catálogo
+def _sync_heuristics():
+    existing = {heuristic.code: heuristic for heuristic in Heuristic.objects.all()}
+    to_create, to_update = [], []
+
+    for heuristic_code, heuristic_data in heuristics.items():
+        heuristic = existing.get(heuristic_code)
+        if heuristic is None:
+            to_create.append(Heuristic(code=heuristic_code, title=heuristic_data["title"], description=heuristic_data["description"]))
+        elif (heuristic.title, heuristic.description) != (heuristic_data["title"], heuristic_data["description"]):
+            heuristic.title = heuristic_data["title"]
+            heuristic.description = heuristic_data["description"]
+            to_update.append(heuristic)
+
+    Heuristic.objects.bulk_create(to_create)
+    Heuristic.objects.bulk_update(to_update, ['title', 'description'])
+    return {'heuristics_created': len(to_create), 'heuristics_updated': len(to_update)}
+
+
+# Función para sincronizar los subprincipios del catálogo
+def _sync_subprinciples():
+    heuristic_ids = dict(Heuristic.objects.filter(code__in=heuristics).values_list('code', 'id'))
+
+    # El código del subprincipio no es único en la tabla: se toma como referencia la fila más antigua
+    existing = {}
+    for subprinciple in Subprinciple.objects.order_by('id'):
+        existing.setdefault(subprinciple.code, subprinciple)
+
+    fields = ['subtitle', 'description', 'example', 'heuristic_id']
+    to_create, to_update = [], []
     for heuristic_code, heuristic_data in heuristics.items():
-        # Crear o actualizar la instancia del modelo Heuristic basado en el código de la heurística
-        heuristic, created = Heuristic.objects.get_or_create(
-            code=heuristic_code,
-            title=heuristic_data["title"],
-            description=heuristic_data["description"]
-        )
-
-        # Recorrer todos los subprincipios asociados a esta heurística
         for subprinciple_code, subprinciple_data in heuristic_data["subprinciples"].items():
-            # Crear o actualizar la instancia del modelo Subprinciple basado en el código del subprincipio
-            Subprinciple.objects.get_or_create(
-                code=subprinciple_code,
-                subtitle=subprinciple_data["subtitle"],
-                description=subprinciple_data["description"],
-                example=subprinciple_data["example"],
-                heuristic_id=heuristic
-            )
\ No newline at end of file
+            values = {
+                'subtitle': subprinciple_data["subtitle"],
+                'description': subprinciple_data["description"],
+                'example': subprinciple_data["example"],
+                'heuristic_id_id': heuristic_ids[heuristic_code],
+            }
+            subprinciple = existing.get(subprinciple_code)
+            if subprinciple is None:
+                to_create.append(Subprinciple(code=subprinciple_code, **values))
+            elif any(getattr(subprinciple, name) != value for name, value in values.items()):
+                for name, value in values.items():
+                    setattr(subprinciple, name, value)
+                to_update.append(subprinciple)
+
+    Subprinciple.objects.bulk_create(to_create)
+    Subprinciple.objects.bulk_update(to_update, fields)
+    return {'subprinciples_created': len(to_create), 'subprinciples_updated': len(to_update)}
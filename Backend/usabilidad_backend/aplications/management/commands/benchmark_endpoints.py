@@ -0,0 +1,222 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from aplications.metrics import QueryTimer
+from aplications.models import (
+    DesignQuestion, DesignTest, EvaluatorAccess, EvaluatorHeuristicResponse, EvaluatorStandardResponse, Heuristic,
+    Subprinciple,
+)
+from aplications import result_cache
+
+
+# Comando para medir las vistas más usadas del flujo de evaluación y guardar los resultados en JSON
+class Command(BaseCommand):
+    """
+    Ejecuta las vistas más usadas con el cliente de pruebas de Django sobre la base de datos configurada (por
+    ejemplo, poblada con 'generate_synthetic_data') y guarda en un archivo JSON, por vista:
+
+    - Latencia (media, p50, p95, mínima y máxima) en milisegundos.
+    - Número de consultas SQL y tiempo de SQL por solicitud.
+    - Pico de memoria de Python durante una solicitud (medido aparte con 'tracemalloc').
+    - Tamaño de la respuesta.
+
+    Las vistas medidas son 'heuristics/', el listado de accesos de un evaluador, los GET de finalización (con la
+    caché de resultados y sin ella) y los guardados parciales de respuestas. Los guardados parciales escriben en
+    la base de datos, siempre con los mismos valores para un evaluador que no ha finalizado.
+
+    Con --compare se imprime la diferencia con un archivo de resultados anterior.
+
+    Uso:
+        python manage.py benchmark_endpoints --iterations 30 --output antes.json
+        python manage.py benchmark_endpoints --iterations 30 --output despues.json --compare antes.json
+    """
+    help = 'Mide latencia, consultas SQL y memoria de las vistas principales y guarda el resultado en JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Solicitudes medidas por vista.')
+        parser.add_argument('--warmup', type=int, default=2, help='Solicitudes previas sin medir por vista.')
+        parser.add_argument('--heuristic-test', type=int, help='ID de la prueba con heurísticas (por defecto, la de más respuestas).')
+        parser.add_argument('--standard-test', type=int, help='ID de la prueba estándar (por defecto, la de más respuestas).')
+        parser.add_argument('--output', default='benchmark.json', help='Archivo JSON donde se guardan los resultados.')
+        parser.add_argument('--compare', help='Archivo JSON de una ejecución anterior con el que comparar.')
+        parser.add_argument('--label', default='', help='Etiqueta libre que se guarda con los resultados.')
+
+    def handle(self, *args, **options):
+        heuristic_test = self._pick_test(options['heuristic_test'], True, EvaluatorHeuristicResponse)
+        standard_test = self._pick_test(options['standard_test'], False, EvaluatorStandardResponse)
+        if heuristic_test is None and standard_test is None:
+            raise CommandError('No hay pruebas con respuestas; ejecute antes "python manage.py generate_synthetic_data".')
+
+        # Sin DEBUG (no se guarda el registro de consultas) ni el detector de N+1, que alterarían las medidas
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['*'], QUERY_DETECTOR_ENABLED=False):
+            client = Client()
+            results = {}
+            for name, request, prepare in self._scenarios(heuristic_test, standard_test):
+                self.stdout.write('Midiendo %s...' % name)
+                results[name] = self._measure(client, request, prepare, options['iterations'], options['warmup'])
+
+        report = {
+            'label': options['label'],
+            'created_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'iterations': options['iterations'],
+            },
+            'data': {
+                'design_tests': DesignTest.objects.count(),
+                'design_questions': DesignQuestion.objects.count(),
+                'evaluator_accesses': EvaluatorAccess.objects.count(),
+                'standard_responses': EvaluatorStandardResponse.objects.count(),
+                'heuristic_responses': EvaluatorHeuristicResponse.objects.count(),
+                'heuristic_test': heuristic_test and heuristic_test.test_id,
+                'standard_test': standard_test and standard_test.test_id,
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2, ensure_ascii=False)
+
+        self._print(results)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as baseline:
+                self._print_comparison(json.load(baseline)['results'], results)
+        self.stdout.write(self.style.SUCCESS('Resultados guardados en %s' % options['output']))
+
+    def _pick_test(self, test_id, has_heuristics, response_model):
+        """Prueba indicada o, si no se indica, la prueba del tipo pedido con más respuestas."""
+        if test_id is not None:
+            try:
+                return DesignTest.objects.get(test_id=test_id, has_heuristics=has_heuristics)
+            except DesignTest.DoesNotExist:
+                raise CommandError('No existe la prueba %d %s heurísticas.' % (test_id, 'con' if has_heuristics else 'sin'))
+        busiest = response_model.objects.filter(test__has_heuristics=has_heuristics).values('test').annotate(
+            total=Count('pk')).order_by('-total').values_list('test', flat=True).first()
+        return DesignTest.objects.get(test_id=busiest) if busiest is not None else None
+
+    def _scenarios(self, heuristic_test, standard_test):
+        """Lista de (nombre, función que hace la solicitud, función previa a cada solicitud o None)."""
+        clear_cache = result_cache.get_store().clear
+        scenarios = [('heuristics', lambda client: client.get('/api/heuristics/'), None)]
+
+        # Listado de accesos del evaluador con más pruebas asignadas
+        evaluator_id = EvaluatorAccess.objects.values('evaluator_id').annotate(total=Count('pk')).order_by('-total').values_list(
+            'evaluator_id', flat=True).first()
+        if evaluator_id is not None:
+            scenarios.append(('access_listing', lambda client: client.get('/api/designtests/access/%d/' % evaluator_id), None))
+
+        for test, kind in ((heuristic_test, 'heuristic'), (standard_test, 'standard')):
+            if test is None:
+                continue
+            url = '/api/designtests/%d/evaluator%sresponsesfinalize/' % (test.test_id, kind)
+            scenarios.append(('finalize_%s_get' % kind, lambda client, url=url: client.get(url), None))
+            scenarios.append(('finalize_%s_get_uncached' % kind, lambda client, url=url: client.get(url), clear_cache))
+
+            # Guardado parcial de un evaluador que aún no ha finalizado
+            access = EvaluatorAccess.objects.filter(test_id=test, acceso_bloqueado=False).first()
+            if access is None:
+                self.stdout.write('La prueba %d no tiene evaluadores sin finalizar; se omite el guardado parcial.' % test.test_id)
+                continue
+            url = '/api/designtests/%d/evaluator%sresponses/%d/' % (test.test_id, kind, access.evaluator_id_id)
+            payload = self._heuristic_payload(test) if kind == 'heuristic' else self._standard_payload(test)
+            scenarios.append(('partial_save_%s' % kind, lambda client, url=url, payload=payload: client.post(
+                url, payload, content_type='application/json'), None))
+        return scenarios
+
+    def _heuristic_payload(self, test):
+        """Respuestas de la primera pregunta con todos los subprincipios del catálogo."""
+        question = DesignQuestion.objects.filter(test_id=test).order_by('question_id').first()
+        codes = {}
+        for heuristic_code, subprinciple_code in Subprinciple.objects.values_list('heuristic_id__code', 'code'):
+            codes.setdefault(heuristic_code, []).append(subprinciple_code)
+        return {
+            'question_id': question.question_id,
+            'heuristics': [
+                {'heuristic_code': heuristic.code, 'comment': '', 'subprinciples': [
+                    {'subprinciple_code': code, 'response_value': 5} for code in codes.get(heuristic.code, [])
+                ]}
+                for heuristic in Heuristic.objects.order_by('id') if codes.get(heuristic.code)
+            ],
+        }
+
+    def _standard_payload(self, test):
+        """Respuestas a todas las preguntas de la prueba."""
+        return {'responses': [
+            {'question': question_id, 'response_value': 3, 'comment': ''}
+            for question_id in DesignQuestion.objects.filter(test_id=test).order_by('question_id').values_list('question_id', flat=True)
+        ]}
+
+    def _measure(self, client, request, prepare, iterations, warmup):
+        for _ in range(warmup):
+            if prepare:
+                prepare()
+            request(client)
+
+        latencies, queries, sql_time = [], [], []
+        for _ in range(iterations):
+            if prepare:
+                prepare()
+            timer = QueryTimer()
+            with connection.execute_wrapper(timer):
+                start = time.perf_counter()
+                response = request(client)
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(timer.count)
+            sql_time.append(timer.duration * 1000)
+            if response.status_code >= 400:
+                raise CommandError('La solicitud devolvió %d: %s' % (response.status_code, response.content[:200]))
+
+        # El pico de memoria se mide en una solicitud aparte: 'tracemalloc' hace más lentas las asignaciones
+        if prepare:
+            prepare()
+        tracemalloc.start()
+        try:
+            request(client)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        latencies.sort()
+        return {
+            'status': response.status_code,
+            'latency_ms': {
+                'mean': round(statistics.mean(latencies), 3),
+                'p50': round(statistics.median(latencies), 3),
+                'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+                'min': round(latencies[0], 3),
+                'max': round(latencies[-1], 3),
+            },
+            'queries': max(queries),
+            'sql_ms': round(statistics.mean(sql_time), 3),
+            'peak_memory_kb': round(peak / 1024, 1),
+            'response_bytes': len(response.content),
+        }
+
+    def _print(self, results):
+        self.stdout.write('')
+        self.stdout.write('%-32s %10s %10s %9s %10s %12s' % ('Vista', 'p50 ms', 'p95 ms', 'Consultas', 'SQL ms', 'Memoria KB'))
+        for name, result in results.items():
+            self.stdout.write('%-32s %10.2f %10.2f %9d %10.2f %12.1f' % (
+                name, result['latency_ms']['p50'], result['latency_ms']['p95'], result['queries'], result['sql_ms'], result['peak_memory_kb']))
+
+    def _print_comparison(self, before, after):
+        self.stdout.write('')
+        self.stdout.write('%-32s %21s %15s %21s' % ('Vista', 'p50 ms (antes→ahora)', 'Consultas', 'Memoria KB'))
+        for name, result in after.items():
+            if name not in before:
+                continue
+            old = before[name]
+            change = (result['latency_ms']['p50'] - old['latency_ms']['p50']) / old['latency_ms']['p50'] * 100 if old['latency_ms']['p50'] else 0
+            self.stdout.write('%-32s %8.2f→%-8.2f%+5.0f%% %6d→%-6d %9.1f→%-9.1f' % (
+                name, old['latency_ms']['p50'], result['latency_ms']['p50'], change, old['queries'], result['queries'],
+                old['peak_memory_kb'], result['peak_memory_kb']))
@@ -0,0 +1,136 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from aplications.models import EvaluatorHeuristicResponse
+
+SUBPRINCIPLES_PER_QUESTION = 71  # Todos los subprincipios del catálogo
+QUESTIONS_PER_TEST = 10
+EVALUATORS_PER_TEST = 20
+
+
+# Comando para medir el coste de las búsquedas sobre las respuestas heurísticas antes y después de los índices
+class Command(BaseCommand):
+    """
+    Mide el coste de las consultas habituales sobre 'EvaluatorHeuristicResponse' en una base SQLite temporal,
+    primero sin índices compuestos y después con los índices y restricciones declarados en el modelo.
+
+    No toca la base de datos configurada: la tabla se crea en un archivo temporal con las columnas del modelo.
+
+    Uso:
+        python manage.py benchmark_response_indexes --rows 1000000 --lookups 200
+    """
+    help = 'Compara el coste de las búsquedas de respuestas heurísticas sin y con los índices compuestos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Número de respuestas a generar.')
+        parser.add_argument('--lookups', type=int, default=200, help='Número de búsquedas por tipo de consulta.')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla para los datos aleatorios.')
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        meta = EvaluatorHeuristicResponse._meta
+        table = meta.db_table
+        column = {field.name: field.column for field in meta.concrete_fields}
+
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        try:
+            db = sqlite3.connect(path)
+            db.execute('CREATE TABLE %s (%s INTEGER PRIMARY KEY, %s)' % (
+                table, meta.pk.column,
+                ', '.join('%s %s' % (field.column, self._sqlite_type(field))
+                          for field in meta.concrete_fields if not field.primary_key)
+            ))
+
+            self.stdout.write('Generando %d respuestas...' % options['rows'])
+            keys = self._populate(db, table, column, options['rows'])
+
+            before = self._measure(db, table, column, keys, options['lookups'])
+
+            self.stdout.write('Creando índices y restricciones del modelo...')
+            for statement in self._index_statements(meta, table):
+                db.execute(statement)
+            db.execute('ANALYZE')
+
+            after = self._measure(db, table, column, keys, options['lookups'])
+            db.close()
+        finally:
+            os.remove(path)
+
+        self.stdout.write('')
+        self.stdout.write('%-40s %14s %14s' % ('Consulta', 'Sin índices', 'Con índices'))
+        for name in before:
+            self.stdout.write('%-40s %11.3f ms %11.3f ms' % (name, before[name], after[name]))
+
+    def _sqlite_type(self, field):
+        """Tipo SQLite aproximado para cada columna del modelo."""
+        if field.get_internal_type() in ('TextField', 'CharField'):
+            return 'TEXT'
+        if field.get_internal_type() == 'DateTimeField':
+            return 'DATETIME'
+        return 'INTEGER'
+
+    def _populate(self, db, table, column, rows):
+        """Inserta 'rows' respuestas repartidas en pruebas × evaluadores × preguntas × subprincipios."""
+        per_test = EVALUATORS_PER_TEST * QUESTIONS_PER_TEST * SUBPRINCIPLES_PER_QUESTION
+        names = ['test', 'evaluator', 'question', 'subprinciple', 'score', 'comment', 'is_complete', 'created_at', 'evaluator_access']
+        sql = 'INSERT INTO %s (%s) VALUES (%s)' % (table, ', '.join(column[name] for name in names), ', '.join('?' * len(names)))
+
+        def generate():
+            for n in range(rows):
+                test, rest = divmod(n, per_test)
+                evaluator, rest = divmod(rest, QUESTIONS_PER_TEST * SUBPRINCIPLES_PER_QUESTION)
+                question, subprinciple = divmod(rest, SUBPRINCIPLES_PER_QUESTION)
+                evaluator_id = test * EVALUATORS_PER_TEST + evaluator
+                yield (test, evaluator_id, test * QUESTIONS_PER_TEST + question, subprinciple, random.randint(0, 1), '',
+                       evaluator % 4 != 0, '2024-01-01 00:00:00', evaluator_id)
+
+        db.executemany(sql, generate())
+        db.commit()
+        tests = max(1, rows // per_test)
+        return [
+            (test, test * EVALUATORS_PER_TEST + evaluator, test * QUESTIONS_PER_TEST + question, subprinciple)
+            for test, evaluator, question, subprinciple in (
+                (random.randrange(tests), random.randrange(EVALUATORS_PER_TEST), random.randrange(QUESTIONS_PER_TEST), random.randrange(SUBPRINCIPLES_PER_QUESTION))
+                for _ in range(1000)
+            )
+        ]
+
+    def _index_statements(self, meta, table):
+        """Sentencias CREATE INDEX equivalentes a los índices y restricciones de unicidad del modelo."""
+        statements = []
+        for constraint in meta.constraints:
+            columns = [meta.get_field(name).column for name in constraint.fields]
+            statements.append('CREATE UNIQUE INDEX %s ON %s (%s)' % (constraint.name, table, ', '.join(columns)))
+        for index in meta.indexes:
+            columns = [meta.get_field(name).column for name in index.fields]
+            statements.append('CREATE INDEX %s ON %s (%s)' % (index.name, table, ', '.join(columns)))
+        return statements
+
+    def _measure(self, db, table, column, keys, lookups):
+        """Tiempo medio (ms) de cada tipo de búsqueda que hacen las vistas de respuestas."""
+        queries = {
+            '(test, evaluator)': (
+                'SELECT * FROM %s WHERE %s = ? AND %s = ?' % (table, column['test'], column['evaluator']),
+                lambda key: key[:2]
+            ),
+            '(test, evaluator, is_complete)': (
+                'SELECT * FROM %s WHERE %s = ? AND %s = ? AND %s = 1' % (table, column['test'], column['evaluator'], column['is_complete']),
+                lambda key: key[:2]
+            ),
+            '(test, evaluator, question, subprinciple)': (
+                'SELECT * FROM %s WHERE %s = ? AND %s = ? AND %s = ? AND %s = ?' % (
+                    table, column['test'], column['evaluator'], column['question'], column['subprinciple']),
+                lambda key: key
+            ),
+        }
+        results = {}
+        for name, (sql, params) in queries.items():
+            start = time.perf_counter()
+            for key in keys[:lookups]:
+                db.execute(sql, params(key)).fetchall()
+            results[name] = (time.perf_counter() - start) * 1000 / max(1, min(lookups, len(keys)))
+        return results
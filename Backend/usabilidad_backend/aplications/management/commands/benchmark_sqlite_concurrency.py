@@ -0,0 +1,203 @@
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from aplications.models import EvaluatorHeuristicResponse
+from aplications.sqlite_tuning import apply_pragmas, write_lock_sql
+
+# Ajustes de SQLite sin configurar (los de Django por defecto), con los que se compara SQLITE_PRAGMAS
+STOCK_PRAGMAS = {'journal_mode': 'DELETE'}
+SQLITE_TIMEOUT = 5.0  # Segundos de espera por defecto del módulo 'sqlite3' (los usa Django; 'busy_timeout' los sustituye)
+
+
+# Comando para medir el rendimiento de lecturas y escrituras concurrentes en SQLite con y sin SQLITE_PRAGMAS
+class Command(BaseCommand):
+    """
+    Reproduce la carga concurrente de la aplicación sobre una copia temporal de la base de datos SQLite
+    configurada, en tres configuraciones:
+
+    - 'sin ajustes': los valores por defecto de SQLite y Django (journal_mode=DELETE, espera de 5 segundos).
+    - 'SQLITE_PRAGMAS': solo los PRAGMA de settings.py.
+    - 'SQLITE_PRAGMAS + bloqueo': los PRAGMA y el bloqueo de escritura al inicio de la transacción
+      ('sqlite_tuning.lock_for_write'), que es lo que hace ahora 'bulk_writers'.
+
+    La carga es:
+
+    - Escritores: el guardado automático de un evaluador (una transacción que lee las respuestas de una pregunta
+      y las inserta o actualiza con ON CONFLICT, como 'bulk_writers').
+    - Lectores: la lectura de las respuestas completas de una prueba, como los reportes de resultados.
+
+    Informa de las operaciones por segundo, la latencia p50/p95 de cada tipo y el número de errores
+    "database is locked". No modifica la base de datos configurada.
+
+    Necesita respuestas heurísticas guardadas (por ejemplo, con 'generate_synthetic_data').
+
+    Uso:
+        python manage.py benchmark_sqlite_concurrency --readers 4 --writers 4 --duration 10
+    """
+    help = 'Compara lecturas y escrituras concurrentes en SQLite sin y con SQLITE_PRAGMAS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help='Hilos que leen resultados.')
+        parser.add_argument('--writers', type=int, default=4, help='Hilos que guardan respuestas.')
+        parser.add_argument('--duration', type=float, default=10, help='Segundos de carga en cada configuración.')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla para elegir las respuestas que se guardan.')
+        parser.add_argument('--output', help='Archivo JSON donde se guardan los resultados (opcional).')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('La base de datos configurada no es SQLite.')
+        meta = EvaluatorHeuristicResponse._meta
+        column = {field.name: field.column for field in meta.concrete_fields}
+        self.table, self.column = meta.db_table, column
+
+        # Prueba con más respuestas completas y sus claves (evaluador, pregunta) para los guardados
+        test_id = EvaluatorHeuristicResponse.objects.filter(is_complete=True).values('test').annotate(
+            total=Count('pk')).order_by('-total').values_list('test', flat=True).first()
+        if test_id is None:
+            raise CommandError('No hay respuestas heurísticas; ejecute antes "python manage.py generate_synthetic_data".')
+        self.test_id = test_id
+        keys = list(EvaluatorHeuristicResponse.objects.filter(test=test_id).values_list('evaluator', 'question', 'evaluator_access').distinct())
+        self.subprinciples = list(EvaluatorHeuristicResponse.objects.filter(test=test_id).values_list('subprinciple', flat=True).distinct())
+        random.Random(options['seed']).shuffle(keys)
+        self.keys = keys
+
+        results = {}
+        directory = tempfile.mkdtemp()
+        try:
+            tuned = getattr(settings, 'SQLITE_PRAGMAS', {})
+            for name, pragmas, lock_first in (('sin ajustes', STOCK_PRAGMAS, False), ('SQLITE_PRAGMAS', tuned, False),
+                                              ('SQLITE_PRAGMAS + bloqueo', tuned, True)):
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                self._copy_database(path)
+                self.stdout.write('Midiendo %s...' % name)
+                results[name] = self._run(path, pragmas, lock_first, options)
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        self.stdout.write('')
+        self.stdout.write('%-26s %12s %12s %12s %12s %12s %12s' % (
+            'Configuración', 'Lecturas/s', 'Lect. p95', 'Escrituras/s', 'Escr. p50', 'Escr. p95', 'Bloqueos'))
+        for name, result in results.items():
+            self.stdout.write('%-26s %12.1f %9.1f ms %12.1f %9.1f ms %9.1f ms %12d' % (
+                name, result['reads_per_second'], result['read_ms']['p95'], result['writes_per_second'],
+                result['write_ms']['p50'], result['write_ms']['p95'], result['locked_errors']))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump({'options': {name: options[name] for name in ('readers', 'writers', 'duration')}, 'results': results},
+                          output, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS('Resultados guardados en %s' % options['output']))
+
+    def _copy_database(self, path):
+        """Copia la base de datos configurada con la API de copia de seguridad de SQLite (consistente aunque esté en uso)."""
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            connection.connection.backup(target)
+        finally:
+            target.close()
+
+    def _connect(self, path, pragmas):
+        # Autocommit, como Django: las transacciones se abren con BEGIN explícito
+        db = sqlite3.connect(path, timeout=SQLITE_TIMEOUT, isolation_level=None, check_same_thread=False)
+        apply_pragmas(db, pragmas)
+        return db
+
+    def _run(self, path, pragmas, lock_first, options):
+        table, column = self.table, self.column
+        read_sql = 'SELECT %s, %s, %s, %s FROM %s WHERE %s = ? AND %s = 1' % (
+            column['evaluator'], column['question'], column['subprinciple'], column['score'], table, column['test'], column['is_complete'])
+        existing_sql = 'SELECT %s, %s FROM %s WHERE %s = ? AND %s = ? AND %s = ?' % (
+            column['subprinciple'], column['score'], table, column['test'], column['evaluator'], column['question'])
+        names = ['test', 'evaluator', 'question', 'subprinciple', 'score', 'comment', 'is_complete', 'created_at', 'evaluator_access']
+        upsert_sql = 'INSERT INTO %s (%s) VALUES (%s) ON CONFLICT (%s) DO UPDATE SET %s = excluded.%s, %s = excluded.%s' % (
+            table, ', '.join(column[name] for name in names), ', '.join('?' * len(names)),
+            ', '.join(column[name] for name in ('test', 'evaluator', 'question', 'subprinciple')),
+            column['score'], column['score'], column['comment'], column['comment'])
+        lock_sql = write_lock_sql(EvaluatorHeuristicResponse, connection.ops.quote_name)
+
+        # Abrir todas las conexiones antes de empezar (el cambio de journal_mode necesita acceso exclusivo)
+        connections = [self._connect(path, pragmas) for _ in range(options['readers'] + options['writers'])]
+        stop = threading.Event()
+        reads, writes, locked = [], [], []
+        lock = threading.Lock()
+
+        def reader(db):
+            latencies = []
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    db.execute(read_sql, (self.test_id,)).fetchall()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                except sqlite3.OperationalError:
+                    with lock:
+                        locked.append(1)
+            with lock:
+                reads.extend(latencies)
+
+        def writer(db, offset):
+            latencies = []
+            step = 0
+            while not stop.is_set():
+                evaluator, question, access = self.keys[(offset + step) % len(self.keys)]
+                step += options['writers']
+                start = time.perf_counter()
+                try:
+                    db.execute('BEGIN')
+                    if lock_first:
+                        db.execute(lock_sql)
+                    previous = dict(db.execute(existing_sql, (self.test_id, evaluator, question)).fetchall())
+                    db.executemany(upsert_sql, [
+                        (self.test_id, evaluator, question, subprinciple, (previous.get(subprinciple, 0) % 10) + 1, '', 0,
+                         '2024-01-01 00:00:00', access)
+                        for subprinciple in self.subprinciples
+                    ])
+                    db.execute('COMMIT')
+                    latencies.append((time.perf_counter() - start) * 1000)
+                except sqlite3.OperationalError:
+                    if db.in_transaction:
+                        db.execute('ROLLBACK')
+                    with lock:
+                        locked.append(1)
+            with lock:
+                writes.extend(latencies)
+
+        threads = [threading.Thread(target=reader, args=(db,)) for db in connections[:options['readers']]]
+        threads += [threading.Thread(target=writer, args=(db, n)) for n, db in enumerate(connections[options['readers']:])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        for db in connections:
+            db.close()
+
+        return {
+            'reads_per_second': round(len(reads) / elapsed, 1),
+            'writes_per_second': round(len(writes) / elapsed, 1),
+            'read_ms': self._percentiles(reads),
+            'write_ms': self._percentiles(writes),
+            'locked_errors': len(locked),
+        }
+
+    def _percentiles(self, latencies):
+        if not latencies:
+            return {'p50': 0.0, 'p95': 0.0}
+        latencies.sort()
+        return {'p50': round(statistics.median(latencies), 2), 'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2)}
@@ -0,0 +1,73 @@
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from aplications.fast_serializers import FastSerializer
+from aplications.models import DesignQuestion, DesignTest, EvaluatorAccess, User
+from aplications.serializers import DesignQuestionSerializer, DesignTestSerializer, EvaluatorAccessSerializer, UserSerializer
+
+# Serializers con ruta rápida y el modelo que serializan
+FAST_SERIALIZERS = [
+    (UserSerializer, User),
+    (DesignTestSerializer, DesignTest),
+    (DesignQuestionSerializer, DesignQuestion),
+    (EvaluatorAccessSerializer, EvaluatorAccess),
+]
+
+
+# Comando para comprobar que la serialización rápida produce lo mismo que los serializers de DRF
+class Command(BaseCommand):
+    """
+    Serializa las filas de la base de datos configurada con cada ModelSerializer y con 'FastSerializer',
+    compara ambos resultados (ya convertidos a JSON) y muestra el tiempo de cada ruta.
+
+    El orden de las relaciones muchos a muchos no está definido en el serializer, así que se comparan ordenadas.
+
+    Es una comprobación manual sobre datos reales; la equivalencia se verifica en las pruebas de
+    'aplications/tests.py' (FastSerializerParityTests), con y sin '?fields='.
+
+    Uso:
+        python manage.py check_fast_serializers [--limit 1000]
+    """
+    help = 'Comprueba que la serialización rápida desde .values() coincide con los serializers de DRF.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help='Número máximo de filas por modelo.')
+
+    def handle(self, *args, **options):
+        failures = 0
+        for serializer_class, model in FAST_SERIALIZERS:
+            queryset = model.objects.order_by('pk')[:options['limit']]
+
+            start = time.perf_counter()
+            expected = serializer_class(queryset.prefetch_related(*self._many_to_many(model)), many=True).data
+            drf_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            actual = FastSerializer(serializer_class).serialize(queryset)
+            fast_ms = (time.perf_counter() - start) * 1000
+
+            mismatches = [
+                (left, right) for left, right in zip(self._normalize(expected), self._normalize(actual)) if left != right
+            ]
+            if len(expected) != len(actual):
+                mismatches.append(('%d filas' % len(expected), '%d filas' % len(actual)))
+
+            status = self.style.SUCCESS('OK') if not mismatches else self.style.ERROR('DIFERENTE')
+            self.stdout.write('%-28s %6d filas  DRF %8.1f ms  rápido %8.1f ms  %s' % (
+                serializer_class.__name__, len(expected), drf_ms, fast_ms, status))
+            for left, right in mismatches[:3]:
+                self.stdout.write('    DRF:    %s\n    rápido: %s' % (left, right))
+            failures += bool(mismatches)
+
+        if failures:
+            raise CommandError('%d serializers no coinciden con su ruta rápida.' % failures)
+
+    def _many_to_many(self, model):
+        return [field.name for field in model._meta.many_to_many]
+
+    def _normalize(self, data):
+        # Comparar el JSON resultante, con las listas de relaciones ordenadas
+        normalized = []
+        for item in json.loads(json.dumps(data)):
+            normalized.append({key: sorted(value) if isinstance(value, list) else value for key, value in item.items()})
+        return normalized
@@ -0,0 +1,157 @@
+import glob
+import importlib.util
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+BACKENDS = ('sqlite', 'postgresql')
+POSTGRES_USER = 'postgres'
+POSTGRES_DB = 'usabilidad'
+
+# Pasos que se ejecutan en cada base de datos: (nombre, argumentos de manage.py)
+STEPS = (
+    ('migrate', ['migrate', '--no-input']),
+    ('migrate zero', ['migrate', 'aplications', 'zero', '--no-input']),
+    ('migrate de nuevo', ['migrate', '--no-input']),
+    ('datos sintéticos', ['generate_synthetic_data', '--tests', '2', '--questions', '3', '--evaluators', '6', '--evaluators-per-test', '4']),
+    ('vistas principales', ['benchmark_endpoints', '--iterations', '1', '--warmup', '0']),
+)
+
+
+# Comando para comprobar las migraciones y las vistas principales en SQLite y en PostgreSQL
+class Command(BaseCommand):
+    """
+    Matriz de compatibilidad de las migraciones: para cada motor crea una base de datos vacía y ejecuta, con
+    'manage.py' en un proceso aparte configurado con las variables DB_* (ver settings.py):
+
+    1. Todas las migraciones.
+    2. La reversión de las migraciones de 'aplications' ('migrate aplications zero').
+    3. Todas las migraciones otra vez.
+    4. 'generate_synthetic_data' con pocos datos.
+    5. 'benchmark_endpoints' con una iteración, que recorre las vistas principales y los guardados (upserts).
+
+    SQLite usa un archivo temporal. Para PostgreSQL se inicia un servidor temporal con 'initdb' y 'pg_ctl'
+    (del PATH, de /usr/lib/postgresql/*/bin o de --pg-bin) en un puerto libre, y se detiene al terminar.
+    PostgreSQL se omite con un aviso si no están sus binarios o psycopg2, salvo con --require-all.
+    La base de datos configurada no se modifica.
+
+    Los mismos pasos se ejecutan en 'manage.py test' (MigrationMatrixTests en 'aplications/tests.py') sobre la
+    base de datos de pruebas del motor elegido con DB_ENGINE; este comando compara los dos motores de una vez.
+
+    Uso:
+        python manage.py check_migrations
+        python manage.py check_migrations --backend postgresql --pg-bin /usr/lib/postgresql/13/bin
+    """
+    help = 'Comprueba las migraciones y las vistas principales en SQLite y PostgreSQL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', action='append', choices=BACKENDS, help='Motor a comprobar (por defecto, todos).')
+        parser.add_argument('--pg-bin', help='Carpeta con los binarios de PostgreSQL (initdb, pg_ctl, createdb).')
+        parser.add_argument('--require-all', action='store_true', help='Falla si no se puede comprobar algún motor.')
+
+    def handle(self, *args, **options):
+        results = {}
+        directory = tempfile.mkdtemp()
+        try:
+            for backend in options['backend'] or BACKENDS:
+                self.stdout.write('== %s ==' % backend)
+                if backend == 'sqlite':
+                    env = {'DB_ENGINE': 'sqlite', 'DB_NAME': os.path.join(directory, 'migraciones.sqlite3')}
+                    results[backend] = self._run_steps(env, directory)
+                    continue
+
+                missing = self._postgres_missing(options['pg_bin'])
+                if missing:
+                    if options['require_all']:
+                        raise CommandError('No se puede comprobar PostgreSQL: %s.' % missing)
+                    self.stdout.write(self.style.WARNING('Se omite PostgreSQL: %s.' % missing))
+                    continue
+                env, stop = self._start_postgres(self._pg_bin, directory)
+                try:
+                    results[backend] = self._run_steps(env, directory)
+                finally:
+                    stop()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        self.stdout.write('')
+        self.stdout.write('%-22s %s' % ('Paso', ' '.join('%-14s' % backend for backend in results)))
+        for name, _ in STEPS:
+            self.stdout.write('%-22s %s' % (name, ' '.join('%-14s' % self._cell(results[backend].get(name)) for backend in results)))
+
+        failed = [backend for backend, steps in results.items() if any(not ok for ok, _ in steps.values()) or len(steps) < len(STEPS)]
+        if failed:
+            raise CommandError('Las migraciones fallan en: %s.' % ', '.join(failed))
+        self.stdout.write(self.style.SUCCESS('Migraciones correctas en: %s.' % ', '.join(results)))
+
+    def _cell(self, result):
+        if result is None:
+            return '-'
+        ok, seconds = result
+        return '%s %5.1f s' % ('OK' if ok else 'FALLÓ', seconds)
+
+    def _run_steps(self, env, directory):
+        """Ejecuta los pasos en orden hasta el primero que falle. Devuelve {paso: (correcto, segundos)}."""
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'usabilidad_backend.settings'), **env)
+        manage = os.path.join(str(settings.BASE_DIR), 'manage.py')
+        steps = {}
+        for name, arguments in STEPS:
+            if arguments[0] == 'benchmark_endpoints':
+                arguments = arguments + ['--output', os.path.join(directory, 'vistas.json')]
+            start = time.perf_counter()
+            process = subprocess.run([sys.executable, manage] + arguments, env=env, cwd=str(settings.BASE_DIR),
+                                     stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+            steps[name] = (process.returncode == 0, time.perf_counter() - start)
+            self.stdout.write('%-22s %s' % (name, self._cell(steps[name])))
+            if process.returncode != 0:
+                self.stdout.write('\n'.join(process.stdout.splitlines()[-20:]))
+                break
+        return steps
+
+    def _postgres_missing(self, pg_bin):
+        """Devuelve el motivo por el que no se puede comprobar PostgreSQL, o None."""
+        if importlib.util.find_spec('psycopg2') is None:
+            return 'psycopg2 no está instalado'
+        candidates = [pg_bin] if pg_bin else [os.path.dirname(shutil.which('pg_ctl') or '')] + sorted(glob.glob('/usr/lib/postgresql/*/bin'), reverse=True)
+        for candidate in candidates:
+            if candidate and all(os.path.exists(os.path.join(candidate, binary)) for binary in ('initdb', 'pg_ctl', 'createdb')):
+                self._pg_bin = candidate
+                return None
+        return 'no se encontraron initdb, pg_ctl y createdb (use --pg-bin)'
+
+    def _start_postgres(self, pg_bin, directory):
+        """Inicia un servidor PostgreSQL temporal. Devuelve (variables DB_*, función para detenerlo)."""
+        data = os.path.join(directory, 'pgdata')
+        with socket.socket() as probe:  # Puerto libre
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+
+        def run(binary, *arguments):
+            process = subprocess.run([os.path.join(pg_bin, binary)] + list(arguments), stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT, universal_newlines=True)
+            if process.returncode != 0:
+                raise CommandError('%s falló:\n%s' % (binary, process.stdout))
+
+        run('initdb', '-D', data, '-U', POSTGRES_USER, '-A', 'trust', '-E', 'UTF8', '--no-sync')
+        # Sin fsync: el servidor es desechable y así las migraciones son más rápidas
+        run('pg_ctl', '-D', data, '-l', os.path.join(directory, 'postgres.log'), '-w', 'start',
+            '-o', '-p %d -k %s -c listen_addresses=127.0.0.1 -c fsync=off' % (port, directory))
+
+        def stop():
+            run('pg_ctl', '-D', data, '-m', 'fast', '-w', 'stop')
+
+        try:
+            run('createdb', '-h', '127.0.0.1', '-p', str(port), '-U', POSTGRES_USER, POSTGRES_DB)
+        except CommandError:
+            stop()
+            raise
+        return {
+            'DB_ENGINE': 'postgresql', 'DB_NAME': POSTGRES_DB, 'DB_USER': POSTGRES_USER, 'DB_PASSWORD': '',
+            'DB_HOST': '127.0.0.1', 'DB_PORT': str(port),
+        }, stop
@@ -0,0 +1,197 @@
+import random
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from aplications.models import (
+    DesignQuestion, DesignTest, EvaluatorAccess, EvaluatorHeuristicResponse, EvaluatorStandardResponse, Heuristic,
+    ResultCacheVersion, Subprinciple, User,
+)
+from aplications.result_summary import rebuild
+
+SYNTHETIC_PREFIX = 'synthetic_'  # Prefijo de los usuarios generados (permite borrarlos con --clear)
+STANDARD_RESPONSE_TYPES = ('Calificacion', 'Legibilidad', 'Coherencia')
+STANDARD_MAX_VALUE = 5  # Valor máximo de las respuestas estándar
+HEURISTIC_MAX_SCORE = 10  # Puntaje máximo de un subprincipio (igual que en el frontend)
+
+
+# Comando para poblar la base de datos con datos sintéticos del flujo de evaluación
+class Command(BaseCommand):
+    """
+    Genera propietarios, pruebas de diseño, preguntas, evaluadores, accesos y respuestas (estándar y heurísticas,
+    con todos los subprincipios del catálogo) para reproducir localmente el volumen de producción.
+
+    - Cada prueba tiene --evaluators-per-test evaluadores tomados de un grupo de --evaluators usuarios, de modo
+      que un evaluador tiene acceso a varias pruebas.
+    - Una fracción --finalized de los evaluadores ha finalizado (acceso bloqueado y respuestas completas); el resto
+      tiene respuestas parciales en una parte de las preguntas.
+    - Los puntajes se generan alrededor de un consenso por pregunta y subprincipio, para que el acuerdo entre
+      evaluadores y la severidad den resultados realistas.
+
+    Las filas se insertan con 'bulk_create' en lotes; al terminar se reconstruye el resumen de resultados de las
+    pruebas creadas. Los datos generados se pueden borrar con --clear.
+
+    Uso:
+        python manage.py generate_synthetic_data --tests 20 --questions 10 --evaluators 200 --evaluators-per-test 25
+        python manage.py generate_synthetic_data --clear
+    """
+    help = 'Puebla la base de datos con pruebas, evaluadores y respuestas sintéticas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owners', type=int, default=5, help='Número de propietarios.')
+        parser.add_argument('--tests', type=int, default=10, help='Número de pruebas de diseño.')
+        parser.add_argument('--questions', type=int, default=10, help='Número de preguntas por prueba.')
+        parser.add_argument('--evaluators', type=int, default=100, help='Número de evaluadores en total.')
+        parser.add_argument('--evaluators-per-test', type=int, default=20, help='Número de evaluadores con acceso a cada prueba.')
+        parser.add_argument('--heuristic-ratio', type=float, default=0.5, help='Fracción de pruebas con heurísticas.')
+        parser.add_argument('--finalized', type=float, default=0.75, help='Fracción de evaluadores que han finalizado cada prueba.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Filas por sentencia INSERT.')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla para los datos aleatorios.')
+        parser.add_argument('--clear', action='store_true', help='Borra los datos sintéticos generados antes y termina.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=SYNTHETIC_PREFIX).delete()
+            self.stdout.write(self.style.SUCCESS('Datos sintéticos borrados: %d filas.' % deleted))
+            return
+
+        if options['evaluators_per_test'] > options['evaluators']:
+            raise CommandError('--evaluators-per-test no puede ser mayor que --evaluators.')
+        if User.objects.filter(username__startswith=SYNTHETIC_PREFIX).exists():
+            raise CommandError('Ya hay datos sintéticos; bórrelos antes con --clear.')
+
+        heuristics = list(Heuristic.objects.all())
+        subprinciples = list(Subprinciple.objects.order_by('id').values_list('id', flat=True))
+        if not subprinciples:
+            raise CommandError('El catálogo de heurísticas está vacío; ejecute antes "python manage.py sync_heuristics".')
+
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            owners = self._create_users('owner', options['owners'], 'Propietario')
+            evaluators = self._create_users('evaluator', options['evaluators'], 'Evaluador')
+            tests = self._create_tests(owners, options['tests'], options['heuristic_ratio'])
+            questions = self._create_questions(tests, options['questions'], heuristics)
+            accesses = self._create_accesses(tests, evaluators, options['evaluators_per_test'], options['finalized'])
+            counts = self._create_responses(tests, questions, accesses, subprinciples)
+
+            for test in tests:
+                rebuild(test.test_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Creados: %d usuarios, %d pruebas, %d preguntas, %d accesos, %d respuestas estándar y %d respuestas heurísticas.' % (
+                len(owners) + len(evaluators), len(tests), sum(len(ids) for ids in questions.values()),
+                sum(len(rows) for rows in accesses.values()), counts['standard'], counts['heuristic'])
+        ))
+
+    def _create_users(self, kind, count, rol):
+        """Crea los usuarios y los devuelve en orden con su ID (se vuelven a leer: 'bulk_create' no siempre lo asigna)."""
+        prefix = '%s%s_' % (SYNTHETIC_PREFIX, kind)
+        User.objects.bulk_create([
+            User(username='%s%05d' % (prefix, n), email='%s%05d@example.com' % (prefix, n), rol=rol,
+                 experience=self.random.choice(['Novato', 'Experto']) if rol == 'Evaluador' else None, password='synthetic')
+            for n in range(count)
+        ], batch_size=self.batch_size)
+        return list(User.objects.filter(username__startswith=prefix).order_by('username'))
+
+    def _create_tests(self, owners, count, heuristic_ratio):
+        codes = [str(uuid.uuid4())[:10] for _ in range(count)]  # Igual que DesignTest.save()
+        tests = []
+        for n, code in enumerate(codes):
+            owner = owners[n % len(owners)]
+            tests.append(DesignTest(
+                name='Prueba sintética %d' % n, url='https://example.com/prototipo/%d' % n, description='Datos sintéticos',
+                test_type=self.random.choice(['Movil', 'Web', 'Tablet']), has_heuristics=self.random.random() < heuristic_ratio,
+                code=code, user=owner, user_name=owner.username,
+            ))
+        DesignTest.objects.bulk_create(tests, batch_size=self.batch_size)
+        tests = list(DesignTest.objects.filter(code__in=codes).order_by('test_id'))
+        # 'bulk_create' no envía post_save: crear aquí el contador de la caché de resultados de cada prueba
+        ResultCacheVersion.objects.bulk_create([ResultCacheVersion(test_id=test.test_id) for test in tests], batch_size=self.batch_size)
+        return tests
+
+    def _create_questions(self, tests, per_test, heuristics):
+        """Crea las preguntas de cada prueba y devuelve {test_id: [question_id]}."""
+        DesignQuestion.objects.bulk_create([
+            DesignQuestion(
+                title='Pregunta %d' % n, description='Pregunta sintética', url_frame='%s/pantalla/%d' % (test.url, n),
+                response_type=None if test.has_heuristics else self.random.choice(STANDARD_RESPONSE_TYPES), test_id=test,
+            )
+            for test in tests for n in range(per_test)
+        ], batch_size=self.batch_size)
+
+        questions = {test.test_id: [] for test in tests}
+        for question_id, test_id in DesignQuestion.objects.filter(test_id__in=questions).order_by('question_id').values_list('question_id', 'test_id'):
+            questions[test_id].append(question_id)
+
+        # Las preguntas de las pruebas con heurísticas se asocian a todas las heurísticas del catálogo
+        heuristic_tests = {test.test_id for test in tests if test.has_heuristics}
+        through = DesignQuestion.heuristics.through
+        through.objects.bulk_create([
+            through(designquestion_id=question_id, heuristic_id=heuristic.id)
+            for test_id in heuristic_tests for question_id in questions[test_id] for heuristic in heuristics
+        ], batch_size=self.batch_size)
+        return questions
+
+    def _create_accesses(self, tests, evaluators, per_test, finalized):
+        """Crea los accesos y devuelve {test_id: [(access_id, evaluator_id, finalizado)]}."""
+        EvaluatorAccess.objects.bulk_create([
+            EvaluatorAccess(evaluator_id=evaluator, test_id=test, acceso_bloqueado=self.random.random() < finalized)
+            for test in tests for evaluator in self.random.sample(evaluators, per_test)
+        ], batch_size=self.batch_size)
+
+        accesses = {test.test_id: [] for test in tests}
+        for access_id, evaluator_id, test_id, blocked in EvaluatorAccess.objects.filter(test_id__in=accesses).order_by('access_id').values_list(
+                'access_id', 'evaluator_id', 'test_id', 'acceso_bloqueado'):
+            accesses[test_id].append((access_id, evaluator_id, blocked))
+        return accesses
+
+    def _create_responses(self, tests, questions, accesses, subprinciples):
+        """
+        Crea las respuestas de cada evaluador: todas las preguntas si finalizó, una parte si no. Devuelve el número
+        de respuestas creadas de cada tipo.
+        """
+        counts = {'standard': 0, 'heuristic': 0}
+        for test in tests:
+            question_ids = questions[test.test_id]
+            if test.has_heuristics:
+                consensus = {(question_id, subprinciple_id): self.random.randint(1, HEURISTIC_MAX_SCORE)
+                             for question_id in question_ids for subprinciple_id in subprinciples}
+            else:
+                consensus = {question_id: self.random.randint(1, STANDARD_MAX_VALUE) for question_id in question_ids}
+                response_types = dict(DesignQuestion.objects.filter(question_id__in=question_ids).values_list('question_id', 'response_type'))
+
+            rows = []
+            for access_id, evaluator_id, finalized in accesses[test.test_id]:
+                answered = question_ids if finalized else question_ids[:self.random.randint(0, len(question_ids))]
+                for question_id in answered:
+                    if test.has_heuristics:
+                        rows.extend(
+                            EvaluatorHeuristicResponse(
+                                score=self._around(consensus[question_id, subprinciple_id], HEURISTIC_MAX_SCORE), comment='',
+                                is_complete=finalized, evaluator_access_id=access_id, test_id=test.test_id,
+                                question_id=question_id, evaluator_id=evaluator_id, subprinciple_id=subprinciple_id,
+                            )
+                            for subprinciple_id in subprinciples
+                        )
+                    else:
+                        rows.append(EvaluatorStandardResponse(
+                            response_type=response_types[question_id], response_value=self._around(consensus[question_id], STANDARD_MAX_VALUE),
+                            comment='', is_complete=finalized, evaluator_access_id=access_id, evaluator_id=evaluator_id,
+                            test_id=test.test_id, question_id=question_id,
+                        ))
+
+                # Insertar por lotes para no acumular en memoria todas las respuestas de una prueba grande
+                if len(rows) >= self.batch_size:
+                    counts['heuristic' if test.has_heuristics else 'standard'] += self._flush(rows)
+                    rows = []
+            counts['heuristic' if test.has_heuristics else 'standard'] += self._flush(rows)
+        return counts
+
+    def _flush(self, rows):
+        if rows:
+            type(rows[0]).objects.bulk_create(rows, batch_size=self.batch_size)
+        return len(rows)
+
+    def _around(self, value, maximum):
+        """Puntaje cercano al consenso: la mayoría de evaluadores se separa como mucho un punto."""
+        return min(maximum, max(1, value + self.random.choice((-2, -1, -1, 0, 0, 0, 1, 1, 2))))
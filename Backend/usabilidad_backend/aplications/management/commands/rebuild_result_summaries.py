@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from aplications.result_summary import rebuild
+
+
+# Comando para reconstruir el resumen de resultados de las pruebas de diseño
+class Command(BaseCommand):
+    """
+    Vuelve a calcular 'ResultSummary' a partir de las respuestas completas guardadas.
+
+    El resumen se mantiene al día al guardar respuestas; este comando solo hace falta si se borraron respuestas
+    directamente en la base de datos (por ejemplo, al eliminar un evaluador).
+
+    Uso:
+        python manage.py rebuild_result_summaries [--test ID]
+    """
+    help = 'Reconstruye el resumen de resultados de una o de todas las pruebas de diseño.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--test', type=int, help='ID de la prueba de diseño a reconstruir (por defecto, todas).')
+
+    def handle(self, *args, **options):
+        created = rebuild(options['test'])
+        self.stdout.write(self.style.SUCCESS('Resumen reconstruido: %d filas.' % created))
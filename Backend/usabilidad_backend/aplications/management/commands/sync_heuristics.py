@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from aplications.initial_data import cargar_datos_heuristicos, catalog_fingerprint
+
+
+# Comando para sincronizar el catálogo de heurísticas con la base de datos
+class Command(BaseCommand):
+    """
+    Sincroniza las heurísticas y subprincipios de 'heuristics_m.py' con la base de datos.
+
+    Si la huella del catálogo no ha cambiado desde la última sincronización no hace nada, salvo con '--force'.
+
+    Uso:
+        python manage.py sync_heuristics [--force]
+    """
+    help = 'Sincroniza el catálogo de heurísticas con la base de datos si su contenido cambió.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Sincroniza aunque la huella no haya cambiado.')
+
+    def handle(self, *args, **options):
+        stats = cargar_datos_heuristicos(force=options['force'])
+        if stats is None:
+            self.stdout.write('El catálogo ya está sincronizado (%s).' % catalog_fingerprint()[:12])
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            'Catálogo sincronizado (%s): %d heurísticas creadas, %d actualizadas; %d subprincipios creados, %d actualizados.' % (
+                catalog_fingerprint()[:12],
+                stats['heuristics_created'], stats['heuristics_updated'],
+                stats['subprinciples_created'], stats['subprinciples_updated'],
+            )
+        ))
@@ -0,0 +1,59 @@
+import sqlite3
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from aplications.db_router import REPLICA_DB_ALIAS
+from aplications.sqlite_tuning import apply_pragmas
+
+
+# Comando para mantener una réplica SQLite local copiando la base de datos primaria
+class Command(BaseCommand):
+    """
+    Sustituto local de la replicación de PostgreSQL para probar 'db_router' con dos archivos SQLite: copia la
+    base de datos primaria sobre la réplica (DB_REPLICA_NAME) con la API de copia de seguridad de SQLite, que
+    da una copia consistente aunque las dos estén en uso.
+
+    Con --interval repite la copia cada N segundos hasta que se interrumpe, lo que simula una réplica con un
+    retraso de hasta N segundos. Sin --interval copia una vez (por ejemplo, para crear la réplica).
+
+    Uso:
+        DB_REPLICA_NAME=replica.sqlite3 python manage.py sync_sqlite_replica
+        DB_REPLICA_NAME=replica.sqlite3 python manage.py sync_sqlite_replica --interval 2
+    """
+    help = 'Copia la base de datos SQLite primaria sobre la réplica, una vez o cada --interval segundos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help='Segundos entre copias (por defecto, una sola copia).')
+
+    def handle(self, *args, **options):
+        databases = settings.DATABASES
+        if REPLICA_DB_ALIAS not in databases:
+            raise CommandError('No hay réplica configurada; defina DB_REPLICA_NAME.')
+        if not all(databases[alias]['ENGINE'] == 'django.db.backends.sqlite3' for alias in (DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS)):
+            raise CommandError('La primaria y la réplica deben ser SQLite; en PostgreSQL use la replicación del servidor.')
+        primary, replica = str(databases[DEFAULT_DB_ALIAS]['NAME']), str(databases[REPLICA_DB_ALIAS]['NAME'])
+        if primary == replica:
+            raise CommandError('La réplica no puede ser el mismo archivo que la primaria.')
+
+        try:
+            while True:
+                start = time.perf_counter()
+                self._copy(primary, replica)
+                self.stdout.write('Réplica actualizada en %.0f ms.' % ((time.perf_counter() - start) * 1000))
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def _copy(self, primary, replica):
+        source = sqlite3.connect(primary)
+        target = sqlite3.connect(replica, timeout=30)
+        try:
+            # Mismo modo de diario que la primaria: en WAL, las lecturas de la réplica no bloquean la copia
+            apply_pragmas(target, {'journal_mode': source.execute('PRAGMA journal_mode').fetchone()[0]})
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,202 @@
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.db import connections
+from aplications import result_cache
+
+_lock = threading.Lock()
+_local = threading.local()  # Tiempo de serialización acumulado por la solicitud en curso
+_windows = {}  # (ruta, método) -> {métrica: deque con las últimas muestras}
+_totals = {}  # (ruta, método) -> Counter con la suma y el número de muestras de cada métrica
+_responses = Counter()  # (ruta, método, código de estado) -> número de respuestas
+
+# Métricas por solicitud: (nombre, nombre Prometheus, descripción)
+REQUEST_METRICS = (
+    ('wall', 'http_request_duration_seconds', 'Tiempo total de la solicitud en segundos.'),
+    ('queries', 'http_request_db_queries', 'Número de consultas SQL por solicitud.'),
+    ('db', 'http_request_db_duration_seconds', 'Tiempo total de SQL por solicitud en segundos.'),
+    ('render', 'http_request_serialization_seconds', 'Tiempo de serialización de la respuesta en segundos.'),
+    ('size', 'http_response_size_bytes', 'Tamaño de la respuesta en bytes.'),
+)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+# Contador de consultas SQL de una solicitud (se instala con 'connection.execute_wrapper')
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+# Función para sumar tiempo de serialización a la solicitud en curso
+def add_serialization_time(seconds):
+    """
+    Acumula tiempo de serialización en la solicitud que atiende el hilo actual. Fuera de una solicitud
+    medida por RequestMetricsMiddleware no hace nada.
+    """
+    if getattr(_local, 'render', None) is not None:
+        _local.render += seconds
+
+
+# Función para medir un bloque de serialización de la solicitud en curso
+@contextmanager
+def serialization_timer():
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_serialization_time(time.perf_counter() - start)
+
+
+# Middleware de métricas por solicitud
+class RequestMetricsMiddleware:
+    """
+    Mide cada solicitud y guarda las muestras en el proceso, agrupadas por la ruta de 'aplications/urls.py'
+    que la resolvió y por el método HTTP:
+
+    - Tiempo total.
+    - Número de consultas SQL y tiempo total de SQL (en todas las conexiones).
+    - Tiempo de serialización: el renderizado de las respuestas de DRF y el de 'render_json'.
+    - Tamaño de la respuesta.
+
+    Si METRICS_SERVER_TIMING está activo, añade la cabecera 'Server-Timing' con esas medidas, visible en las
+    herramientas de desarrollo del navegador. Las métricas se exponen en formato Prometheus en 'metrics/'.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'METRICS_SERVER_TIMING', True)
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        _local.render = 0.0
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(queries))
+                response = self.get_response(request)
+            wall = time.perf_counter() - start
+            render = _local.render
+        finally:
+            _local.render = None
+
+        size = 0 if response.streaming else len(response.content)
+        record(_route(request), request.method, response.status_code, {
+            'wall': wall, 'queries': queries.count, 'db': queries.duration, 'render': render, 'size': size,
+        })
+
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join([
+                'db;dur=%.2f;desc="%d consultas"' % (queries.duration * 1000, queries.count),
+                'render;dur=%.2f' % (render * 1000),
+                'app;dur=%.2f' % (max(wall - queries.duration - render, 0) * 1000),
+                'total;dur=%.2f' % (wall * 1000),
+            ])
+        return response
+
+    def process_template_response(self, request, response):
+        # Las respuestas de DRF se renderizan después de la vista: se mide hasta el final del renderizado
+        start = time.perf_counter()
+        response.add_post_render_callback(lambda rendered: add_serialization_time(time.perf_counter() - start))
+        return response
+
+
+# Función para obtener la ruta con la que se agrupan las métricas de una solicitud
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.route or match.view_name
+
+
+# Función para guardar las medidas de una solicitud
+def record(route, method, status_code, values):
+    """
+    Guarda las medidas de una solicitud en la ventana de las últimas METRICS_WINDOW muestras de su ruta y método.
+    """
+    key = (route, method)
+    with _lock:
+        windows = _windows.get(key)
+        if windows is None:
+            window = getattr(settings, 'METRICS_WINDOW', 1024)
+            windows = _windows[key] = {name: deque(maxlen=window) for name, _, _ in REQUEST_METRICS}
+            _totals[key] = Counter()
+        totals = _totals[key]
+        for name, value in values.items():
+            windows[name].append(value)
+            totals[name] += value
+        totals['count'] += 1
+        _responses[route, method, status_code] += 1
+
+
+# Función para calcular un cuantil (rango más cercano) de una lista ordenada
+def _quantile(ordered, quantile):
+    return ordered[max(0, math.ceil(quantile * len(ordered)) - 1)]
+
+
+def _labels(**labels):
+    escaped = ('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for name, value in labels.items())
+    return '{%s}' % ','.join(escaped)
+
+
+# Función para exportar las métricas en el formato de texto de Prometheus
+def render_prometheus():
+    """
+    Devuelve las métricas del proceso en el formato de texto de Prometheus (versión 0.0.4):
+
+    - Un 'summary' por medida con los cuantiles p50, p95 y p99 de la ventana móvil, y la suma y el número de
+      muestras acumulados desde que arrancó el proceso.
+    - El número de respuestas por ruta, método y código de estado.
+    - Los aciertos, fallos, escrituras, desalojos e invalidaciones de la caché de resultados.
+    """
+    with _lock:
+        windows = {key: {name: sorted(samples) for name, samples in value.items()} for key, value in _windows.items()}
+        totals = {key: Counter(value) for key, value in _totals.items()}
+        responses = dict(_responses)
+
+    lines = []
+    for name, metric, description in REQUEST_METRICS:
+        lines.append('# HELP %s %s' % (metric, description))
+        lines.append('# TYPE %s summary' % metric)
+        for (route, method), samples in sorted(windows.items()):
+            ordered = samples[name]
+            for quantile in QUANTILES:
+                if ordered:
+                    lines.append('%s%s %r' % (metric, _labels(route=route, method=method, quantile=quantile), float(_quantile(ordered, quantile))))
+            lines.append('%s_sum%s %r' % (metric, _labels(route=route, method=method), float(totals[route, method][name])))
+            lines.append('%s_count%s %d' % (metric, _labels(route=route, method=method), totals[route, method]['count']))
+
+    lines.append('# HELP http_responses_total Número de respuestas por ruta, método y código de estado.')
+    lines.append('# TYPE http_responses_total counter')
+    for (route, method, status_code), count in sorted(responses.items()):
+        lines.append('http_responses_total%s %d' % (_labels(route=route, method=method, status=status_code), count))
+
+    counters, entries = result_cache.stats()
+    for metric, description in (('hits', 'Aciertos'), ('misses', 'Fallos'), ('stores', 'Resultados guardados')):
+        lines.append('# HELP result_cache_%s_total %s de la caché de resultados por tipo.' % (metric, description))
+        lines.append('# TYPE result_cache_%s_total counter' % metric)
+        for (name, kind), count in sorted(counters.items(), key=lambda item: str(item[0])):
+            if name == metric:
+                lines.append('result_cache_%s_total%s %d' % (metric, _labels(kind=kind), count))
+    for metric, description in (('evictions', 'Entradas desalojadas'), ('invalidations', 'Invalidaciones por prueba')):
+        lines.append('# HELP result_cache_%s_total %s de la caché de resultados.' % (metric, description))
+        lines.append('# TYPE result_cache_%s_total counter' % metric)
+        lines.append('result_cache_%s_total %d' % (metric, counters.get((metric, None), 0)))
+    lines.append('# HELP result_cache_entries Entradas guardadas en la caché de resultados.')
+    lines.append('# TYPE result_cache_entries gauge')
+    lines.append('result_cache_entries %d' % entries)
+    return '\n'.join(lines) + '\n'
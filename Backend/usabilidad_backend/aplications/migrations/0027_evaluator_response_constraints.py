@@ -0,0 +1,52 @@
+from django.db import migrations, models
+
+
+def remove_duplicate_responses(apps, schema_editor):
+    """
+    Elimina las respuestas duplicadas antes de crear las restricciones de unicidad.
+
+    Para cada clave natural se conserva la fila con el ID más alto, que es la última respuesta que guardó el
+    evaluador; las demás se eliminan.
+    """
+    keys_by_model = [
+        ('EvaluatorStandardResponse', 'standard_response_id', ['test_id', 'evaluator_id', 'question_id']),
+        ('EvaluatorHeuristicResponse', 'heuristic_response_id', ['test_id', 'evaluator_id', 'question_id', 'subprinciple_id']),
+    ]
+    for model_name, pk_name, key_fields in keys_by_model:
+        model = apps.get_model('aplications', model_name)
+        seen = set()
+        duplicates = []
+        for row in model.objects.order_by('-' + pk_name).values_list(pk_name, *key_fields).iterator():
+            if row[1:] in seen:
+                duplicates.append(row[0])
+            else:
+                seen.add(row[1:])
+        for start in range(0, len(duplicates), 500):
+            model.objects.filter(**{pk_name + '__in': duplicates[start:start + 500]}).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplications', '0026_designtest_user_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_responses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='evaluatorstandardresponse',
+            constraint=models.UniqueConstraint(fields=('test', 'evaluator', 'question'), name='unique_standard_response'),
+        ),
+        migrations.AddIndex(
+            model_name='evaluatorstandardresponse',
+            index=models.Index(fields=['test', 'evaluator', 'is_complete'], name='std_resp_test_eval_done_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='evaluatorheuristicresponse',
+            constraint=models.UniqueConstraint(fields=('test', 'evaluator', 'question', 'subprinciple'), name='unique_heuristic_response'),
+        ),
+        migrations.AddIndex(
+            model_name='evaluatorheuristicresponse',
+            index=models.Index(fields=['test', 'evaluator', 'is_complete'], name='heur_resp_test_eval_done_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+import json
+from collections import Counter
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_result_summaries(apps, schema_editor):
+    """
+    Carga el resumen de resultados a partir de las respuestas completas que ya existen.
+
+    Se usa una copia de la lógica de 'result_summary.rebuild' con los modelos históricos de la migración.
+    """
+    ResultSummary = apps.get_model('aplications', 'ResultSummary')
+    EvaluatorHeuristicResponse = apps.get_model('aplications', 'EvaluatorHeuristicResponse')
+    EvaluatorStandardResponse = apps.get_model('aplications', 'EvaluatorStandardResponse')
+
+    distributions = {}
+    heuristic_rows = EvaluatorHeuristicResponse.objects.filter(is_complete=True).values_list(
+        'test_id', 'question_id', 'subprinciple_id', 'subprinciple__heuristic_id', 'score'
+    )
+    for test, question, subprinciple, heuristic, score in heuristic_rows.iterator():
+        distributions.setdefault((test, question, subprinciple, heuristic), Counter())[score] += 1
+    standard_rows = EvaluatorStandardResponse.objects.filter(is_complete=True).values_list('test_id', 'question_id', 'response_value')
+    for test, question, value in standard_rows.iterator():
+        distributions.setdefault((test, question, None, None), Counter())[value] += 1
+
+    objects = []
+    for (test, question, subprinciple, heuristic), distribution in distributions.items():
+        objects.append(ResultSummary(
+            test_id=test,
+            question_id=question,
+            subprinciple_id=subprinciple,
+            heuristic_id=heuristic,
+            count=sum(distribution.values()),
+            total=sum(value * count for value, count in distribution.items()),
+            sum_squares=sum(value * value * count for value, count in distribution.items()),
+            min_value=min(distribution),
+            max_value=max(distribution),
+            distribution=json.dumps({str(value): distribution[value] for value in sorted(distribution)}),
+        ))
+    ResultSummary.objects.bulk_create(objects, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplications', '0029_catalogfingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultSummary',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.BigIntegerField(default=0)),
+                ('sum_squares', models.BigIntegerField(default=0)),
+                ('min_value', models.IntegerField(blank=True, null=True)),
+                ('max_value', models.IntegerField(blank=True, null=True)),
+                ('distribution', models.TextField(default='{}')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('heuristic', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='aplications.Heuristic')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='aplications.DesignQuestion')),
+                ('subprinciple', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='aplications.Subprinciple')),
+                ('test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='result_summaries', to='aplications.DesignTest')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='resultsummary',
+            constraint=models.UniqueConstraint(condition=models.Q(subprinciple__isnull=False), fields=('test', 'question', 'subprinciple'), name='unique_summary_subprinciple'),
+        ),
+        migrations.AddConstraint(
+            model_name='resultsummary',
+            constraint=models.UniqueConstraint(condition=models.Q(subprinciple__isnull=True), fields=('test', 'question'), name='unique_summary_question'),
+        ),
+        migrations.RunPython(build_result_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_versions(apps, schema_editor):
+    """
+    Crea el contador de versión de las pruebas de diseño existentes; las nuevas lo crean al guardarse.
+    """
+    DesignTest = apps.get_model('aplications', 'DesignTest')
+    ResultCacheVersion = apps.get_model('aplications', 'ResultCacheVersion')
+    ResultCacheVersion.objects.bulk_create(
+        [ResultCacheVersion(test_id=test_id) for test_id in DesignTest.objects.values_list('test_id', flat=True).iterator()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplications', '0030_resultsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultCacheVersion',
+            fields=[
+                ('test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='result_cache_version', serialize=False, to='aplications.DesignTest')),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
@@ -53,11 +53,30 @@ class Subprinciple(models.Model):
         """
         return self.subtitle
     
+# Modelo para guardar la huella del catálogo cargado en la base de datos
+class CatalogFingerprint(models.Model):
+    name = models.CharField(max_length=50, unique=True)  # Nombre del catálogo (por ejemplo, 'heuristics')
+    fingerprint = models.CharField(max_length=64)  # Hash SHA-256 del contenido del catálogo sincronizado
+    updated_at = models.DateTimeField(auto_now=True)  # Fecha de la última sincronización
+
+    def __str__(self):
+        """
+        Devuelve una representación legible del modelo CatalogFingerprint.
+
+        Returns:
+            str: El nombre del catálogo y su huella.
+        """
+        return f"{self.name} ({self.fingerprint[:12]})"
+
 # Modelo para representar una captura de pantalla en la base de datos
 class Screenshot(models.Model):
     url = models.URLField(max_length=500)  # URL del prototipo a capturar pantalla (máximo 500 caracteres)
     image_path = models.CharField(max_length=255)  # Ruta del archivo de la imagen
     created_at = models.DateTimeField(auto_now_add=True)  # Fecha de creación de la captura de pantalla (automática)
+    cache_key = models.CharField(max_length=64, unique=True, null=True, blank=True)  # Hash de la URL normalizada y el viewport
+    viewport = models.CharField(max_length=20, blank=True, default='')  # Tamaño de la ventana usada en la captura (ancho x alto)
+    size = models.PositiveIntegerField(default=0)  # Tamaño del archivo en bytes
+    last_accessed = models.DateTimeField(default=timezone.now, db_index=True)  # Último uso de la captura (para el desalojo LRU)
 
     def __str__(self):
         """
@@ -184,6 +203,16 @@ class EvaluatorStandardResponse(models.Model):
     test = models.ForeignKey('DesignTest', on_delete=models.CASCADE)  # Relación con la prueba de diseño
     question = models.ForeignKey('DesignQuestion', on_delete=models.CASCADE)  # Relación con la pregunta
 
+    class Meta:
+        constraints = [
+            # Una sola respuesta por evaluador y pregunta dentro de una prueba (clave natural del upsert)
+            models.UniqueConstraint(fields=['test', 'evaluator', 'question'], name='unique_standard_response'),
+        ]
+        indexes = [
+            # Consultas de respuestas completas por prueba y evaluador
+            models.Index(fields=['test', 'evaluator', 'is_complete'], name='std_resp_test_eval_done_idx'),
+        ]
+
     def __str__(self):
         """
         Devuelve una representación legible del modelo EvaluatorStandardResponse.
@@ -208,6 +237,16 @@ class EvaluatorHeuristicResponse(models.Model):
     evaluator = models.ForeignKey('User', on_delete=models.CASCADE)  # Relación con el evaluador que dio la respuesta
     subprinciple = models.ForeignKey('Subprinciple', on_delete=models.CASCADE)  # Relación con el subprincipio evaluado
 
+    class Meta:
+        constraints = [
+            # Una sola respuesta por evaluador, pregunta y subprincipio dentro de una prueba (clave natural del upsert)
+            models.UniqueConstraint(fields=['test', 'evaluator', 'question', 'subprinciple'], name='unique_heuristic_response'),
+        ]
+        indexes = [
+            # Consultas de respuestas completas por prueba y evaluador
+            models.Index(fields=['test', 'evaluator', 'is_complete'], name='heur_resp_test_eval_done_idx'),
+        ]
+
     def __str__(self):
         """
         Devuelve una representación legible del modelo EvaluatorHeuristicResponse.
@@ -217,7 +256,72 @@ class EvaluatorHeuristicResponse(models.Model):
         """
         return f"Respuesta de -> {self.evaluator.username} para la prueba de diseño {self.test.name}"
 
-    
+
+# Modelo para guardar el resumen precalculado de las respuestas completas de una prueba de diseño
+class ResultSummary(models.Model):
+    id = models.AutoField(primary_key=True)  # Llave primaria que se genera automáticamente
+    count = models.PositiveIntegerField(default=0)  # Número de respuestas completas
+    total = models.BigIntegerField(default=0)  # Suma de los puntajes
+    sum_squares = models.BigIntegerField(default=0)  # Suma de los cuadrados de los puntajes (para la desviación estándar)
+    min_value = models.IntegerField(null=True, blank=True)  # Puntaje mínimo (None si no hay respuestas)
+    max_value = models.IntegerField(null=True, blank=True)  # Puntaje máximo (None si no hay respuestas)
+    distribution = models.TextField(default='{}')  # Distribución de los puntajes en JSON: {"puntaje": cantidad}
+    updated_at = models.DateTimeField(auto_now=True)  # Fecha de la última actualización
+
+    test = models.ForeignKey('DesignTest', on_delete=models.CASCADE, related_name='result_summaries')  # Relación con la prueba de diseño
+    question = models.ForeignKey('DesignQuestion', on_delete=models.CASCADE)  # Relación con la pregunta
+    heuristic = models.ForeignKey('Heuristic', on_delete=models.CASCADE, null=True, blank=True)  # Heurística del subprincipio (solo pruebas con heurísticas)
+    subprinciple = models.ForeignKey('Subprinciple', on_delete=models.CASCADE, null=True, blank=True)  # Subprincipio (solo pruebas con heurísticas)
+
+    class Meta:
+        constraints = [
+            # Una fila por pregunta y subprincipio en las pruebas con heurísticas, y una por pregunta en las demás
+            models.UniqueConstraint(fields=['test', 'question', 'subprinciple'], condition=models.Q(subprinciple__isnull=False), name='unique_summary_subprinciple'),
+            models.UniqueConstraint(fields=['test', 'question'], condition=models.Q(subprinciple__isnull=True), name='unique_summary_question'),
+        ]
+
+    @property
+    def mean(self):
+        """
+        Devuelve el promedio de los puntajes, o None si no hay respuestas.
+        """
+        return self.total / self.count if self.count else None
+
+    @property
+    def std(self):
+        """
+        Devuelve la desviación estándar poblacional de los puntajes, o None si no hay respuestas.
+        """
+        if not self.count:
+            return None
+        variance = self.sum_squares / self.count - (self.total / self.count) ** 2
+        return max(variance, 0) ** 0.5
+
+    def __str__(self):
+        """
+        Devuelve una representación legible del modelo ResultSummary.
+
+        Returns:
+            str: La prueba, la pregunta y el subprincipio resumidos.
+        """
+        return f"Resumen de la prueba {self.test_id}, pregunta {self.question_id}, subprincipio {self.subprinciple_id}"
+
+
+# Modelo para guardar la versión de los resultados de una prueba de diseño (invalida la caché de resultados)
+class ResultCacheVersion(models.Model):
+    test = models.OneToOneField('DesignTest', on_delete=models.CASCADE, primary_key=True, related_name='result_cache_version')  # Prueba de diseño
+    version = models.PositiveIntegerField(default=0)  # Se incrementa cada vez que cambian los resultados de la prueba
+
+    def __str__(self):
+        """
+        Devuelve una representación legible del modelo ResultCacheVersion.
+
+        Returns:
+            str: La prueba y la versión de sus resultados.
+        """
+        return f"Resultados de la prueba {self.test_id}, versión {self.version}"
+
+
 #////////////////////////////////////////////////////////////////////////////////////////////////////////////////
 
 class HeuristicOwner(models.Model):
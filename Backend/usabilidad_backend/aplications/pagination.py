@@ -0,0 +1,130 @@
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from aplications.fast_serializers import FastSerializer, render_json
+
+
+# Paginación por cursor (keyset) para los listados
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor de DRF: cada página se obtiene con 'WHERE <orden> > <último valor>' en lugar de
+    OFFSET, por lo que su coste no crece con el número de la página.
+
+    La respuesta paginada tiene la forma {"next": url | null, "previous": url | null, "results": [...]}.
+
+    Parámetros de la consulta:
+    - cursor: Cursor opaco devuelto en 'next' o 'previous'.
+    - page_size: Tamaño de la página (máximo PAGINATION_MAX_PAGE_SIZE).
+    """
+    page_size = getattr(settings, 'PAGINATION_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 500)
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+
+# Función para saber si el cliente pidió una respuesta paginada
+def wants_pagination(request):
+    """
+    Los listados solo se paginan si la consulta incluye 'cursor' o 'page_size', para no cambiar la forma
+    de la respuesta (una lista) que espera el frontend actual.
+    """
+    return 'cursor' in request.query_params or 'page_size' in request.query_params
+
+
+# Función para leer la proyección de campos pedida con '?fields='
+def requested_fields(request, serializer):
+    """
+    Devuelve los campos legibles del serializer que se deben incluir en la respuesta, en el orden del serializer:
+    los indicados en '?fields=a,b' o, si no se indica, todos. Los campos de solo escritura (como la contraseña
+    del usuario) nunca se incluyen.
+
+    Raises:
+        ValueError: Si se pide un campo que no existe o no es legible.
+    """
+    readable = [name for name, field in serializer.fields.items() if not field.write_only]
+    # Sin nombres de campo ('?fields=' o '?fields=,') no hay proyección: se devuelven todos
+    fields = {name.strip() for name in request.query_params.get('fields', '').split(',') if name.strip()}
+    if not fields:
+        return readable
+
+    unknown = sorted(fields.difference(readable))
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}. Campos disponibles: {', '.join(readable)}.")
+    return [name for name in readable if name in fields]
+
+
+# Función para cargar de la base de datos solo las columnas de los campos pedidos
+def project_queryset(queryset, serializer, fields):
+    """
+    Aplica '.only()' con las columnas de 'fields' y 'prefetch_related' con sus relaciones muchos a muchos,
+    de modo que la base de datos no devuelva columnas que no se van a serializar.
+    """
+    model_fields = {field.name: field for field in queryset.model._meta.get_fields()}
+    columns, many_to_many = [], []
+    for name in fields:
+        model_field = model_fields.get(serializer.fields[name].source)
+        if model_field is None:
+            continue
+        if model_field.many_to_many:
+            many_to_many.append(model_field.name)
+        elif model_field.concrete:
+            columns.append(model_field.name)
+    return queryset.only(*columns).prefetch_related(*many_to_many)
+
+
+# Función para responder un listado con proyección de campos y paginación por cursor
+def list_response(request, queryset, serializer_class, fast=False):
+    """
+    Serializa 'queryset' aplicando '?fields=' y, si se pide, la paginación por cursor (ordenada por la llave primaria).
+
+    Parámetros:
+    - fast: Si es verdadero, usa la serialización rápida a partir de '.values()' (ver 'fast_serializers')
+      en lugar de 'serializer_class'; el resultado es el mismo.
+
+    Returns:
+        - Sin paginación: la lista de elementos, como hasta ahora.
+        - Con '?page_size=' o '?cursor=': {"next": ..., "previous": ..., "results": [...]}.
+        - 400 si '?fields=' contiene campos desconocidos y 404 si '?cursor=' no es válido.
+    """
+    try:
+        fields = requested_fields(request, serializer_class())
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    pk_name = queryset.model._meta.pk.name
+    if fast:
+        fast_serializer = FastSerializer(serializer_class, fields)
+        queryset = fast_serializer.values(queryset)
+    else:
+        queryset = project_queryset(queryset, serializer_class(), fields)
+
+    paginator = None
+    if wants_pagination(request):
+        paginator = KeysetPagination(ordering=pk_name)
+        try:
+            queryset = paginator.paginate_queryset(queryset, request)
+        except APIException as e:
+            # Cursor inválido (404 de DRF): se responde aquí para que el 'except Exception' de las vistas no lo convierta en 500
+            return Response({"error": str(e.detail)}, status=e.status_code)
+    elif not queryset.ordered:
+        queryset = queryset.order_by(pk_name)
+
+    if fast:
+        data = fast_serializer.build(queryset)
+        if paginator is not None:
+            data = {'next': paginator.get_next_link(), 'previous': paginator.get_previous_link(), 'results': data}
+        return render_json(data)
+
+    serializer = serializer_class(queryset, many=True)
+    for name in list(serializer.child.fields):
+        if name not in fields:
+            serializer.child.fields.pop(name)
+
+    if paginator is not None:
+        return paginator.get_paginated_response(serializer.data)
+    return JsonResponse(serializer.data, safe=False)
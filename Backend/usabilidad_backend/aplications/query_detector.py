@@ -0,0 +1,170 @@
+import logging
+import re
+import sysconfig
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Sentencias de control de transacciones que no se consideran repetidas
+IGNORED_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT', 'ROLLBACK')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'\bVALUES\s*\(.*?\)(?:\s*,\s*\(.*?\))*', re.IGNORECASE | re.DOTALL)
+_SPACES = re.compile(r'\s+')
+_LIBRARY_PATHS = tuple({sysconfig.get_paths()[name] for name in ('stdlib', 'purelib', 'platlib')})
+
+
+# Excepción que se lanza cuando QUERY_DETECTOR_RAISE está activo y el detector encuentra consultas repetidas
+class NPlusOneDetected(Exception):
+    pass
+
+
+# Función para obtener la huella de una sentencia SQL
+def fingerprint(sql):
+    """
+    Normaliza una sentencia SQL para agrupar las ejecuciones que solo se diferencian en sus valores:
+    sustituye las cadenas, los números y los parámetros por '?', y reduce las listas de 'IN (...)' y de
+    'VALUES (...)' a un solo elemento, de modo que la misma consulta con distinto número de IDs tiene la
+    misma huella.
+
+    Ejemplo:
+        SELECT ... WHERE "question_id" = 12 AND "test_id" IN (1, 2, 3)
+        -> SELECT ... WHERE "question_id" = ? AND "test_id" IN (...)
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _VALUES_LIST.sub('VALUES (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+# Función para obtener la pila de llamadas de la aplicación en el punto donde se ejecuta una consulta
+def _application_stack():
+    """
+    Devuelve las líneas de la pila que pertenecen al proyecto: se omiten la biblioteca estándar, las
+    dependencias instaladas (Django, DRF) y este módulo. Si no queda ninguna, devuelve la pila completa.
+    """
+    stack = traceback.extract_stack()
+    frames = [frame for frame in stack
+              if not frame.filename.startswith(_LIBRARY_PATHS) and frame.filename != __file__]
+    return traceback.format_list(frames or stack)
+
+
+# Consultas ejecutadas durante una solicitud, agrupadas por huella (se instala con 'connection.execute_wrapper')
+class QueryRecorder:
+    def __init__(self, label, slow_ms=None):
+        self.label = label
+        self.slow_ms = slow_ms
+        self.fingerprints = {}  # huella -> {'count', 'duration', 'sql', 'stack'}
+        self.slow = []  # [(duración en ms, sql, pila)]
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.count += 1
+            if not sql.lstrip().upper().startswith(IGNORED_STATEMENTS):
+                key = fingerprint(sql)
+                entry = self.fingerprints.get(key)
+                if entry is None:
+                    # Solo se guarda la pila de la primera ejecución de cada huella
+                    entry = self.fingerprints[key] = {'count': 0, 'duration': 0.0, 'sql': sql, 'stack': _application_stack()}
+                entry['count'] += 1
+                entry['duration'] += duration
+                if self.slow_ms is not None and duration >= self.slow_ms:
+                    self.slow.append((duration, sql, entry['stack'] if entry['count'] == 1 else _application_stack()))
+
+    def repeated(self, threshold):
+        """
+        Devuelve [(huella, datos)] de las huellas que se ejecutaron más de 'threshold' veces, de la más
+        repetida a la menos.
+        """
+        items = [(key, entry) for key, entry in self.fingerprints.items() if entry['count'] > threshold]
+        return sorted(items, key=lambda item: -item[1]['count'])
+
+    def report(self, threshold):
+        """
+        Devuelve el informe en texto de las consultas repetidas y lentas, o None si no hay nada que señalar.
+        """
+        repeated = self.repeated(threshold)
+        if not repeated and not self.slow:
+            return None
+
+        lines = ['%s: %d consultas, %d repetidas más de %d veces, %d lentas' % (self.label, self.count, len(repeated), threshold, len(self.slow))]
+        for key, entry in repeated:
+            lines.append('  [%d veces, %.1f ms] %s' % (entry['count'], entry['duration'], key))
+            lines.append('    Primera ejecución:')
+            lines.extend('    ' + line.rstrip('\n').replace('\n', '\n    ') for line in entry['stack'])
+        for duration, sql, stack in self.slow:
+            lines.append('  [lenta, %.1f ms] %s' % (duration, _SPACES.sub(' ', sql).strip()))
+            lines.extend('    ' + line.rstrip('\n').replace('\n', '\n    ') for line in stack)
+        return '\n'.join(lines)
+
+
+# Función para detectar consultas repetidas y lentas en un bloque de código
+@contextmanager
+def detect_queries(label, threshold=None, slow_ms=None, raise_on_detect=None):
+    """
+    Registra las consultas que se ejecutan en el bloque (en todas las conexiones) y, al salir, escribe en el
+    log un informe con las huellas que se repitieron más de 'threshold' veces y las consultas que tardaron
+    más de 'slow_ms' milisegundos, con la pila de la aplicación de su primera ejecución.
+
+    Los valores por defecto salen de QUERY_DETECTOR_THRESHOLD, QUERY_DETECTOR_SLOW_MS y QUERY_DETECTOR_RAISE.
+    Si 'raise_on_detect' es verdadero y hay consultas repetidas, lanza NPlusOneDetected con el informe, lo que
+    permite hacer fallar un script o una prueba.
+
+    Ejemplo:
+        with detect_queries('resultados', threshold=3):
+            client.get('/api/designtests/1/evaluatorheuristicresponsesfinalize/')
+    """
+    if threshold is None:
+        threshold = getattr(settings, 'QUERY_DETECTOR_THRESHOLD', 5)
+    if slow_ms is None:
+        slow_ms = getattr(settings, 'QUERY_DETECTOR_SLOW_MS', None)
+    if raise_on_detect is None:
+        raise_on_detect = getattr(settings, 'QUERY_DETECTOR_RAISE', False)
+
+    recorder = QueryRecorder(label, slow_ms)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+    report = recorder.report(threshold)
+    if report is not None:
+        logger.warning(report)
+        if raise_on_detect and recorder.repeated(threshold):
+            raise NPlusOneDetected(report)
+
+
+# Middleware que detecta consultas N+1 y lentas en cada solicitud (desarrollo y pruebas)
+class QueryDetectorMiddleware:
+    """
+    Aplica 'detect_queries' a cada solicitud, con el nombre de la vista que la atendió y la ruta como etiqueta,
+    sin modificar las vistas. Solo está activo si QUERY_DETECTOR_ENABLED es verdadero (por defecto, en DEBUG).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_DETECTOR_ENABLED', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with detect_queries(request.path) as recorder:
+            response = self.get_response(request)
+            # La etiqueta se completa cuando ya se conoce la vista que resolvió la solicitud
+            match = getattr(request, 'resolver_match', None)
+            recorder.label = '%s %s (%s)' % (request.method, request.path, match.view_name if match else 'sin vista')
+        return response
@@ -0,0 +1,238 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+from aplications.models import EvaluatorAccess, ResultCacheVersion
+
+_lock = threading.Lock()
+_store = None
+_stats = Counter()  # (métrica, tipo de resultado) -> número de veces
+
+
+# Almacén de resultados en la memoria del proceso
+class LocMemResultStore:
+    """
+    Guarda los resultados renderizados en un diccionario ordenado del proceso, con desalojo LRU cuando se superan
+    'max_entries' entradas. Cada proceso del servidor tiene su propia copia.
+    """
+
+    def __init__(self, max_entries=256, **options):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Devuelve (versión, contenido) o None, y marca la entrada como la más reciente.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, version, body):
+        """
+        Guarda el contenido de 'key' y devuelve el número de entradas desalojadas.
+        """
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Almacén de resultados en archivos, compartido por los procesos del servidor
+class FileResultStore:
+    """
+    Guarda cada resultado renderizado en un archivo de 'location' (la primera línea es la versión). La fecha de
+    modificación del archivo se actualiza en cada acierto y se usa para el desalojo LRU cuando se superan
+    'max_entries' archivos.
+    """
+
+    def __init__(self, location, max_entries=256, **options):
+        self.location = location
+        self.max_entries = max_entries
+        os.makedirs(location, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.location, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.bin')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as stored:
+                version, _, body = stored.read().partition(b'\n')
+            os.utime(path)  # Marca la entrada como la más reciente
+        except FileNotFoundError:
+            return None
+        return version.decode('utf-8'), body
+
+    def set(self, key, version, body):
+        # Escritura atómica: archivo temporal en la misma carpeta y renombrado
+        descriptor, temporary = tempfile.mkstemp(dir=self.location, suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as stored:
+            stored.write(str(version).encode('utf-8') + b'\n' + body)
+        os.replace(temporary, self._path(key))
+
+        entries = [entry for entry in os.scandir(self.location) if entry.name.endswith('.bin')]
+        evicted = 0
+        if len(entries) > self.max_entries:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - self.max_entries]:
+                try:
+                    os.remove(entry.path)
+                    evicted += 1
+                except FileNotFoundError:
+                    pass
+        return evicted
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for entry in os.scandir(self.location):
+            if entry.name.endswith('.bin'):
+                os.remove(entry.path)
+
+    def __len__(self):
+        return sum(1 for entry in os.scandir(self.location) if entry.name.endswith('.bin'))
+
+
+# Función para obtener el almacén configurado en RESULT_CACHE_BACKEND
+def get_store():
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                backend = import_string(getattr(settings, 'RESULT_CACHE_BACKEND', 'aplications.result_cache.LocMemResultStore'))
+                _store = backend(**getattr(settings, 'RESULT_CACHE_OPTIONS', {}))
+    return _store
+
+
+# Función para obtener la versión actual de los resultados de una prueba de diseño
+def get_version(design_test):
+    """
+    Devuelve la versión de los resultados de la prueba, con una consulta.
+
+    Incluye la fecha de creación de la prueba para que una prueba nueva que reutilice el ID de una eliminada
+    no encuentre los resultados de la anterior.
+
+    No escribe: una prueba sin contador tiene la versión 0. El contador se crea con la prueba
+    ('invalidate_design_test') o en la primera invalidación ('bump'), así que las vistas de solo lectura no
+    escriben en la base de datos.
+    """
+    version = ResultCacheVersion.objects.filter(test_id=design_test.test_id).values_list('version', flat=True).first()
+    return '%s:%s' % (design_test.created_at.timestamp(), version or 0)
+
+
+# Función para invalidar los resultados guardados de varias pruebas de diseño
+def bump(test_ids, create=True):
+    """
+    Incrementa la versión de los resultados de las pruebas indicadas. Las entradas guardadas con la versión
+    anterior dejan de usarse y el almacén las sustituye o las desaloja.
+
+    Se ejecuta en la transacción de la escritura que cambia los resultados, de modo que una lectura nunca ve
+    los datos nuevos con la versión antigua.
+
+    Con 'create=True' se crea el contador de las pruebas que aún no lo tienen (empieza en 0 y pasa a 1).
+    Con 'create=False' solo se actualizan los contadores existentes. Es lo que usan los borrados: al eliminar una
+    prueba, el borrado en cascada de sus preguntas y accesos no debe volver a crear el contador de la prueba
+    que se está eliminando. Todas las pruebas tienen contador desde su creación (ver 'invalidate_design_test'
+    y la migración 0031), de modo que estas invalidaciones siempre encuentran la fila.
+    """
+    test_ids = {test_id for test_id in test_ids if test_id is not None}
+    if not test_ids:
+        return
+    with transaction.atomic():
+        if create:
+            ResultCacheVersion.objects.bulk_create([ResultCacheVersion(test_id=test_id) for test_id in test_ids], ignore_conflicts=True)
+        ResultCacheVersion.objects.filter(test_id__in=test_ids).update(version=F('version') + 1)
+    with _lock:
+        _stats['invalidations', None] += len(test_ids)
+
+
+# Función para leer un resultado renderizado de la caché
+def read(kind, test_id, version):
+    """
+    Devuelve el contenido guardado para (kind, test_id) si su versión coincide con 'version', o None.
+
+    Args:
+        kind (str): Tipo de resultado (por ejemplo 'heuristic_results').
+        test_id (int): ID de la prueba de diseño.
+        version (str): Versión actual (ver 'get_version').
+    """
+    entry = get_store().get('%s:%s' % (kind, test_id))
+    hit = entry is not None and entry[0] == version
+    with _lock:
+        _stats['hits' if hit else 'misses', kind] += 1
+    return entry[1] if hit else None
+
+
+# Función para guardar un resultado renderizado en la caché
+def write(kind, test_id, version, body):
+    """
+    Guarda 'body' (bytes) para (kind, test_id) con la versión indicada, sustituyendo a la versión anterior.
+
+    Returns:
+        bytes: El mismo contenido, para poder devolverlo directamente.
+    """
+    evicted = get_store().set('%s:%s' % (kind, test_id), version, body)
+    with _lock:
+        _stats['stores', kind] += 1
+        _stats['evictions', None] += evicted
+    return body
+
+
+# Función para obtener los contadores de la caché de resultados
+def stats():
+    """
+    Devuelve los contadores acumulados en el proceso como {(métrica, tipo): valor} y el número de entradas
+    guardadas en el almacén.
+    """
+    with _lock:
+        counters = dict(_stats)
+    return counters, len(get_store())
+
+
+# Receptores de señales que invalidan los resultados (se conectan en 'AplicationsConfig.ready')
+def invalidate_design_test(sender, instance, created=False, **kwargs):
+    if created:
+        ResultCacheVersion.objects.create(test_id=instance.pk)  # Contador de la prueba nueva (versión 0)
+    else:
+        bump([instance.pk])
+
+
+def invalidate_question(sender, instance, **kwargs):
+    bump([instance.test_id_id], create='created' in kwargs)  # post_save incluye 'created'; post_delete no
+
+
+def invalidate_access(sender, instance, **kwargs):
+    bump([instance.test_id_id], create='created' in kwargs)
+
+
+def invalidate_user(sender, instance, created=False, **kwargs):
+    if not created:  # El nombre y el correo del evaluador aparecen en los resultados
+        bump(EvaluatorAccess.objects.filter(evaluator_id=instance.pk).values_list('test_id', flat=True))
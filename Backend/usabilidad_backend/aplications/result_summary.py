@@ -0,0 +1,249 @@
+import json
+from collections import Counter
+from django.db import transaction
+from django.utils import timezone
+from aplications.models import (
+    DesignTest, EvaluatorHeuristicResponse, EvaluatorStandardResponse, ResultSummary, Subprinciple
+)
+
+
+# Función para convertir la distribución guardada en JSON en un contador de puntajes
+def _load_distribution(text):
+    return Counter({int(value): count for value, count in json.loads(text or '{}').items()})
+
+
+# Función para convertir un contador de puntajes en el JSON que se guarda
+def _dump_distribution(distribution):
+    return json.dumps({str(value): distribution[value] for value in sorted(distribution) if distribution[value]})
+
+
+# Función para recalcular las columnas de una fila de resumen a partir de su distribución
+def _fill_from_distribution(summary, distribution):
+    """
+    El conteo, la suma, la suma de cuadrados, el mínimo y el máximo se derivan de la distribución de puntajes,
+    de modo que restar una contribución también corrige el mínimo y el máximo.
+    """
+    distribution = +distribution  # Descartar los puntajes que ya no tienen respuestas
+    summary.count = sum(distribution.values())
+    summary.total = sum(value * count for value, count in distribution.items())
+    summary.sum_squares = sum(value * value * count for value, count in distribution.items())
+    summary.min_value = min(distribution) if distribution else None
+    summary.max_value = max(distribution) if distribution else None
+    summary.distribution = _dump_distribution(distribution)
+
+
+# Función para aplicar al resumen los cambios de las respuestas completas de un evaluador
+def apply_changes(test_id, removed, added):
+    """
+    Actualiza de forma incremental las filas de 'ResultSummary' de una prueba de diseño.
+
+    Debe llamarse dentro de la misma transacción que escribe las respuestas. La fila de la prueba se bloquea
+    ('SELECT ... FOR UPDATE') para que dos evaluadores que finalizan a la vez no pisen el mismo resumen.
+
+    Args:
+        test_id (int): ID de la prueba de diseño.
+        removed (iterable[tuple]): Contribuciones que dejan de contar, como tuplas
+            ((question_id, subprinciple_id), valor). 'subprinciple_id' es None en las pruebas sin heurísticas.
+        added (iterable[tuple]): Contribuciones nuevas, con la misma forma.
+
+    Returns:
+        int: Número de filas de resumen creadas, actualizadas o eliminadas.
+    """
+    changes = {}
+    for key, value in removed:
+        changes.setdefault(key, Counter())[int(value)] -= 1
+    for key, value in added:
+        changes.setdefault(key, Counter())[int(value)] += 1
+    changes = {key: delta for key, delta in changes.items() if any(delta.values())}
+    if not changes:
+        return 0
+
+    with transaction.atomic():
+        list(DesignTest.objects.select_for_update().filter(test_id=test_id).values_list('test_id'))
+
+        question_ids = {question_id for question_id, _ in changes}
+        subprinciple_ids = {subprinciple_id for _, subprinciple_id in changes if subprinciple_id is not None}
+        summaries = ResultSummary.objects.filter(test_id=test_id, question_id__in=question_ids)
+        if subprinciple_ids:
+            summaries = summaries.filter(subprinciple_id__in=subprinciple_ids)
+        else:
+            summaries = summaries.filter(subprinciple__isnull=True)
+        current = {(summary.question_id, summary.subprinciple_id): summary for summary in summaries}
+
+        # La heurística de cada subprincipio solo hace falta para las filas nuevas
+        missing = {subprinciple_id for question_id, subprinciple_id in changes
+                   if subprinciple_id is not None and (question_id, subprinciple_id) not in current}
+        heuristic_ids = dict(Subprinciple.objects.filter(id__in=missing).values_list('id', 'heuristic_id')) if missing else {}
+
+        now = timezone.now()  # 'bulk_update' no aplica 'auto_now'
+        to_create, to_update, to_delete = [], [], []
+        for (question_id, subprinciple_id), delta in changes.items():
+            summary = current.get((question_id, subprinciple_id))
+            if summary is None:
+                summary = ResultSummary(
+                    test_id=test_id, question_id=question_id, subprinciple_id=subprinciple_id,
+                    heuristic_id=heuristic_ids.get(subprinciple_id)
+                )
+                distribution = delta
+            else:
+                distribution = _load_distribution(summary.distribution)
+                distribution.update(delta)
+
+            _fill_from_distribution(summary, distribution)
+            summary.updated_at = now
+            if summary.pk is None:
+                if summary.count:
+                    to_create.append(summary)
+            elif summary.count:
+                to_update.append(summary)
+            else:
+                to_delete.append(summary.pk)
+
+        ResultSummary.objects.bulk_create(to_create)
+        ResultSummary.objects.bulk_update(
+            to_update, ['count', 'total', 'sum_squares', 'min_value', 'max_value', 'distribution', 'updated_at']
+        )
+        if to_delete:
+            ResultSummary.objects.filter(pk__in=to_delete).delete()
+
+    return len(to_create) + len(to_update) + len(to_delete)
+
+
+# Función para reconstruir desde cero el resumen de una o de todas las pruebas de diseño
+def rebuild(test_id=None):
+    """
+    Vuelve a calcular 'ResultSummary' a partir de las respuestas completas guardadas.
+
+    Las escrituras de respuestas mantienen el resumen al día (ver 'bulk_writers'); esta función solo hace falta
+    para cargar los datos existentes o corregir el resumen después de borrar respuestas directamente
+    (por ejemplo, al eliminar un usuario evaluador).
+
+    Args:
+        test_id (int | None): ID de la prueba a reconstruir, o None para todas.
+
+    Returns:
+        int: Número de filas de resumen creadas.
+    """
+    heuristic_responses = EvaluatorHeuristicResponse.objects.filter(is_complete=True)
+    standard_responses = EvaluatorStandardResponse.objects.filter(is_complete=True)
+    summaries = ResultSummary.objects.all()
+    if test_id is not None:
+        heuristic_responses = heuristic_responses.filter(test_id=test_id)
+        standard_responses = standard_responses.filter(test_id=test_id)
+        summaries = summaries.filter(test_id=test_id)
+
+    distributions = {}
+    for test, question, subprinciple, heuristic, score in heuristic_responses.values_list(
+            'test_id', 'question_id', 'subprinciple_id', 'subprinciple__heuristic_id', 'score').iterator():
+        distributions.setdefault((test, question, subprinciple, heuristic), Counter())[score] += 1
+    for test, question, value in standard_responses.values_list('test_id', 'question_id', 'response_value').iterator():
+        distributions.setdefault((test, question, None, None), Counter())[value] += 1
+
+    objects = []
+    for (test, question, subprinciple, heuristic), distribution in distributions.items():
+        summary = ResultSummary(test_id=test, question_id=question, subprinciple_id=subprinciple, heuristic_id=heuristic)
+        _fill_from_distribution(summary, distribution)
+        objects.append(summary)
+
+    with transaction.atomic():
+        summaries.delete()
+        ResultSummary.objects.bulk_create(objects, batch_size=500)
+    return len(objects)
+
+
+# Función para convertir las columnas acumuladas en estadísticas legibles
+def _stats(count, total, sum_squares, distribution):
+    mean = total / count if count else None
+    std = max(sum_squares / count - mean * mean, 0) ** 0.5 if count else None
+    return {
+        "count": count,
+        "mean": mean,
+        "std": std,
+        "min": min(distribution) if distribution else None,
+        "max": max(distribution) if distribution else None,
+        "distribution": {str(value): distribution[value] for value in sorted(distribution)},
+    }
+
+
+# Función para construir el resumen de resultados de una prueba de diseño
+def build_summary(design_test, questions):
+    """
+    Construye el resumen estadístico de una prueba de diseño a partir de 'ResultSummary', con una sola consulta
+    y un coste proporcional a preguntas × subprincipios (no al número de evaluadores).
+
+    - Pruebas con heurísticas: por pregunta, cada heurística con sus estadísticas agregadas y las de sus subprincipios.
+    - Pruebas sin heurísticas: por pregunta, las estadísticas de la respuesta estándar.
+
+    Args:
+        design_test (DesignTest): Prueba de diseño.
+        questions (list[DesignQuestion]): Preguntas de la prueba, en el orden en que se devuelven.
+
+    Returns:
+        dict: Resumen con las estadísticas de cada pregunta.
+    """
+    summaries = (
+        ResultSummary.objects
+        .filter(test_id=design_test.test_id)
+        .select_related('heuristic', 'subprinciple')
+        .order_by('question_id', 'heuristic__code', 'subprinciple__code')
+    )
+
+    by_question = {}
+    for summary in summaries:
+        by_question.setdefault(summary.question_id, []).append(summary)
+
+    response_data = {
+        "test_id": design_test.test_id,
+        "name": design_test.name,
+        "has_heuristics": design_test.has_heuristics,
+        "questions": []
+    }
+
+    for question in questions:
+        rows = by_question.get(question.question_id, [])
+        question_data = {"question_id": question.question_id, "title": question.title}
+
+        if not design_test.has_heuristics:
+            row = next((row for row in rows if row.subprinciple_id is None), None)
+            distribution = _load_distribution(row.distribution) if row else Counter()
+            question_data["response_type"] = question.response_type
+            question_data.update(_stats(row.count if row else 0, row.total if row else 0, row.sum_squares if row else 0, distribution))
+            response_data["questions"].append(question_data)
+            continue
+
+        heuristics = {}
+        for row in rows:
+            if row.subprinciple_id is None:
+                continue
+            distribution = _load_distribution(row.distribution)
+            heuristic = heuristics.get(row.heuristic_id)
+            if heuristic is None:
+                heuristic = heuristics[row.heuristic_id] = {
+                    "heuristic_code": row.heuristic.code if row.heuristic else None,
+                    "heuristic_title": row.heuristic.title if row.heuristic else None,
+                    "totals": [0, 0, 0, Counter()],
+                    "subprinciples": []
+                }
+            totals = heuristic["totals"]
+            totals[0] += row.count
+            totals[1] += row.total
+            totals[2] += row.sum_squares
+            totals[3].update(distribution)
+
+            subprinciple_data = {
+                "subprinciple_code": row.subprinciple.code,
+                "subprinciple_subtitle": row.subprinciple.subtitle,
+            }
+            subprinciple_data.update(_stats(row.count, row.total, row.sum_squares, distribution))
+            heuristic["subprinciples"].append(subprinciple_data)
+
+        question_data["heuristics"] = []
+        for heuristic in heuristics.values():
+            totals = heuristic.pop("totals")
+            heuristic_data = {"heuristic_code": heuristic["heuristic_code"], "heuristic_title": heuristic["heuristic_title"]}
+            heuristic_data.update(_stats(*totals))
+            heuristic_data["subprinciples"] = heuristic["subprinciples"]
+            question_data["heuristics"].append(heuristic_data)
+        response_data["questions"].append(question_data)
+
+    return response_data
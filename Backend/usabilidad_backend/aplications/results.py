@@ -0,0 +1,167 @@
+from aplications.models import EvaluatorHeuristicResponse, EvaluatorStandardResponse
+
+# Motor de resultados para las pruebas de diseño con heurísticas
+def build_heuristic_results(design_test, questions, evaluator_accesses):
+    """
+    Construye el JSON de resultados de una prueba de diseño con heurísticas con un número constante de consultas.
+
+    En lugar de consultar las respuestas por cada par evaluador × pregunta, se cargan todas las respuestas
+    completas de la prueba en una sola consulta (uniendo subprincipio y heurística) y se agrupan en memoria
+    por evaluador, pregunta y heurística.
+
+    Args:
+        design_test (DesignTest): Prueba de diseño de la que se obtienen los resultados.
+        questions (list[DesignQuestion]): Preguntas de la prueba, en el orden en que se devuelven.
+        evaluator_accesses (list[EvaluatorAccess]): Accesos bloqueados de la prueba, con 'evaluator_id' precargado.
+
+    Returns:
+        dict: Los datos de la prueba y las respuestas de cada evaluador que la haya completado.
+    """
+    test_id = design_test.test_id
+
+    # Cargar todas las respuestas completas de la prueba en una sola consulta
+    responses = (
+        EvaluatorHeuristicResponse.objects
+        .filter(test_id=test_id, is_complete=True)
+        .select_related('subprinciple__heuristic_id')
+        .order_by('heuristic_response_id')
+    )
+
+    # Agrupar las respuestas: evaluador -> pregunta -> heurística
+    grouped = {}
+    for response in responses:
+        subprinciple = response.subprinciple
+        heuristic = subprinciple.heuristic_id
+        heuristics_dict = grouped.setdefault(response.evaluator_id, {}).setdefault(response.question_id, {})
+
+        if heuristic.code not in heuristics_dict:
+            heuristics_dict[heuristic.code] = {
+                "heuristic_code": heuristic.code,
+                "heuristic_title": heuristic.title,
+                "comment": response.comment,  # Comentario a nivel de heurística
+                "subprinciples": []
+            }
+        heuristics_dict[heuristic.code]["subprinciples"].append({
+            "subprinciple_code": subprinciple.code,
+            "subprinciple_subtitle": subprinciple.subtitle,
+            "subprinciple_description": subprinciple.description,
+            "response_value": response.score,
+        })
+
+    response_data = {
+        "design_test": {
+            "test_id": design_test.test_id,
+            "user_id": design_test.user_id,
+            "username": design_test.user_name,
+            "name": design_test.name,
+            "url": design_test.url,
+            "description": design_test.description,
+            "test_type": design_test.test_type,
+            "has_heuristics": design_test.has_heuristics,
+            "created_at": design_test.created_at,
+            "code": design_test.code
+        },
+        "evaluators": []
+    }
+
+    # Recorrer los evaluadores en el mismo orden que los accesos
+    for access in evaluator_accesses:
+        evaluator = access.evaluator_id
+        if evaluator is None or evaluator.id not in grouped:
+            continue  # Si no hay respuestas, continuar con el siguiente evaluador
+
+        evaluator_responses = grouped[evaluator.id]
+        evaluator_data = {
+            "evaluator_id": evaluator.id,
+            "username": evaluator.username,
+            "email": evaluator.email,
+            "responses": []
+        }
+
+        # Añadir todas las preguntas, con las heurísticas respondidas por el evaluador
+        for question in questions:
+            heuristics_dict = evaluator_responses.get(question.question_id, {})
+            evaluator_data["responses"].append({
+                "question_id": question.question_id,
+                "title": question.title,
+                "description": question.description,
+                "url_frame": question.url_frame,
+                "heuristics": list(heuristics_dict.values())
+            })
+
+        response_data["evaluators"].append(evaluator_data)
+
+    return response_data
+
+
+# Motor de resultados para las pruebas de diseño sin heurísticas
+def build_standard_results(design_test, questions, evaluator_accesses):
+    """
+    Construye el JSON de resultados de una prueba de diseño estándar con un número constante de consultas.
+
+    Todas las respuestas completas de la prueba se cargan en una sola consulta y se indexan por
+    (evaluator_id, question_id), de modo que cada celda de la matriz evaluador × pregunta se resuelve en memoria.
+
+    Args:
+        design_test (DesignTest): Prueba de diseño de la que se obtienen los resultados.
+        questions (list[DesignQuestion]): Preguntas de la prueba, en el orden en que se devuelven.
+        evaluator_accesses (list[EvaluatorAccess]): Accesos bloqueados de la prueba, con 'evaluator_id' precargado.
+
+    Returns:
+        dict: Los datos de la prueba y las respuestas de cada evaluador que la haya finalizado.
+    """
+    # Indexar las respuestas completas por (evaluador, pregunta); si hay varias, se conserva la primera
+    responses = EvaluatorStandardResponse.objects.filter(
+        test_id=design_test.test_id, is_complete=True
+    ).order_by('standard_response_id')
+
+    responses_index = {}
+    for response in responses:
+        responses_index.setdefault((response.evaluator_id, response.question_id), response)
+
+    response_data = {
+        "design_test": {
+            "test_id": design_test.test_id,
+            "name": design_test.name,
+            "url": design_test.url,
+            "description": design_test.description,
+            "test_type": design_test.test_type,
+            "has_heuristics": design_test.has_heuristics,
+            "created_at": design_test.created_at,
+            "code": design_test.code
+        },
+        "evaluators": []
+    }
+
+    # Recorrer cada evaluador que haya finalizado la prueba
+    for access in evaluator_accesses:
+        evaluator = access.evaluator_id
+
+        evaluator_data = {
+            "evaluator_id": evaluator.id,
+            "username": evaluator.username,
+            "email": evaluator.email,
+            "responses": []
+        }
+
+        # Añadir cada pregunta y la respuesta del evaluador
+        for question in questions:
+            response = responses_index.get((evaluator.id, question.question_id))
+
+            evaluator_data["responses"].append({
+                "question": {
+                    "question_id": question.question_id,
+                    "title": question.title,
+                    "description": question.description,
+                    "url_frame": question.url_frame
+                },
+                "response": {
+                    "response_type": response.response_type if response else None,
+                    "response_value": response.response_value if response else None,
+                    "comment": response.comment if response else None
+                }
+            })
+
+        response_data["evaluators"].append(evaluator_data)
+
+    return response_data
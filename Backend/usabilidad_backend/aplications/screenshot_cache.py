@@ -0,0 +1,171 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from aplications.models import Screenshot
+from aplications.sqlite_tuning import lock_for_write
+
+_key_locks = defaultdict(threading.Lock)
+_key_locks_guard = threading.Lock()
+
+
+# Función para normalizar una URL antes de calcular su hash
+def normalize_url(url):
+    """
+    Normaliza una URL para que variantes equivalentes compartan la misma captura en caché.
+
+    - El esquema y el dominio se pasan a minúsculas.
+    - Los parámetros de la consulta se ordenan.
+    - Se eliminan los espacios al inicio y al final.
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, parts.fragment))
+
+
+# Función para calcular la clave de caché de una captura
+def cache_key(url, viewport):
+    """
+    Devuelve el hash SHA-256 de la URL normalizada y el tamaño de la ventana (ancho, alto).
+    """
+    width, height = viewport
+    return hashlib.sha256(f"{normalize_url(url)}|{width}x{height}".encode('utf-8')).hexdigest()
+
+
+def _cache_dir():
+    return settings.SCREENSHOT_CACHE_DIR
+
+
+def _image_path(key):
+    # Se reparte en subcarpetas por los dos primeros caracteres del hash para no llenar un único directorio
+    return os.path.join(_cache_dir(), key[:2], f"{key}.png")
+
+
+def _delete(screenshot):
+    try:
+        os.remove(screenshot.image_path)
+    except FileNotFoundError:
+        pass
+    screenshot.delete()
+
+
+# Función para buscar una captura vigente en la caché
+def get_cached(url, viewport):
+    """
+    Busca la captura de 'url' con el viewport indicado.
+
+    Returns:
+        str | None: Ruta de la imagen si existe, el archivo está en disco y no ha superado SCREENSHOT_CACHE_TTL;
+        None en caso contrario. Un acierto actualiza 'last_accessed' para el desalojo LRU.
+    """
+    key = cache_key(url, viewport)
+    screenshot = Screenshot.objects.filter(cache_key=key).first()
+    if screenshot is None:
+        return None
+
+    expired = screenshot.created_at < timezone.now() - timedelta(seconds=settings.SCREENSHOT_CACHE_TTL)
+    if expired or not os.path.exists(screenshot.image_path):
+        _delete(screenshot)
+        return None
+
+    Screenshot.objects.filter(pk=screenshot.pk).update(last_accessed=timezone.now())
+    return screenshot.image_path
+
+
+# Función para obtener una ruta temporal donde escribir una captura nueva
+def temp_path():
+    """
+    Crea un archivo temporal vacío dentro de la carpeta de la caché y devuelve su ruta.
+
+    Al estar en el mismo sistema de archivos que la caché, 'store' puede moverlo con un reemplazo atómico,
+    de modo que dos capturas simultáneas nunca escriben sobre el mismo archivo.
+    """
+    os.makedirs(_cache_dir(), exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix='.png', dir=_cache_dir())
+    os.close(fd)
+    return path
+
+
+# Función para guardar una captura recién generada en la caché
+def store(url, viewport, source_path):
+    """
+    Mueve la captura de 'source_path' a su ruta direccionada por contenido, la registra en 'Screenshot'
+    y aplica el desalojo de la caché.
+
+    Returns:
+        str: Ruta definitiva de la imagen.
+    """
+    key = cache_key(url, viewport)
+    path = _image_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(source_path, path)
+
+    # Inserción o actualización atómica: dos procesos que guardan la misma captura a la vez no chocan con la
+    # restricción única de 'cache_key'. En SQLite 'lock_for_write' los pone en fila; en los demás motores
+    # 'update_or_create' bloquea la fila existente o, si pierde la carrera al insertarla, actualiza la del otro
+    now = timezone.now()
+    with transaction.atomic():
+        lock_for_write(Screenshot)
+        Screenshot.objects.update_or_create(
+            cache_key=key,
+            defaults={
+                'url': url,
+                'image_path': path,
+                'viewport': '%sx%s' % viewport,
+                'size': os.path.getsize(path),
+                'created_at': now,  # Reinicia SCREENSHOT_CACHE_TTL al volver a capturar
+                'last_accessed': now,
+            },
+        )
+
+    evict()
+    return path
+
+
+# Función para desalojar capturas antiguas
+def evict():
+    """
+    Elimina las capturas caducadas y, después, las menos usadas recientemente hasta respetar
+    SCREENSHOT_CACHE_MAX_ENTRIES y SCREENSHOT_CACHE_MAX_BYTES.
+
+    Returns:
+        int: Número de capturas eliminadas.
+    """
+    removed = 0
+    expired_before = timezone.now() - timedelta(seconds=settings.SCREENSHOT_CACHE_TTL)
+    for screenshot in Screenshot.objects.filter(cache_key__isnull=False, created_at__lt=expired_before):
+        _delete(screenshot)
+        removed += 1
+
+    cached = Screenshot.objects.filter(cache_key__isnull=False)
+    count = cached.count()
+    total = cached.aggregate(total=Sum('size'))['total'] or 0
+    if count <= settings.SCREENSHOT_CACHE_MAX_ENTRIES and total <= settings.SCREENSHOT_CACHE_MAX_BYTES:
+        return removed
+
+    for screenshot in cached.order_by('last_accessed'):
+        if count <= settings.SCREENSHOT_CACHE_MAX_ENTRIES and total <= settings.SCREENSHOT_CACHE_MAX_BYTES:
+            break
+        count -= 1
+        total -= screenshot.size
+        _delete(screenshot)
+        removed += 1
+    return removed
+
+
+# Bloqueo por clave para que solicitudes simultáneas de la misma captura rendericen una sola vez
+@contextmanager
+def lock(url, viewport):
+    key = cache_key(url, viewport)
+    with _key_locks_guard:
+        key_lock = _key_locks[key]
+    with key_lock:
+        yield
@@ -0,0 +1,108 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+from aplications.capture import get_or_capture
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+# Trabajo de captura de pantalla en segundo plano
+class ScreenshotJob:
+    """
+    Estado de una captura encolada. Los trabajos viven en la memoria del proceso que los recibió.
+    """
+
+    def __init__(self, url, viewport, wait_strategy, timeout, refresh):
+        self.job_id = uuid.uuid4().hex
+        self.url = url
+        self.viewport = viewport
+        self.wait_strategy = wait_strategy
+        self.timeout = timeout
+        self.refresh = refresh
+        self.status = PENDING
+        self.image_path = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def as_dict(self):
+        return {
+            'job_id': self.job_id,
+            'url': self.url,
+            'status': self.status,
+            'error': self.error,
+        }
+
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # Tantos hilos como navegadores en el pool: más hilos solo esperarían un navegador libre
+        _executor = ThreadPoolExecutor(max_workers=settings.SCREENSHOT_POOL_SIZE, thread_name_prefix='screenshot')
+    return _executor
+
+
+def _run(job):
+    job.status = RUNNING
+    try:
+        job.image_path = get_or_capture(job.url, job.viewport, job.wait_strategy, job.timeout, job.refresh)
+        if job.image_path is None:
+            job.status, job.error = FAILED, 'No se pudo capturar la pantalla.'
+        else:
+            job.status = DONE
+    except Exception as e:
+        job.status, job.error = FAILED, str(e)
+    finally:
+        job.finished_at = time.time()
+        close_old_connections()  # Cada hilo abre su propia conexión a la base de datos
+
+
+def _purge():
+    # Olvidar los trabajos terminados hace más de SCREENSHOT_JOB_TTL segundos
+    limit = time.time() - settings.SCREENSHOT_JOB_TTL
+    for job_id in [job_id for job_id, job in _jobs.items() if job.finished_at and job.finished_at < limit]:
+        del _jobs[job_id]
+
+
+# Función para encolar capturas de pantalla
+def submit(urls, viewport, wait_strategy=None, timeout=None, refresh=False):
+    """
+    Encola una captura por cada URL y devuelve los trabajos creados sin esperar a que terminen.
+
+    Los trabajos se ejecutan en un pool de hilos local (sin broker externo), del mismo tamaño que el pool
+    de navegadores. Su estado se guarda en la memoria del proceso, por lo que las consultas de estado
+    deben llegar al mismo proceso que recibió la solicitud.
+
+    Returns:
+        list[ScreenshotJob]: Un trabajo por URL, en el mismo orden.
+    """
+    jobs = [ScreenshotJob(url, viewport, wait_strategy, timeout, refresh) for url in urls]
+    with _jobs_lock:
+        _purge()
+        for job in jobs:
+            _jobs[job.job_id] = job
+        executor = _get_executor()
+
+    for job in jobs:
+        executor.submit(_run, job)
+    return jobs
+
+
+# Función para consultar un trabajo encolado
+def get_job(job_id):
+    """
+    Devuelve el trabajo con el ID indicado, o None si no existe o ya se olvidó.
+    """
+    with _jobs_lock:
+        return _jobs.get(job_id)
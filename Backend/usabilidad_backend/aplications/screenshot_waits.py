@@ -0,0 +1,122 @@
+import hashlib
+import time
+from urllib.parse import urlsplit
+from django.conf import settings
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Cantidad de recursos descargados por la página; si no cambia durante un intervalo, la red está inactiva
+RESOURCE_COUNT_SCRIPT = "return window.performance.getEntriesByType('resource').length;"
+
+
+# Estrategia de espera original: tiempos fijos
+def wait_fixed(driver, timeout):
+    """
+    Espera tiempos fijos antes de capturar (10 s para la página y 5 s dentro del iframe de Figma),
+    acotados por 'timeout'.
+
+    Al terminar, el driver queda dentro del iframe si la página tiene uno.
+    """
+    deadline = time.monotonic() + timeout
+    time.sleep(max(0, min(10, deadline - time.monotonic())))  # Esperar que el iframe de Figma se cargue
+
+    iframes = driver.find_elements(By.TAG_NAME, 'iframe')
+    if iframes:
+        driver.switch_to.frame(iframes[0])  # Cambiar al contexto del iframe
+        time.sleep(max(0, min(5, deadline - time.monotonic())))  # Esperar más tiempo dentro del iframe
+
+
+# Función para saber si una URL es un embebido de Figma (el prototipo se carga dentro de un iframe)
+def is_figma_embed(url):
+    """
+    Reconoce 'https://embed.figma.com/...', 'https://www.figma.com/embed?...' y las URL con 'embed-host' o
+    'embed_host' en la consulta.
+    """
+    parts = urlsplit(url or '')
+    host = parts.netloc.lower()
+    if not (host == 'figma.com' or host.endswith('.figma.com')):
+        return False
+    return host.startswith('embed.') or parts.path.startswith('/embed') or 'embed-host' in parts.query or 'embed_host' in parts.query
+
+
+def _first_iframe(driver):
+    iframes = driver.find_elements(By.TAG_NAME, 'iframe')
+    return iframes[0] if iframes else None
+
+
+# Estrategia de espera por disponibilidad: documento listo, iframe cargado, red inactiva y marco estable
+def wait_until_ready(driver, timeout):
+    """
+    Espera solo lo necesario para que el prototipo esté renderizado, sin superar 'timeout' segundos:
+
+    1. El documento principal está completo (document.readyState == 'complete').
+    2. El iframe de Figma existe y su documento también está completo. Solo se espera a que aparezca en las URL
+       de embebidos de Figma ('is_figma_embed'); en las demás páginas se usa el iframe si ya existe.
+    3. La red está inactiva: el número de recursos descargados no cambia durante SCREENSHOT_NETWORK_IDLE segundos.
+    4. El marco es estable: dos capturas consecutivas son idénticas.
+
+    Si se agota el tiempo en cualquier paso, se continúa con la captura tal como esté la página.
+    Al terminar, el driver queda dentro del iframe si la página tiene uno.
+    """
+    poll = getattr(settings, 'SCREENSHOT_POLL_INTERVAL', 0.25)
+    idle = getattr(settings, 'SCREENSHOT_NETWORK_IDLE', 0.5)
+    deadline = time.monotonic() + timeout
+
+    def remaining():
+        return max(0, deadline - time.monotonic())
+
+    def until(condition):
+        try:
+            return WebDriverWait(driver, remaining(), poll_frequency=poll).until(condition)
+        except TimeoutException:
+            return None
+
+    until(lambda d: d.execute_script('return document.readyState') == 'complete')
+
+    # Solo los embebidos de Figma cargan el prototipo en un iframe que puede aparecer más tarde; en las demás
+    # páginas se comprueba una vez, para no esperar el tiempo completo buscando un iframe que no existe
+    iframe = _first_iframe(driver)
+    if iframe is None and is_figma_embed(driver.current_url):
+        iframe = until(_first_iframe)
+    if iframe is not None:
+        driver.switch_to.frame(iframe)
+        until(lambda d: d.execute_script('return document.readyState') == 'complete')
+
+    # Red inactiva: el número de recursos no cambia durante el intervalo de inactividad
+    last_count = driver.execute_script(RESOURCE_COUNT_SCRIPT)
+    stable_since = time.monotonic()
+    while remaining() > 0 and time.monotonic() - stable_since < idle:
+        time.sleep(min(poll, remaining()))
+        count = driver.execute_script(RESOURCE_COUNT_SCRIPT)
+        if count != last_count:
+            last_count, stable_since = count, time.monotonic()
+
+    # Marco estable: dos capturas consecutivas iguales
+    last_digest = hashlib.sha1(driver.get_screenshot_as_png()).digest()
+    while remaining() > 0:
+        time.sleep(min(poll, remaining()))
+        digest = hashlib.sha1(driver.get_screenshot_as_png()).digest()
+        if digest == last_digest:
+            return
+        last_digest = digest
+
+
+WAIT_STRATEGIES = {
+    'fixed': wait_fixed,
+    'ready': wait_until_ready,
+}
+
+
+# Función para obtener la estrategia de espera solicitada
+def get_wait_strategy(name=None):
+    """
+    Devuelve la función de espera correspondiente a 'name' o, si no se indica, la de SCREENSHOT_WAIT_STRATEGY.
+
+    Raises:
+        ValueError: Si la estrategia no existe.
+    """
+    name = name or getattr(settings, 'SCREENSHOT_WAIT_STRATEGY', 'ready')
+    if name not in WAIT_STRATEGIES:
+        raise ValueError(f"Estrategia de espera desconocida: {name}. Opciones: {', '.join(WAIT_STRATEGIES)}.")
+    return WAIT_STRATEGIES[name]
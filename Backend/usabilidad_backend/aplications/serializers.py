@@ -37,6 +37,7 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User  # Especifica el modelo User
         fields = '__all__'  # Incluir todos los campos del modelo User
+        extra_kwargs = {'password': {'write_only': True}}  # La contraseña se recibe pero nunca se devuelve
 
 
 class SubprincipleSerializer(serializers.ModelSerializer):
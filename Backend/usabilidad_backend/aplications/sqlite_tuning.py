@@ -0,0 +1,111 @@
+import os
+import sys
+from django.conf import settings
+from django.db import connections, router
+from aplications.db_router import REPLICA_DB_ALIAS
+
+# Ajustes por defecto si SQLITE_PRAGMAS no está definido en settings.py
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+}
+
+# PRAGMA que se guardan en el archivo de la base de datos; los demás solo afectan a la conexión
+PERSISTENT_PRAGMAS = ('journal_mode',)
+
+
+# Función para obtener las sentencias PRAGMA configuradas
+def pragma_statements(pragmas=None):
+    """
+    Devuelve la lista de sentencias 'PRAGMA nombre = valor' a partir de 'pragmas' o, si no se indica, de
+    SQLITE_PRAGMAS, con 'journal_mode' en primer lugar.
+    """
+    if pragmas is None:
+        pragmas = getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+    names = sorted(pragmas, key=lambda name: name != 'journal_mode')
+    return ['PRAGMA %s = %s' % (name, pragmas[name]) for name in names]
+
+
+# Función para aplicar los PRAGMA a una conexión SQLite
+def apply_pragmas(connection, pragmas=None):
+    """
+    Aplica los PRAGMA a una conexión: tanto a una conexión de Django como a una conexión de 'sqlite3'
+    (la usa 'benchmark_sqlite_concurrency').
+    """
+    cursor = connection.cursor()
+    try:
+        for statement in pragma_statements(pragmas):
+            cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+# Función para saber si el proceso es un comando de 'manage.py' distinto de runserver
+def running_management_command():
+    argv = sys.argv
+    return len(argv) > 1 and os.path.basename(argv[0]) in ('manage.py', 'django-admin', 'django-admin.py') and argv[1] != 'runserver'
+
+
+# Receptor de 'connection_created' que ajusta cada conexión SQLite nueva (se conecta en 'AplicationsConfig.ready')
+def configure_connection(sender, connection, **kwargs):
+    """
+    Aplica SQLITE_PRAGMAS a cada conexión SQLite que abre Django:
+
+    - journal_mode=WAL: las lecturas de los reportes no bloquean los guardados automáticos de los evaluadores
+      ni al revés; solo se serializan las escrituras entre sí.
+    - synchronous=NORMAL: con WAL no se pierde la consistencia ante un corte y se evita un fsync por transacción.
+    - busy_timeout: milisegundos que una escritura espera al bloqueo antes de fallar con "database is locked".
+    - mmap_size, cache_size y temp_store: lecturas con memoria mapeada, caché de páginas más grande y tablas
+      temporales en memoria.
+
+    Con CONN_MAX_AGE las conexiones se reutilizan entre solicitudes y los PRAGMA se aplican una sola vez
+    por conexión.
+
+    journal_mode se guarda en el archivo, así que solo se aplica al servir solicitudes (runserver o WSGI): los
+    comandos de 'manage.py' como 'check', 'migrate' o 'test' no cambian el modo del db.sqlite3 del repositorio
+    ni dejan archivos -wal/-shm junto a él. Una base de datos que ya está en WAL sigue en WAL.
+
+    Las conexiones a la réplica ('db_router') se abren además con query_only: una escritura enviada por error
+    a la réplica falla en lugar de separarla de la primaria.
+    """
+    if connection.vendor == 'sqlite':
+        pragmas = getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+        if running_management_command():
+            pragmas = {name: value for name, value in pragmas.items() if name not in PERSISTENT_PRAGMAS}
+        apply_pragmas(connection, pragmas)
+        if connection.alias == REPLICA_DB_ALIAS:
+            apply_pragmas(connection, {'query_only': 1})
+
+
+# Función para tomar el bloqueo de escritura de SQLite al inicio de una transacción
+def lock_for_write(model):
+    """
+    En SQLite, toma el bloqueo de escritura de la base de datos al principio de la transacción en curso, como
+    'BEGIN IMMEDIATE'. En otros motores no hace nada.
+
+    Django abre las transacciones con 'BEGIN' diferido. Si una transacción lee antes de escribir y otra conexión
+    escribe entre medias, el paso a escritura falla al instante con "database is locked", sin esperar
+    'busy_timeout' (SQLite no puede ampliar una lectura ya iniciada). Un UPDATE que no modifica ninguna fila
+    toma el bloqueo antes de la primera lectura y sí espera 'busy_timeout' si otra escritura lo tiene.
+
+    Se llama dentro de 'transaction.atomic()', antes de la primera consulta.
+
+    Args:
+        model (Model): Modelo que se va a escribir; determina la base de datos y la tabla del UPDATE.
+    """
+    connection = connections[router.db_for_write(model)]
+    if connection.vendor != 'sqlite' or not connection.in_atomic_block:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(write_lock_sql(model, connection.ops.quote_name))
+
+
+# Función para obtener el UPDATE sin efectos con el que 'lock_for_write' toma el bloqueo de escritura
+def write_lock_sql(model, quote_name):
+    table = quote_name(model._meta.db_table)
+    column = quote_name(model._meta.pk.column)
+    return 'UPDATE %s SET %s = %s WHERE 0' % (table, column, column)
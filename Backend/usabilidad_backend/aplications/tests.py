@@ -0,0 +1,964 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+import numpy as np
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.response import Response
+from aplications import heuristic_catalog, result_cache, result_summary
+from aplications.analytics import (
+    OUTLIER_Z_SCORE, SEVERITY_LEVELS, ScoreMatrix, _agreement_item, _grouped_agreement, _grouped_stats, _outlier_evaluators, severity_index,
+)
+from aplications.fast_serializers import FastSerializer
+from aplications.heuristic_catalog import CATALOG_NAME, get_subprinciple_lookup
+from aplications.models import (
+    CatalogFingerprint, DesignQuestion, DesignTest, EvaluatorAccess, EvaluatorHeuristicResponse, EvaluatorStandardResponse, Heuristic,
+    ResultCacheVersion, ResultSummary, Subprinciple, User,
+)
+from aplications.db_router import REPLICA_DB_ALIAS, PrimaryReplicaRouter, ReplicaRoutingMiddleware, RequestRouting, _routing, is_pinned, read_only
+from aplications.bulk_writers import save_heuristic_responses, save_standard_responses
+from aplications.management.commands.check_migrations import STEPS as MIGRATION_STEPS
+from aplications.pagination import list_response
+from aplications.query_detector import NPlusOneDetected, QueryDetectorMiddleware, detect_queries
+from aplications.serializers import DesignQuestionSerializer, DesignTestSerializer, EvaluatorAccessSerializer, UserSerializer
+
+# Consultas SQL de los GET de finalización: sin la caché de resultados y cuando la caché acierta
+HEURISTIC_FINALIZE_QUERIES = 5
+HEURISTIC_FINALIZE_CACHED_QUERIES = 2
+STANDARD_FINALIZE_QUERIES = 6
+
+# Consultas SQL de los POST que guardan respuestas (incluidos los SAVEPOINT de las transacciones, que en una
+# prueba van anidadas en la suya): guardado parcial de una pregunta y finalización
+HEURISTIC_SAVE_QUERIES = 9
+HEURISTIC_FINALIZE_SAVE_QUERIES = 23
+STANDARD_SAVE_QUERIES = 9
+STANDARD_FINALIZE_SAVE_QUERIES = 22
+
+# Serializers con ruta rápida y el modelo que serializan
+FAST_SERIALIZERS = (
+    (UserSerializer, User),
+    (DesignTestSerializer, DesignTest),
+    (DesignQuestionSerializer, DesignQuestion),
+    (EvaluatorAccessSerializer, EvaluatorAccess),
+)
+
+
+# Función para crear una prueba de diseño con preguntas y evaluadores que ya la finalizaron
+def create_finalized_test(evaluators, questions, has_heuristics, offset=0):
+    """
+    Crea una prueba con 'questions' preguntas y 'evaluators' evaluadores con el acceso bloqueado y respuestas
+    completas: en las pruebas con heurísticas, un puntaje por cada subprincipio de las heurísticas de la pregunta.
+
+    Returns:
+        DesignTest: La prueba creada.
+    """
+    owner = User.objects.create(username='owner%d' % offset, email='owner%d@example.com' % offset, rol='Propietario', password='x')
+    design_test = DesignTest.objects.create(
+        name='Prueba', url='https://example.com', description='Prueba', test_type='Web',
+        has_heuristics=has_heuristics, user=owner, user_name=owner.username,
+    )
+    heuristics = list(Heuristic.objects.order_by('id')[:2])
+    subprinciples = list(Subprinciple.objects.filter(heuristic_id__in=heuristics).order_by('id'))
+
+    question_list = []
+    for n in range(questions):
+        question = DesignQuestion.objects.create(
+            title='Pregunta %d' % n, description='Pregunta', url_frame='https://example.com/%d' % n, test_id=design_test,
+            response_type=None if has_heuristics else 'Calificacion',
+        )
+        if has_heuristics:
+            question.heuristics.set(heuristics)
+        question_list.append(question)
+
+    for n in range(evaluators):
+        evaluator = User.objects.create(
+            username='evaluator%d_%d' % (offset, n), email='evaluator%d_%d@example.com' % (offset, n), rol='Evaluador', password='x',
+        )
+        access = EvaluatorAccess.objects.create(evaluator_id=evaluator, test_id=design_test, acceso_bloqueado=True)
+        if has_heuristics:
+            EvaluatorHeuristicResponse.objects.bulk_create([
+                EvaluatorHeuristicResponse(
+                    score=(n + subprinciple.id) % 10 + 1, comment='', is_complete=True, evaluator_access=access,
+                    test=design_test, question=question, evaluator=evaluator, subprinciple=subprinciple,
+                )
+                for question in question_list for subprinciple in subprinciples
+            ])
+        else:
+            EvaluatorStandardResponse.objects.bulk_create([
+                EvaluatorStandardResponse(
+                    response_type='Calificacion', response_value=n % 5 + 1, comment='', is_complete=True,
+                    evaluator_access=access, evaluator=evaluator, test=design_test, question=question,
+                )
+                for question in question_list
+            ])
+    return design_test
+
+
+# Función para dar acceso abierto (sin finalizar) a un evaluador nuevo en una prueba de diseño
+def add_evaluator(design_test, name):
+    evaluator = User.objects.create(username=name, email='%s@example.com' % name, rol='Evaluador', password='x')
+    return EvaluatorAccess.objects.create(evaluator_id=evaluator, test_id=design_test, acceso_bloqueado=False)
+
+
+# Función para guardar respuestas heurísticas como antes de 'bulk_writers': un 'update_or_create' por subprincipio
+def update_or_create_heuristic_responses(access, rows, is_complete):
+    for question_id, subprinciple_id, score, comment in rows:
+        EvaluatorHeuristicResponse.objects.update_or_create(
+            test_id=access.test_id_id, evaluator_id=access.evaluator_id_id, question_id=question_id, subprinciple_id=subprinciple_id,
+            defaults={'score': score, 'comment': comment, 'is_complete': is_complete, 'evaluator_access': access},
+        )
+
+
+# Función para guardar respuestas estándar como antes de 'bulk_writers': un 'update_or_create' por pregunta
+def update_or_create_standard_responses(access, rows, is_complete):
+    for question, response_value, comment in rows:
+        EvaluatorStandardResponse.objects.update_or_create(
+            test_id=access.test_id_id, evaluator_id=access.evaluator_id_id, question_id=question.question_id,
+            defaults={'response_type': question.response_type, 'response_value': response_value, 'comment': comment,
+                      'is_complete': is_complete, 'evaluator_access': access},
+        )
+
+
+# Función para obtener las respuestas guardadas con un acceso, sin los campos que dependen del evaluador
+def saved_responses(model, access, fields):
+    return sorted(model.objects.filter(evaluator_access=access).values_list(*fields))
+
+
+# Pruebas del número de consultas de los GET de finalización
+class FinalizeQueryCountTests(TestCase):
+    """
+    El número de consultas de los resultados no debe depender del número de evaluadores ni de preguntas
+    (ver 'results.build_heuristic_results' y 'results.build_standard_results').
+    """
+
+    def setUp(self):
+        result_cache.get_store().clear()
+
+    def get_results(self, design_test, kind, queries, cached=False):
+        url = '/api/designtests/%d/evaluator%sresponsesfinalize/' % (design_test.test_id, kind)
+        if cached:
+            self.client.get(url)  # Guarda los resultados renderizados en la caché
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_heuristic_results_queries_are_constant(self):
+        for evaluators, questions in ((2, 1), (6, 3)):
+            design_test = create_finalized_test(evaluators, questions, True, offset=evaluators)
+            data = self.get_results(design_test, 'heuristic', HEURISTIC_FINALIZE_QUERIES)
+            self.assertEqual(len(data['evaluators']), evaluators)
+            self.assertEqual(len(data['evaluators'][0]['responses']), questions)
+
+    def test_heuristic_results_cache_hit_queries_are_constant(self):
+        for evaluators in (2, 6):
+            design_test = create_finalized_test(evaluators, 2, True, offset=evaluators)
+            data = self.get_results(design_test, 'heuristic', HEURISTIC_FINALIZE_CACHED_QUERIES, cached=True)
+            self.assertEqual(len(data['evaluators']), evaluators)
+
+    def test_standard_results_queries_are_constant(self):
+        for evaluators, questions in ((2, 1), (6, 3)):
+            design_test = create_finalized_test(evaluators, questions, False, offset=evaluators)
+            data = self.get_results(design_test, 'standard', STANDARD_FINALIZE_QUERIES)
+            self.assertEqual(len(data['evaluators']), evaluators)
+
+
+# Pruebas de equivalencia entre los guardados en bloque y el 'update_or_create' por fila
+class BulkWriterTests(TestCase):
+    """
+    'save_heuristic_responses' y 'save_standard_responses' deben dejar las mismas filas que el 'update_or_create'
+    por fila al que sustituyen, en una secuencia de guardados parciales y la finalización.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.heuristic_test = create_finalized_test(0, 2, True)
+        cls.heuristic_questions = list(DesignQuestion.objects.filter(test_id=cls.heuristic_test).values_list('question_id', flat=True))
+        cls.subprinciples = list(
+            Subprinciple.objects.filter(heuristic_id__in=Heuristic.objects.order_by('id')[:2]).order_by('id').values_list('id', flat=True)
+        )
+
+    def test_heuristic_writer_matches_update_or_create(self):
+        bulk, reference = add_evaluator(self.heuristic_test, 'bulk'), add_evaluator(self.heuristic_test, 'reference')
+        (first, second), subprinciples = self.heuristic_questions, self.subprinciples
+        steps = (
+            # Primer guardado parcial
+            ([(first, subprinciples[0], 3, 'a'), (first, subprinciples[1], 4, 'a')], False),
+            # Cambia el puntaje y el comentario de una respuesta y añade otra pregunta
+            ([(first, subprinciples[0], 5, 'b'), (second, subprinciples[0], 2, '')], False),
+            # Finalización con el ID de pregunta como texto: una fila solo cambia 'is_complete' y otra el comentario
+            ([(first, subprinciples[1], 4, 'a'), (str(second), subprinciples[0], 2, 'c')], True),
+        )
+        fields = ('question_id', 'subprinciple_id', 'score', 'comment', 'is_complete')
+        for rows, is_complete in steps:
+            save_heuristic_responses(bulk, self.heuristic_test.test_id, str(bulk.evaluator_id_id), rows, is_complete)
+            update_or_create_heuristic_responses(reference, rows, is_complete)
+            self.assertEqual(saved_responses(EvaluatorHeuristicResponse, bulk, fields), saved_responses(EvaluatorHeuristicResponse, reference, fields))
+
+        self.assertEqual(saved_responses(EvaluatorHeuristicResponse, bulk, fields), sorted([
+            (first, subprinciples[0], 5, 'b', False),
+            (first, subprinciples[1], 4, 'a', True),
+            (second, subprinciples[0], 2, 'c', True),
+        ]))
+
+    def test_standard_writer_matches_update_or_create(self):
+        design_test = create_finalized_test(0, 3, False, offset=1)
+        bulk, reference = add_evaluator(design_test, 'bulk'), add_evaluator(design_test, 'reference')
+        first, second, third = DesignQuestion.objects.filter(test_id=design_test).order_by('question_id')
+        steps = (
+            # Primer guardado parcial
+            ([(first, 3, 'a'), (second, 4, '')], False),
+            # Cambia el valor de una respuesta y solo el comentario de otra
+            ([(first, 5, 'a'), (second, 4, 'b')], False),
+            # Finalización: una respuesta nueva y otra que solo cambia 'is_complete'
+            ([(second, 4, 'b'), (third, 1, 'c')], True),
+        )
+        fields = ('question_id', 'response_type', 'response_value', 'comment', 'is_complete')
+        for rows, is_complete in steps:
+            save_standard_responses(bulk, design_test.test_id, str(bulk.evaluator_id_id), rows, is_complete)
+            update_or_create_standard_responses(reference, rows, is_complete)
+            self.assertEqual(saved_responses(EvaluatorStandardResponse, bulk, fields), saved_responses(EvaluatorStandardResponse, reference, fields))
+
+        self.assertEqual(saved_responses(EvaluatorStandardResponse, bulk, fields), sorted([
+            (first.question_id, 'Calificacion', 5, 'a', False),
+            (second.question_id, 'Calificacion', 4, 'b', True),
+            (third.question_id, 'Calificacion', 1, 'c', True),
+        ]))
+
+
+# Pruebas de las restricciones de unicidad de las respuestas y de las tres rutas de upsert
+class UpsertPathTests(TestCase):
+    """
+    Cada ruta de '_upsert_responses' ('orm', 'sql' y la ruta por diferencias) debe dejar una sola fila por clave
+    natural con el último valor guardado.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.heuristic_test = create_finalized_test(1, 1, True)
+        cls.standard_test = create_finalized_test(1, 1, False, offset=1)
+        cls.heuristic_question = DesignQuestion.objects.get(test_id=cls.heuristic_test)
+        cls.standard_question = DesignQuestion.objects.get(test_id=cls.standard_test)
+        cls.subprinciple_id = Subprinciple.objects.order_by('id').values_list('id', flat=True).first()
+
+    def test_each_upsert_path_updates_a_single_row(self):
+        for mode in ('orm', 'sql', None):
+            with self.subTest(mode=mode), mock.patch('aplications.bulk_writers._native_upsert_mode', return_value=mode):
+                heuristic_access = add_evaluator(self.heuristic_test, 'heuristic_%s' % mode)
+                standard_access = add_evaluator(self.standard_test, 'standard_%s' % mode)
+                for score, comment in ((3, 'primero'), (7, 'segundo')):
+                    save_heuristic_responses(
+                        heuristic_access, self.heuristic_test.test_id, heuristic_access.evaluator_id_id,
+                        [(self.heuristic_question.question_id, self.subprinciple_id, score, comment)], is_complete=False,
+                    )
+                    save_standard_responses(
+                        standard_access, self.standard_test.test_id, standard_access.evaluator_id_id,
+                        [(self.standard_question, score, comment)], is_complete=False,
+                    )
+
+                self.assertEqual(
+                    saved_responses(EvaluatorHeuristicResponse, heuristic_access, ('score', 'comment')), [(7, 'segundo')]
+                )
+                self.assertEqual(
+                    saved_responses(EvaluatorStandardResponse, standard_access, ('response_value', 'comment')), [(7, 'segundo')]
+                )
+
+    def test_duplicate_responses_are_rejected(self):
+        heuristic = EvaluatorHeuristicResponse.objects.filter(test=self.heuristic_test).first()
+        standard = EvaluatorStandardResponse.objects.filter(test=self.standard_test).first()
+        for response in (heuristic, standard):
+            response.pk = None
+            with self.subTest(model=type(response).__name__), self.assertRaises(IntegrityError), transaction.atomic():
+                response.save()
+
+
+# Pruebas de la migración que elimina las respuestas duplicadas antes de crear las restricciones de unicidad
+class ResponseConstraintsMigrationTests(TransactionTestCase):
+    """
+    Migra a la versión anterior a las restricciones, guarda respuestas duplicadas y aplica la migración.
+    """
+    before = [('aplications', '0026_designtest_user_name')]
+    after = [('aplications', '0027_evaluator_response_constraints')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_duplicates_keep_the_last_response(self):
+        apps = self.migrate(self.before)
+        User_, DesignTest_, DesignQuestion_, Heuristic_, Subprinciple_, Access_, Standard_, Heuristic_response = (
+            apps.get_model('aplications', name) for name in (
+                'User', 'DesignTest', 'DesignQuestion', 'Heuristic', 'Subprinciple', 'EvaluatorAccess',
+                'EvaluatorStandardResponse', 'EvaluatorHeuristicResponse',
+            )
+        )
+        owner = User_.objects.create(username='owner', email='owner@example.com', rol='Propietario', password='x')
+        evaluator = User_.objects.create(username='evaluator', email='evaluator@example.com', rol='Evaluador', password='x')
+        design_test = DesignTest_.objects.create(name='Prueba', url='https://example.com', description='Prueba', test_type='Web', user=owner)
+        question = DesignQuestion_.objects.create(title='Pregunta', description='Pregunta', url_frame='https://example.com', test_id=design_test)
+        heuristic = Heuristic_.objects.create(code='HX', title='Heurística', description='')
+        subprinciple = Subprinciple_.objects.create(code='HX1', subtitle='Subprincipio', description='', example='', heuristic_id=heuristic)
+        access = Access_.objects.create(evaluator_id=evaluator, test_id=design_test)
+        for value in (2, 5):
+            Standard_.objects.create(response_type='Calificacion', response_value=value, evaluator_access=access,
+                                     evaluator=evaluator, test=design_test, question=question)
+            Heuristic_response.objects.create(score=value, evaluator_access=access, test=design_test, question=question,
+                                              evaluator=evaluator, subprinciple=subprinciple)
+
+        apps = self.migrate(self.after)
+        self.assertEqual(list(apps.get_model('aplications', 'EvaluatorStandardResponse').objects.values_list('response_value', flat=True)), [5])
+        self.assertEqual(list(apps.get_model('aplications', 'EvaluatorHeuristicResponse').objects.values_list('score', flat=True)), [5])
+
+
+# Pruebas de la matriz de migraciones en el motor de la base de datos de pruebas
+class MigrationMatrixTests(TransactionTestCase):
+    """
+    Ejecuta los pasos de 'check_migrations' (migrar, revertir 'aplications', migrar de nuevo, datos sintéticos y
+    vistas principales) sobre la base de datos de pruebas, que usa el motor elegido con DB_ENGINE:
+
+        python manage.py test aplications
+        DB_ENGINE=postgresql DB_NAME=usabilidad python manage.py test aplications
+    """
+
+    def setUp(self):
+        heuristic_catalog.invalidate()
+        result_cache.get_store().clear()
+
+    def tearDown(self):
+        heuristic_catalog.invalidate()  # Los IDs del catálogo cambian al migrar de nuevo
+
+    def test_migrations_and_main_views(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        for name, arguments in MIGRATION_STEPS:
+            with self.subTest(step=name, vendor=connection.vendor):
+                if arguments[0] == 'benchmark_endpoints':
+                    arguments = arguments + ['--output', os.path.join(directory, 'vistas.json')]
+                call_command(*arguments, verbosity=0, stdout=io.StringIO())
+                if arguments[0] == 'migrate':
+                    executor = MigrationExecutor(connection)
+                    applied = {migration for app, migration in executor.loader.applied_migrations if app == 'aplications'}
+                    self.assertEqual(bool(applied), 'zero' not in arguments)
+        self.assertEqual(ResultCacheVersion.objects.count(), DesignTest.objects.count())
+
+
+# Pruebas del resumen de resultados incremental
+class ResultSummaryTests(TestCase):
+    """
+    Después de cada guardado, el resumen que mantiene 'apply_changes' debe coincidir con el que calcula 'rebuild'
+    desde las respuestas completas.
+    """
+
+    def assert_matches_rebuild(self, design_test):
+        fields = ('question_id', 'subprinciple_id', 'heuristic_id', 'count', 'total', 'sum_squares', 'min_value', 'max_value', 'distribution')
+        summaries = ResultSummary.objects.filter(test=design_test).order_by('question_id', 'subprinciple_id')
+        incremental = list(summaries.values_list(*fields))
+        result_summary.rebuild(design_test.test_id)
+        self.assertEqual(incremental, list(summaries.values_list(*fields)))
+        return incremental
+
+    def test_heuristic_summary_matches_rebuild(self):
+        design_test = create_finalized_test(0, 2, True)
+        first, second = DesignQuestion.objects.filter(test_id=design_test).order_by('question_id')
+        subprinciples = list(Subprinciple.objects.order_by('id').values_list('id', flat=True)[:3])
+        a, b = add_evaluator(design_test, 'a'), add_evaluator(design_test, 'b')
+
+        def save(access, rows, is_complete):
+            save_heuristic_responses(access, design_test.test_id, access.evaluator_id_id, rows, is_complete)
+            return self.assert_matches_rebuild(design_test)
+
+        # Los guardados parciales no cuentan
+        self.assertEqual(save(a, [(first.question_id, subprinciples[0], 4, '')], False), [])
+        # Finalizaciones de los dos evaluadores; solo 'b' responde el tercer subprincipio
+        save(a, [(first.question_id, subprinciples[0], 4, ''), (second.question_id, subprinciples[1], 2, '')], True)
+        save(b, [(first.question_id, subprinciples[0], 9, ''), (first.question_id, subprinciples[2], 1, ''),
+                 (second.question_id, subprinciples[1], 2, '')], True)
+        # Nuevo guardado completo con otros puntajes: se resta la contribución anterior
+        save(a, [(first.question_id, subprinciples[0], 7, ''), (second.question_id, subprinciples[1], 5, '')], True)
+        # Respuestas de 'b' que vuelven a ser parciales: la fila del tercer subprincipio queda sin respuestas y se elimina
+        rows = save(b, [(first.question_id, subprinciples[2], 1, ''), (second.question_id, subprinciples[1], 2, '')], False)
+        self.assertNotIn(subprinciples[2], [row[1] for row in rows])
+        # Al eliminar una pregunta se eliminan sus respuestas y sus filas de resumen
+        second.delete()
+        rows = self.assert_matches_rebuild(design_test)
+        self.assertEqual([(row[0], row[1], row[3], row[4]) for row in rows], [(first.question_id, subprinciples[0], 2, 16)])
+
+    def test_standard_summary_matches_rebuild(self):
+        design_test = create_finalized_test(0, 2, False)
+        first, second = DesignQuestion.objects.filter(test_id=design_test).order_by('question_id')
+        a, b = add_evaluator(design_test, 'a'), add_evaluator(design_test, 'b')
+
+        def save(access, rows, is_complete):
+            save_standard_responses(access, design_test.test_id, access.evaluator_id_id, rows, is_complete)
+            return self.assert_matches_rebuild(design_test)
+
+        self.assertEqual(save(a, [(first, 3, '')], False), [])
+        save(a, [(first, 3, ''), (second, 5, '')], True)
+        save(b, [(first, 1, '')], True)
+        save(a, [(first, 4, '')], True)
+        rows = save(b, [(first, 1, '')], False)
+        self.assertEqual([(row[0], row[3], row[4], row[5], row[6], row[7]) for row in rows],
+                         [(first.question_id, 1, 4, 16, 4, 4), (second.question_id, 1, 5, 25, 5, 5)])
+
+
+# Función para construir una matriz de puntajes evaluador × unidad sin pasar por la base de datos
+def score_matrix(scores):
+    scores = np.array(scores, dtype=np.float64)
+    evaluators, units = scores.shape
+    return ScoreMatrix(np.arange(evaluators), np.zeros(units, dtype=np.int64), np.arange(units), np.zeros(units, dtype=np.int64), scores)
+
+
+# Pruebas del cumplimiento y la severidad por heurística
+class HeuristicAnalyticsTests(SimpleTestCase):
+    """
+    Umbrales de severidad de 'getSeverityRecommendation.2.js' y estadísticas agrupadas de la matriz de puntajes.
+    """
+
+    def test_severity_thresholds(self):
+        non_compliance = [0, 0.99, 1, 10, 10.01, 50, 50.5, 90, 90.01, 100]
+        expected = ['Baja', 'Baja', 'Baja-Media', 'Baja-Media', 'Media', 'Media', 'Alta', 'Alta', 'Crítica', 'Crítica']
+        self.assertEqual([SEVERITY_LEVELS[index][0] for index in severity_index(non_compliance)], expected)
+
+    def test_grouped_stats(self):
+        # Dos grupos de columnas: {0, 1} con puntajes 10, 8, 6, 4 y {2} con puntajes 1 y 3; falta una respuesta
+        matrix = score_matrix([[10, 6, 1], [8, 4, 3], [np.nan, np.nan, np.nan]])
+        scores = matrix.scores
+        stats = _grouped_stats((~np.isnan(scores)).sum(axis=0), np.nansum(scores, axis=0), np.nansum(scores ** 2, axis=0), np.array([0, 0, 1]), 2)
+
+        self.assertEqual(stats["responses"].tolist(), [4, 2])
+        self.assertEqual(stats["mean"].tolist(), [7, 2])
+        np.testing.assert_allclose(stats["std"], [np.sqrt(5), 1])
+        np.testing.assert_allclose(stats["compliance"], [70, 20])
+        self.assertEqual([SEVERITY_LEVELS[index][0] for index in stats["severity"]], ['Media', 'Alta'])
+
+
+# Pruebas del acuerdo entre evaluadores y de los evaluadores atípicos
+class AgreementTests(SimpleTestCase):
+    """
+    Coeficientes calculados sobre ejemplos publicados y casos límite: puntajes idénticos y un solo evaluador.
+    """
+
+    def agreement(self, scores):
+        matrix = score_matrix(scores)
+        return _agreement_item(_grouped_agreement(matrix, np.zeros(matrix.scores.shape[1], dtype=np.int64), 1), 0)
+
+    def test_krippendorff_interval_alpha(self):
+        # Krippendorff (2011), "Computing Krippendorff's Alpha-Reliability": 4 observadores, 12 unidades con datos
+        # faltantes; la unidad 12 tiene un solo valor y no cuenta. Alfa de intervalo publicado: 0.849
+        missing = np.nan
+        scores = [
+            [1, 2, 3, 3, 2, 1, 4, 1, 2, missing, missing, missing],
+            [1, 2, 3, 3, 2, 2, 4, 1, 2, 5, missing, 3],
+            [missing, 3, 3, 3, 2, 3, 4, 2, 2, 5, 1, missing],
+            [1, 2, 3, 3, 2, 4, 4, 1, 2, 5, 1, missing],
+        ]
+        result = self.agreement(scores)
+        self.assertEqual(result["units"], 11)
+        self.assertAlmostEqual(result["alpha"], 0.849, places=3)
+        self.assertEqual(result["agreement"], "Alto")
+
+    def test_fleiss_kappa(self):
+        # Fleiss (1971): 10 sujetos, 14 evaluadores y 5 categorías; kappa publicado: 0.210.
+        # Cada fila es el número de evaluadores que asignó cada categoría al sujeto
+        counts = [
+            [0, 0, 0, 0, 14], [0, 2, 6, 4, 2], [0, 0, 3, 5, 6], [0, 3, 9, 2, 0], [2, 2, 8, 1, 1],
+            [7, 7, 0, 0, 0], [3, 2, 6, 3, 0], [2, 5, 3, 2, 2], [6, 5, 2, 1, 0], [0, 2, 2, 3, 7],
+        ]
+        scores = np.array([np.repeat(np.arange(1, 6), row) for row in counts]).T  # Evaluadores × sujetos
+        result = self.agreement(scores)
+        self.assertEqual(result["units"], 10)
+        self.assertAlmostEqual(result["fleiss_kappa"], 0.210, places=3)
+
+    def test_identical_ratings(self):
+        # Todos los evaluadores coinciden en cada unidad: acuerdo perfecto
+        result = self.agreement([[2, 5, 9], [2, 5, 9], [2, 5, 9]])
+        self.assertEqual((result["alpha"], result["fleiss_kappa"]), (1.0, 1.0))
+        # Un mismo puntaje en todas las unidades: sin variación no hay acuerdo esperado y los coeficientes no existen
+        result = self.agreement([[7, 7], [7, 7], [7, 7]])
+        self.assertEqual((result["units"], result["alpha"], result["fleiss_kappa"], result["agreement"]), (2, None, None, None))
+
+        deviation, z_score = _outlier_evaluators(score_matrix([[2, 5, 9], [2, 5, 9], [2, 5, 9]]))
+        self.assertEqual(deviation.tolist(), [0, 0, 0])
+        self.assertEqual(z_score.tolist(), [0, 0, 0])
+
+    def test_single_evaluator(self):
+        result = self.agreement([[3, 8, 5]])
+        self.assertEqual((result["units"], result["alpha"], result["fleiss_kappa"]), (0, None, None))
+        deviation, z_score = _outlier_evaluators(score_matrix([[3, 8, 5]]))
+        self.assertTrue(np.isnan(deviation).all() and np.isnan(z_score).all())
+
+    def test_modified_z_score(self):
+        # Una unidad con puntajes 2, 3, 4, 5 y 20: la desviación frente al promedio de los demás es 6, 4.75, 3.5,
+        # 2.25 y 16.5; mediana 4.75 y MAD 1.25, de modo que z = 0.6745 × (d - 4.75) / 1.25
+        deviation, z_score = _outlier_evaluators(score_matrix([[2], [3], [4], [5], [20]]))
+        np.testing.assert_allclose(deviation, [6, 4.75, 3.5, 2.25, 16.5])
+        np.testing.assert_allclose(z_score, [0.6745, 0, -0.6745, -1.349, 6.3403])
+        self.assertEqual((z_score > OUTLIER_Z_SCORE).tolist(), [False, False, False, False, True])
+
+
+# Pruebas de la caché del catálogo de heurísticas entre procesos
+class HeuristicCatalogCacheTests(TestCase):
+    """
+    Una sincronización hecha por otro proceso (que no llama a 'invalidate' en este) debe cambiar el catálogo
+    servido, su ETag y la tabla de búsqueda de subprincipios.
+    """
+
+    def sync_from_another_process(self, fingerprint):
+        CatalogFingerprint.objects.update_or_create(name=CATALOG_NAME, defaults={'fingerprint': fingerprint})
+
+    def test_catalog_follows_the_stored_fingerprint(self):
+        first = self.client.get('/api/heuristics/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.client.get('/api/heuristics/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        heuristic = Heuristic.objects.order_by('id').first()
+        Heuristic.objects.filter(pk=heuristic.pk).update(title='Título sincronizado')
+        self.sync_from_another_process('otra huella')
+
+        second = self.client.get('/api/heuristics/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertIn('Título sincronizado', second.content.decode('utf-8'))
+
+    def test_subprinciple_lookup_follows_the_stored_fingerprint(self):
+        subprinciple = Subprinciple.objects.order_by('id').first()
+        self.assertIn(subprinciple.code, get_subprinciple_lookup())
+
+        Subprinciple.objects.filter(pk=subprinciple.pk).update(code='NUEVO')
+        self.sync_from_another_process('otra huella')
+
+        self.assertEqual(get_subprinciple_lookup()['NUEVO'].subprinciple_id, subprinciple.id)
+
+
+# Pruebas del número de consultas de los POST que guardan respuestas
+class SaveQueryCountTests(TestCase):
+    """
+    Los guardados parciales y la finalización escriben todas las respuestas en bloque (ver 'bulk_writers'): el
+    número de consultas no depende del número de preguntas ni de subprincipios.
+    """
+
+    def setUp(self):
+        get_subprinciple_lookup()  # Tabla de búsqueda del catálogo ya cargada, como en un proceso en marcha
+
+    def heuristic_payload(self, design_test):
+        questions = DesignQuestion.objects.filter(test_id=design_test).prefetch_related('heuristics__subprinciples')
+        return [
+            {
+                "question_id": question.question_id,
+                "heuristics": [
+                    {
+                        "heuristic_code": heuristic.code,
+                        "comment": "Comentario",
+                        "subprinciples": [{"subprinciple_code": sub.code, "response_value": 3} for sub in heuristic.subprinciples.all()],
+                    }
+                    for heuristic in question.heuristics.all()
+                ],
+            }
+            for question in questions
+        ]
+
+    def test_heuristic_saves_queries_are_constant(self):
+        for questions in (1, 3):
+            design_test = create_finalized_test(0, questions, True, offset=questions)
+            access = add_evaluator(design_test, 'heuristic%d' % questions)
+            responses = self.heuristic_payload(design_test)
+
+            url = '/api/designtests/%d/evaluatorheuristicresponses/%d/' % (design_test.test_id, access.evaluator_id_id)
+            for response_data in responses:
+                with self.assertNumQueries(HEURISTIC_SAVE_QUERIES):
+                    response = self.client.post(url, response_data, content_type='application/json')
+                self.assertEqual(response.status_code, 201)
+
+            url = '/api/designtests/%d/evaluatorheuristicresponsesfinalize/' % design_test.test_id
+            with self.assertNumQueries(HEURISTIC_FINALIZE_SAVE_QUERIES):
+                response = self.client.post(url, {"evaluator_id": access.evaluator_id_id, "responses": responses}, content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(EvaluatorHeuristicResponse.objects.filter(evaluator_access=access, is_complete=False).exists())
+            access.refresh_from_db()
+            self.assertTrue(access.acceso_bloqueado)
+
+    def test_standard_saves_queries_are_constant(self):
+        for questions in (1, 3):
+            design_test = create_finalized_test(0, questions, False, offset=questions)
+            access = add_evaluator(design_test, 'standard%d' % questions)
+            responses = [
+                {"question": question_id, "response_value": 4, "comment": "Comentario"}
+                for question_id in DesignQuestion.objects.filter(test_id=design_test).values_list('question_id', flat=True)
+            ]
+
+            url = '/api/designtests/%d/evaluatorstandardresponses/%d/' % (design_test.test_id, access.evaluator_id_id)
+            with self.assertNumQueries(STANDARD_SAVE_QUERIES):
+                response = self.client.post(url, {"responses": responses}, content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+
+            url = '/api/designtests/%d/evaluatorstandardresponsesfinalize/' % design_test.test_id
+            with self.assertNumQueries(STANDARD_FINALIZE_SAVE_QUERIES):
+                response = self.client.post(url, {"evaluator_id": access.evaluator_id_id, "responses": responses}, content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(EvaluatorStandardResponse.objects.filter(evaluator_access=access, is_complete=False).exists())
+            access.refresh_from_db()
+            self.assertTrue(access.acceso_bloqueado)
+
+
+# Pruebas del listado de pruebas accesibles de un evaluador
+class EvaluatorAccessListTests(TestCase):
+    """
+    'is_complete' debe salir de la tabla de respuestas que corresponde al tipo de prueba: las respuestas completas
+    de la otra tabla no cuentan. El listado se construye con una sola consulta.
+    """
+
+    def test_is_complete_uses_the_responses_of_the_test_type(self):
+        evaluator = User.objects.create(username='evaluator', email='evaluator@example.com', rol='Evaluador', password='x')
+        expected = {}
+        for offset, (has_heuristics, kind) in enumerate(((True, 'heuristic'), (True, 'standard'), (False, 'standard'), (False, 'heuristic'))):
+            design_test = create_finalized_test(0, 1, has_heuristics, offset=offset)
+            access = EvaluatorAccess.objects.create(evaluator_id=evaluator, test_id=design_test, acceso_bloqueado=False)
+            question = DesignQuestion.objects.get(test_id=design_test)
+            # Una respuesta completa en la tabla 'kind', sea o no la del tipo de prueba
+            if kind == 'heuristic':
+                EvaluatorHeuristicResponse.objects.create(
+                    score=3, is_complete=True, evaluator_access=access, test=design_test, question=question, evaluator=evaluator,
+                    subprinciple_id=Subprinciple.objects.order_by('id').values_list('id', flat=True).first(),
+                )
+            else:
+                EvaluatorStandardResponse.objects.create(
+                    response_type='Calificacion', response_value=3, is_complete=True, evaluator_access=access,
+                    evaluator=evaluator, test=design_test, question=question,
+                )
+            expected[design_test.test_id] = has_heuristics == (kind == 'heuristic')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/designtests/access/%d/' % evaluator.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({item['test_id']: item['is_complete'] for item in response.json()}, expected)
+        self.assertEqual([item['has_heuristics'] for item in response.json()], [True, True, False, False])
+
+    def test_pages_follow_the_access_order(self):
+        evaluator = User.objects.create(username='evaluator', email='evaluator@example.com', rol='Evaluador', password='x')
+        for offset in range(3):
+            EvaluatorAccess.objects.create(evaluator_id=evaluator, test_id=create_finalized_test(0, 1, False, offset=offset))
+        access_ids = list(EvaluatorAccess.objects.filter(evaluator_id=evaluator).order_by('access_id').values_list('access_id', flat=True))
+
+        first = self.client.get('/api/designtests/access/%d/?page_size=2' % evaluator.id).json()
+        self.assertEqual([item['access_id'] for item in first['results']], access_ids[:2])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([item['access_id'] for item in second['results']], access_ids[2:])
+        self.assertIsNone(second['next'])
+        self.assertEqual(self.client.get('/api/designtests/access/%d/?cursor=invalido' % evaluator.id).status_code, 404)
+
+
+# Pruebas de la proyección '?fields=' y la paginación por cursor de los listados
+class ListResponseTests(TestCase):
+    """
+    'list_response' con y sin la ruta rápida: páginas por cursor, cursores inválidos y proyecciones vacías o
+    con campos desconocidos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for offset in range(3):
+            create_finalized_test(0, 1, False, offset=offset)
+
+    def get(self, query, fast):
+        request = Request(RequestFactory().get('/api/designtest/' + query))
+        response = list_response(request, DesignTest.objects.all(), DesignTestSerializer, fast=fast)
+        if isinstance(response, Response):  # Errores y páginas de DRF, sin renderizar
+            return response.status_code, response.data
+        return response.status_code, json.loads(response.content)
+
+    def test_pages_cover_every_row_once(self):
+        test_ids = list(DesignTest.objects.order_by('test_id').values_list('test_id', flat=True))
+        for fast in (False, True):
+            with self.subTest(fast=fast):
+                status_code, page = self.get('?page_size=2&fields=test_id', fast)
+                self.assertEqual(status_code, 200)
+                self.assertEqual(page['results'], [{'test_id': test_id} for test_id in test_ids[:2]])
+                status_code, page = self.get('?' + page['next'].split('?', 1)[1], fast)
+                self.assertEqual(page['results'], [{'test_id': test_ids[2]}])
+                self.assertIsNone(page['next'])
+
+    def test_invalid_cursor_is_not_found(self):
+        for fast in (False, True):
+            with self.subTest(fast=fast):
+                status_code, data = self.get('?cursor=invalido', fast)
+                self.assertEqual(status_code, 404)
+                self.assertIn('error', data)
+
+    def test_empty_projection_returns_every_field(self):
+        readable = [name for name, field in DesignTestSerializer().fields.items() if not field.write_only]
+        for fast in (False, True):
+            for query in ('?fields=', '?fields=,', '?fields=%20,'):
+                with self.subTest(fast=fast, query=query):
+                    status_code, data = self.get(query, fast)
+                    self.assertEqual(status_code, 200)
+                    self.assertEqual(list(data[0]), readable)
+
+    def test_unknown_field_is_a_bad_request(self):
+        for fast in (False, True):
+            with self.subTest(fast=fast):
+                status_code, data = self.get('?fields=name,inexistente', fast)
+                self.assertEqual(status_code, 400)
+                self.assertIn('inexistente', data['error'])
+
+
+# Pruebas de la invalidación de la caché de resultados
+class ResultCacheTests(TestCase):
+    """
+    Los resultados guardados se invalidan cuando cambian respuestas completas, la lectura de la versión no escribe
+    y las respuestas finalizadas no se pueden modificar con un guardado parcial.
+    """
+
+    def setUp(self):
+        result_cache.get_store().clear()
+
+    def test_version_counter_is_created_with_the_test_and_read_without_writing(self):
+        owner = User.objects.create(username='owner', email='owner@example.com', rol='Propietario', password='x')
+        design_test = DesignTest.objects.create(name='Prueba', url='https://example.com', description='Prueba', test_type='Web', user=owner)
+        self.assertEqual(ResultCacheVersion.objects.get(test=design_test).version, 0)
+
+        ResultCacheVersion.objects.filter(test=design_test).delete()  # Prueba anterior a los contadores
+        with self.assertNumQueries(1):
+            version = result_cache.get_version(design_test)
+        self.assertTrue(version.endswith(':0'))
+        self.assertFalse(ResultCacheVersion.objects.filter(test=design_test).exists())
+
+        result_cache.bump([design_test.test_id])
+        self.assertNotEqual(result_cache.get_version(design_test), version)
+
+    def test_reading_the_version_does_not_route_a_write(self):
+        design_test = create_finalized_test(1, 1, True)
+        routing = RequestRouting('10.0.0.1')
+        token = _routing.set(routing)
+        try:
+            result_cache.get_version(design_test)
+            self.assertFalse(routing.wrote)  # Un GET de resultados no fija al cliente a la primaria
+            result_cache.bump([design_test.test_id])
+            self.assertTrue(routing.wrote)
+        finally:
+            _routing.reset(token)
+
+    def test_deleting_a_test_with_results(self):
+        design_test = create_finalized_test(2, 2, True)
+        self.client.get('/api/designtests/%d/evaluatorheuristicresponsesfinalize/' % design_test.test_id)
+        design_test.delete()
+        self.assertFalse(ResultCacheVersion.objects.exists())
+
+    def test_partial_saves_after_finalizing_are_rejected(self):
+        heuristic_test = create_finalized_test(1, 1, True)
+        standard_test = create_finalized_test(1, 1, False, offset=1)
+        heuristic = EvaluatorHeuristicResponse.objects.filter(test=heuristic_test).select_related('subprinciple__heuristic_id').first()
+        standard = EvaluatorStandardResponse.objects.get(test=standard_test)
+
+        response = self.client.post(
+            '/api/designtests/%d/evaluatorheuristicresponses/%d/' % (heuristic_test.test_id, heuristic.evaluator_id),
+            {"question_id": heuristic.question_id, "heuristics": [{
+                "heuristic_code": heuristic.subprinciple.heuristic_id.code,
+                "subprinciples": [{"subprinciple_code": heuristic.subprinciple.code, "response_value": heuristic.score % 10 + 1}],
+            }]},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(
+            '/api/designtests/%d/evaluatorstandardresponses/%d/' % (standard_test.test_id, standard.evaluator_id),
+            {"responses": [{"question": standard.question_id, "response_value": standard.response_value % 5 + 1}]},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 403)
+
+        self.assertEqual(EvaluatorHeuristicResponse.objects.get(pk=heuristic.pk).score, heuristic.score)
+        self.assertEqual(EvaluatorStandardResponse.objects.get(pk=standard.pk).response_value, standard.response_value)
+
+    def test_changing_complete_responses_invalidates_cached_results(self):
+        for has_heuristics, kind in ((True, 'heuristic'), (False, 'standard')):
+            with self.subTest(kind=kind):
+                design_test = create_finalized_test(1, 1, has_heuristics, offset=int(has_heuristics))
+                access = EvaluatorAccess.objects.get(test_id=design_test)
+                url = '/api/designtests/%d/evaluator%sresponsesfinalize/' % (design_test.test_id, kind)
+                before = self.client.get(url).content
+
+                question = DesignQuestion.objects.get(test_id=design_test)
+                if has_heuristics:
+                    response = EvaluatorHeuristicResponse.objects.filter(evaluator_access=access).first()
+                    save_heuristic_responses(access, design_test.test_id, access.evaluator_id_id,
+                                             [(question.question_id, response.subprinciple_id, response.score % 10 + 1, 'Nuevo')], True)
+                else:
+                    save_standard_responses(access, design_test.test_id, access.evaluator_id_id, [(question, 5, 'Nuevo')], True)
+
+                after = self.client.get(url).content
+                self.assertNotEqual(after, before)
+                self.assertIn(b'Nuevo', after)
+
+
+# Pruebas del detector de consultas N+1 con QUERY_DETECTOR_RAISE
+@override_settings(QUERY_DETECTOR_ENABLED=True, QUERY_DETECTOR_THRESHOLD=3, QUERY_DETECTOR_SLOW_MS=None, QUERY_DETECTOR_RAISE=True)
+class QueryDetectorTests(TestCase):
+    """
+    Con QUERY_DETECTOR_RAISE las consultas repetidas hacen fallar la solicitud en lugar de solo registrar el aviso.
+    """
+
+    def setUp(self):
+        result_cache.get_store().clear()
+        self.users = [User.objects.create(username='user%d' % n, email='user%d@example.com' % n, rol='Evaluador', password='x') for n in range(5)]
+
+    def n_plus_one(self, request=None):
+        for user in self.users:
+            EvaluatorAccess.objects.filter(evaluator_id=user).count()
+        return Response()
+
+    def test_repeated_queries_raise(self):
+        with self.assertLogs('aplications.query_detector', 'WARNING'), self.assertRaises(NPlusOneDetected) as raised:
+            with detect_queries('bucle'):
+                self.n_plus_one()
+        self.assertIn('[5 veces', str(raised.exception))
+
+    def test_middleware_raises(self):
+        middleware = QueryDetectorMiddleware(self.n_plus_one)
+        with self.assertLogs('aplications.query_detector', 'WARNING'), self.assertRaises(NPlusOneDetected):
+            middleware(RequestFactory().get('/bucle/'))
+
+    def test_repeated_queries_are_only_logged_without_raise(self):
+        with override_settings(QUERY_DETECTOR_RAISE=False), self.assertLogs('aplications.query_detector', 'WARNING') as logs:
+            QueryDetectorMiddleware(self.n_plus_one)(RequestFactory().get('/bucle/'))
+        self.assertIn('repetidas', logs.output[0])
+
+    def test_results_views_pass_the_detector(self):
+        for has_heuristics, kind in ((True, 'heuristic'), (False, 'standard')):
+            design_test = create_finalized_test(6, 3, has_heuristics, offset=int(has_heuristics))
+            response = self.client.get('/api/designtests/%d/evaluator%sresponsesfinalize/' % (design_test.test_id, kind))
+            self.assertEqual(response.status_code, 200)
+
+
+# Vistas de prueba para el enrutamiento: devuelven la base de datos a la que el router envía una lectura
+def routed_read(request):
+    return Response(PrimaryReplicaRouter().db_for_read(User))
+
+
+def routed_write(request):
+    PrimaryReplicaRouter().db_for_write(User)
+    return routed_read(request)
+
+
+@read_only
+def read_only_read(request):
+    return routed_read(request)
+
+
+@read_only
+def read_only_write(request):
+    return routed_write(request)
+
+
+# Pruebas del enrutamiento a la réplica y de la lectura de las propias escrituras
+@mock.patch('aplications.db_router.replica_configured', return_value=True)
+class ReplicaRoutingTests(SimpleTestCase):
+    """
+    Las lecturas de las vistas 'read_only' van a la réplica salvo que el cliente haya escrito hace poco: después
+    de una escritura, sus lecturas van a la primaria durante DB_REPLICA_STICKY_SECONDS.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def request(self, method, view, client='10.0.0.1'):
+        request = getattr(RequestFactory(), method)('/', REMOTE_ADDR=client)
+        middleware = ReplicaRoutingMiddleware(lambda request: middleware.process_view(request, view, (), {}) or view(request))
+        return middleware(request).data
+
+    def test_reads_of_read_only_views_go_to_the_replica(self, configured):
+        self.assertEqual(self.request('get', read_only_read), REPLICA_DB_ALIAS)
+        self.assertEqual(self.request('get', routed_read), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.request('post', read_only_read), DEFAULT_DB_ALIAS)
+
+    def test_read_after_write_goes_to_the_primary(self, configured):
+        self.assertEqual(self.request('post', routed_write), DEFAULT_DB_ALIAS)
+        self.assertTrue(is_pinned('10.0.0.1'))
+
+        self.assertEqual(self.request('get', read_only_read), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.request('get', read_only_read, client='10.0.0.2'), REPLICA_DB_ALIAS)
+
+    def test_write_in_a_read_only_view_pins_the_client(self, configured):
+        self.assertEqual(self.request('get', read_only_write), REPLICA_DB_ALIAS)
+        self.assertEqual(self.request('get', read_only_read), DEFAULT_DB_ALIAS)
+
+    def test_reads_do_not_pin_the_client(self, configured):
+        self.request('get', read_only_read)
+        self.assertFalse(is_pinned('10.0.0.1'))
+        self.assertEqual(self.request('get', read_only_read), REPLICA_DB_ALIAS)
+
+
+# Función para comparar resultados serializados sin depender del orden de las relaciones muchos a muchos
+def normalize(data):
+    return [
+        {key: sorted(value) if isinstance(value, list) else value for key, value in item.items()}
+        for item in json.loads(json.dumps(data))
+    ]
+
+
+# Pruebas de equivalencia entre 'FastSerializer' y los serializers de DRF
+class FastSerializerParityTests(TestCase):
+    """
+    La ruta rápida desde '.values()' debe producir lo mismo que el ModelSerializer de DRF, con todos los campos
+    y con una proyección '?fields='.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.heuristic_test = create_finalized_test(3, 2, True)
+        cls.standard_test = create_finalized_test(2, 2, False, offset=1)
+
+    def drf_data(self, serializer_class, model, fields=None):
+        many_to_many = [field.name for field in model._meta.many_to_many]
+        serializer = serializer_class(model.objects.order_by('pk').prefetch_related(*many_to_many), many=True)
+        for name in list(serializer.child.fields):
+            if fields is not None and name not in fields:
+                serializer.child.fields.pop(name)
+        return serializer.data
+
+    def readable_fields(self, serializer_class):
+        return [name for name, field in serializer_class().fields.items() if not field.write_only]
+
+    def test_all_fields_match_drf(self):
+        for serializer_class, model in FAST_SERIALIZERS:
+            with self.subTest(serializer=serializer_class.__name__):
+                expected = normalize(self.drf_data(serializer_class, model))
+                self.assertTrue(expected)
+                self.assertEqual(normalize(FastSerializer(serializer_class).serialize(model.objects.order_by('pk'))), expected)
+
+    def test_projected_fields_match_drf(self):
+        for serializer_class, model in FAST_SERIALIZERS:
+            # Uno de cada dos campos, incluido el último (la relación muchos a muchos de las preguntas)
+            readable = self.readable_fields(serializer_class)
+            fields = readable[::2] + readable[-1:]
+            with self.subTest(serializer=serializer_class.__name__, fields=fields):
+                expected = normalize(self.drf_data(serializer_class, model, fields))
+                actual = normalize(FastSerializer(serializer_class, fields).serialize(model.objects.order_by('pk')))
+                self.assertEqual(actual, expected)
+                self.assertEqual(set(actual[0]), set(fields))
+
+    def test_list_endpoints_match_drf(self):
+        factory = RequestFactory()
+        owner_id = self.heuristic_test.user_id
+        endpoints = (
+            ('/api/designtest/', DesignTest.objects.all(), DesignTestSerializer, 'name,created_at'),
+            ('/api/designtest/user/%d/' % owner_id, DesignTest.objects.filter(user_id=owner_id), DesignTestSerializer, 'test_id,user'),
+            ('/api/designquestions/', DesignQuestion.objects.all(), DesignQuestionSerializer, 'title,heuristics'),
+        )
+        for url, queryset, serializer_class, fields in endpoints:
+            for query in ('', '?fields=' + fields, '?fields=,'):
+                with self.subTest(url=url, query=query):
+                    response = self.client.get(url + query)
+                    self.assertEqual(response.status_code, 200)
+                    drf = list_response(Request(factory.get(url + query)), queryset, serializer_class)
+                    self.assertEqual(normalize(json.loads(response.content)), normalize(json.loads(drf.content)))
@@ -76,8 +76,21 @@ urlpatterns = [
     path('designtests/<int:test_id>/evaluatorheuristicresponsesfinalize/', API_FinalizeAndGetHeuristicResponses),  # Ruta para finalizar y ver respuestas completas
     # Finaliza para EvaluatorHeuristicResponses
 
+    # Inicia para ResultSummary
+    path('designtests/<int:test_id>/summary/', API_ResultSummary),  # Ruta para ver el resumen estadístico de los resultados
+    path('designtests/<int:test_id>/analytics/', API_HeuristicAnalytics),  # Ruta para ver el cumplimiento y la severidad por heurística y pregunta
+    path('designtests/<int:test_id>/agreement/', API_EvaluatorAgreement),  # Ruta para ver el acuerdo entre evaluadores y los evaluadores atípicos
+    # Finaliza para ResultSummary
+
+    # Inicia para Metrics
+    path('metrics/', API_Metrics),  # Ruta para exportar las métricas de las solicitudes en formato Prometheus
+    # Finaliza para Metrics
+
     # Inicia para Screenshot
     path('capture/', CaptureScreenshotView.as_view()), # Ruta para hacer la captura del frame
+    path('capture/jobs/<str:job_id>/', ScreenshotJobView.as_view()), # Ruta para consultar el estado de una captura encolada
+    path('capture/jobs/<str:job_id>/image/', ScreenshotJobImageView.as_view()), # Ruta para descargar la imagen de una captura encolada
+    path('capture/designtest/<int:test_id>/', BatchCaptureScreenshotView.as_view()), # Ruta para capturar todas las pantallas de una prueba de diseño en un ZIP
     # Finaliza para Screenshot
     
 ]
@@ -12,4 +12,7 @@ from .viewsDesignQuestion import *
 from .viewsEvaluatorAccess import *
 from .viewsEvaluatorStandardResponses import *
 from .viewsEvaluatorHeuristicResponses import *
+from .viewsResultSummary import *
+from .viewsAnalytics import *
+from .viewsMetrics import *
 from .viewsScreenshot import *
\ No newline at end of file
@@ -0,0 +1,89 @@
+from django.http import HttpResponse
+from rest_framework.decorators import api_view
+from aplications.db_router import read_only
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework import status
+from aplications.models import DesignTest, DesignQuestion
+from aplications.analytics import build_agreement, build_heuristic_analytics, load_score_matrix
+from aplications import result_cache
+from aplications.metrics import serialization_timer
+
+# Vista para obtener el cumplimiento y la severidad de una prueba de diseño con heurísticas
+@read_only
+@api_view(['GET'])
+def API_HeuristicAnalytics(request, test_id):
+    """
+    GET: Devuelve el porcentaje de cumplimiento, el promedio, la desviación estándar y el nivel de severidad
+    de la prueba completa, de cada heurística, de cada pregunta y de cada heurística dentro de cada pregunta,
+    calculados en el servidor sobre la matriz evaluador × subprincipio.
+
+    El resultado se guarda en la caché de resultados hasta que otro evaluador finaliza.
+
+    Parámetros:
+    - test_id: ID de la prueba de diseño.
+    """
+    try:
+        design_test = DesignTest.objects.get(test_id=test_id)
+    except DesignTest.DoesNotExist:
+        return Response({"error": "La prueba de diseño no existe."}, status=status.HTTP_404_NOT_FOUND)
+
+    if not design_test.has_heuristics:
+        return Response({"error": "La prueba de diseño no tiene heurísticas."}, status=status.HTTP_400_BAD_REQUEST)
+
+    version = result_cache.get_version(design_test)
+    body = result_cache.read('heuristic_analytics', test_id, version)
+    if body is not None:
+        return HttpResponse(body, content_type='application/json')
+
+    # Cargar en una sola consulta los puntajes de los evaluadores que han finalizado la prueba
+    matrix = load_score_matrix(test_id)
+    if matrix is None:
+        return Response({"error": "No hay evaluadores que hayan completado esta prueba."}, status=status.HTTP_404_NOT_FOUND)
+
+    questions = list(DesignQuestion.objects.filter(test_id=test_id).only('question_id', 'title'))
+    response_data = build_heuristic_analytics(design_test, questions, matrix)
+    with serialization_timer():
+        rendered = JSONRenderer().render(response_data)
+    body = result_cache.write('heuristic_analytics', test_id, version, rendered)
+    return HttpResponse(body, content_type='application/json')
+
+
+# Vista para obtener el acuerdo entre evaluadores de una prueba de diseño con heurísticas
+@read_only
+@api_view(['GET'])
+def API_EvaluatorAgreement(request, test_id):
+    """
+    GET: Devuelve el acuerdo entre evaluadores (alfa de Krippendorff y kappa de Fleiss) de la prueba completa,
+    de cada heurística y de cada pregunta, y la desviación de cada evaluador respecto al consenso, marcando a
+    los evaluadores atípicos.
+
+    El resultado se guarda en la caché de resultados hasta que otro evaluador finaliza.
+
+    Parámetros:
+    - test_id: ID de la prueba de diseño.
+    """
+    try:
+        design_test = DesignTest.objects.get(test_id=test_id)
+    except DesignTest.DoesNotExist:
+        return Response({"error": "La prueba de diseño no existe."}, status=status.HTTP_404_NOT_FOUND)
+
+    if not design_test.has_heuristics:
+        return Response({"error": "La prueba de diseño no tiene heurísticas."}, status=status.HTTP_400_BAD_REQUEST)
+
+    version = result_cache.get_version(design_test)
+    body = result_cache.read('evaluator_agreement', test_id, version)
+    if body is not None:
+        return HttpResponse(body, content_type='application/json')
+
+    # Cargar en una sola consulta los puntajes de los evaluadores que han finalizado la prueba
+    matrix = load_score_matrix(test_id)
+    if matrix is None:
+        return Response({"error": "No hay evaluadores que hayan completado esta prueba."}, status=status.HTTP_404_NOT_FOUND)
+
+    questions = list(DesignQuestion.objects.filter(test_id=test_id).only('question_id', 'title'))
+    response_data = build_agreement(design_test, questions, matrix)
+    with serialization_timer():
+        rendered = JSONRenderer().render(response_data)
+    body = result_cache.write('evaluator_agreement', test_id, version, rendered)
+    return HttpResponse(body, content_type='application/json')
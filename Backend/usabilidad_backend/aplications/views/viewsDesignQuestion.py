@@ -1,23 +1,42 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from rest_framework import status
 from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
+from aplications.db_router import read_only
 from rest_framework.exceptions import ParseError
-from aplications.models import DesignQuestion, DesignTest, Heuristic
-from aplications.serializers import DesignQuestionSerializer, HeuristicSerializer
+from aplications.models import DesignQuestion, DesignTest
+from aplications.serializers import DesignQuestionSerializer
 from django.db import IntegrityError
+from aplications import heuristic_catalog
+from aplications.pagination import list_response
+from aplications.fast_serializers import FastSerializer, render_json
+
+# Función para obtener el ETag del catálogo de heurísticas
+def _heuristics_etag(request):
+    try:
+        return heuristic_catalog.get_catalog().etag
+    except Exception:
+        return None  # La vista devolverá el error
+
 
 # Vista para obtener todas las heurísticas con sus subprincipios
+@cache_control(public=True, max_age=settings.HEURISTIC_CATALOG_MAX_AGE)
+@condition(etag_func=_heuristics_etag)
 @api_view(['GET'])
 def API_GetHeuristics(request):
     """
     GET: Devuelve todas las heurísticas y sus subprincipios.
+
+    El JSON se construye una sola vez por proceso y versión del catálogo (ver 'heuristic_catalog') y se sirve con un ETag fuerte;
+    si el cliente envía 'If-None-Match' con ese ETag se responde 304 sin cuerpo.
     """
     try:
-        heuristics = Heuristic.objects.all()  # Obtener todas las heurísticas
-        serializer = HeuristicSerializer(heuristics, many=True)  # Usar el nuevo serializer que incluye subprincipios
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        catalog = heuristic_catalog.get_catalog()
+        return HttpResponse(catalog.body, content_type='application/json', status=status.HTTP_200_OK)
     except Exception as e:
         return Response({"error": f"Ocurrió un error inesperado al obtener las heurísticas: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -32,15 +51,15 @@ def API_CheckHeuristics(request, test_id):
 
 
 # Vista para obtener todas las preguntas de diseño
+@read_only
 @api_view(['GET'])
 def API_AllDesignQuestions(request):
     """
     GET: Devuelve todas las preguntas de diseño almacenadas en la base de datos.
     """
     try:
-        questions = DesignQuestion.objects.all()  # Obtener todas las preguntas de diseño
-        serializer = DesignQuestionSerializer(questions, many=True)
-        return JsonResponse(serializer.data, safe=False)
+        # Obtener todas las preguntas de diseño, con ?fields= y paginación por cursor opcionales
+        return list_response(request, DesignQuestion.objects.all(), DesignQuestionSerializer, fast=True)
     except Exception as e:
         return Response({"error": "Ocurrió un error inesperado al obtener todas las preguntas de diseño."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -65,8 +84,7 @@ def API_DesignQuestions(request, test_id):
     if request.method == 'GET':
         try:
             questions = DesignQuestion.objects.filter(test_id=design_test)  # Filtrar preguntas por prueba de diseño
-            serializer = DesignQuestionSerializer(questions, many=True)
-            return JsonResponse(serializer.data, safe=False)
+            return list_response(request, questions, DesignQuestionSerializer, fast=True)
         except Exception as e:
             return Response({"error": f"Ocurrió un error inesperado al obtener las preguntas de diseño: {str(e)}"},status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
@@ -134,8 +152,8 @@ def API_DesignQuestions_Details(request, test_id, question_id):
 
     if request.method == 'GET':
         try:
-            serializer = DesignQuestionSerializer(question)
-            return JsonResponse(serializer.data, safe=False)
+            # Serialización rápida de solo lectura: las heurísticas se leen con una consulta a la tabla intermedia
+            return render_json(FastSerializer(DesignQuestionSerializer).serialize_instance(question))
         except Exception as e:
             return Response({"error": f"Ocurrió un error inesperado: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
@@ -1,13 +1,20 @@
+import logging
 from django.http import JsonResponse
 from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view
+from aplications.db_router import read_only
 from aplications.models import DesignTest
 from aplications.serializers import DesignTestSerializer
+from aplications.pagination import list_response
+from aplications.fast_serializers import FastSerializer, render_json
 from django.core.exceptions import ValidationError
 
+logger = logging.getLogger(__name__)
+
 # Vista para listar todas las pruebas de diseño o crear una nueva
+@read_only
 @api_view(['GET', 'POST'])
 def API_DesignTest(request):
     """
@@ -16,10 +23,8 @@ def API_DesignTest(request):
     """
     try:
         if request.method == 'GET':
-            # Obtener todas las pruebas de diseño
-            design_tests = DesignTest.objects.all()
-            serializer = DesignTestSerializer(design_tests, many=True)
-            return JsonResponse(serializer.data, safe=False)
+            # Obtener todas las pruebas de diseño, con ?fields= y paginación por cursor opcionales
+            return list_response(request, DesignTest.objects.all(), DesignTestSerializer, fast=True)
         
         elif request.method == 'POST':
             # Crear una nueva prueba de diseño
@@ -42,11 +47,12 @@ def API_DesignTest(request):
 
     except ValidationError as e:
         return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-    except Exception as e:
-        print(f"Error: {str(e)}")  # Esto te ayudará a depurar en la consola de Django
+    except Exception:
+        logger.exception("Error al listar o crear pruebas de diseño")
         return JsonResponse({"error": "Ocurrió un error inesperado. Por favor, inténtalo de nuevo más tarde."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # Vista para listar todas las pruebas de diseño por evaluador
+@read_only
 @api_view(['GET'])
 def API_DesignTests_ByUser(request, user):
     """
@@ -56,12 +62,10 @@ def API_DesignTests_ByUser(request, user):
     - user_id: ID del usuario.
     """
     try:
-        # Obtener todas las pruebas de diseño del usuario
-        design_tests = DesignTest.objects.filter(user_id=user)
-        serializer = DesignTestSerializer(design_tests, many=True)
-        return JsonResponse(serializer.data, safe=False)
-    except Exception as e:
-        print(f"Error: {str(e)}")
+        # Obtener todas las pruebas de diseño del usuario, con ?fields= y paginación por cursor opcionales
+        return list_response(request, DesignTest.objects.filter(user_id=user), DesignTestSerializer, fast=True)
+    except Exception:
+        logger.exception("Error al obtener las pruebas de diseño del usuario %s", user)
         return JsonResponse({"error": "Ocurrió un error al obtener las pruebas de diseño."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # Vista para obtener, actualizar o eliminar una prueba de diseño por su ID
@@ -80,15 +84,14 @@ def API_DesignTest_Details(request, pk):
         design_test = DesignTest.objects.get(test_id=pk)
     except DesignTest.DoesNotExist:
         return JsonResponse({"error": "La prueba de diseño no existe."}, status=status.HTTP_404_NOT_FOUND)
-    except Exception as e:
-        print(f"Error: {str(e)}")
+    except Exception:
+        logger.exception("Error al buscar la prueba de diseño %s", pk)
         return JsonResponse({"error": "Ocurrió un error al buscar la prueba de diseño."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     try:
         if request.method == 'GET':
-            # Devolver los detalles de la prueba de diseño
-            serializer = DesignTestSerializer(design_test)
-            return JsonResponse(serializer.data, safe=False)
+            # Devolver los detalles de la prueba de diseño (serialización rápida de solo lectura)
+            return render_json(FastSerializer(DesignTestSerializer).serialize_instance(design_test))
         
         elif request.method == 'PUT':
             # Actualizar la prueba de diseño
@@ -106,8 +109,8 @@ def API_DesignTest_Details(request, pk):
     
     except ValidationError as e:
         return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-    except Exception as e:
-        print(f"Error: {str(e)}")
+    except Exception:
+        logger.exception("Error al actualizar o eliminar la prueba de diseño %s", pk)
         return JsonResponse({"error": "Ocurrió un error inesperado. Por favor, inténtalo de nuevo más tarde."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # Vista para verificar si el codigo ya está en uso
@@ -120,6 +123,6 @@ def API_CheckCodeAvailability(request, code):
         # Buscar si existe una prueba con ese código
         exists = DesignTest.objects.filter(code=code).exists()
         return JsonResponse({'exists': exists})
-    except Exception as e:
-        print(f"Error: {str(e)}")
+    except Exception:
+        logger.exception("Error al verificar el código %s", code)
         return JsonResponse({"error": "Ocurrió un error al verificar el código."}, status=500)
@@ -1,12 +1,16 @@
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
-from aplications.models import EvaluatorAccess, DesignTest, EvaluatorStandardResponse
+from aplications.db_router import read_only
+from aplications.models import EvaluatorAccess, DesignTest, EvaluatorStandardResponse, EvaluatorHeuristicResponse
 from aplications.serializers import EvaluatorAccessSerializer
+from aplications.pagination import KeysetPagination, wants_pagination
+from django.db.models import BooleanField, Case, Exists, OuterRef, When
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 
 # Vista para gestionar el acceso de los evaluadores a las pruebas de diseño
+@read_only
 @api_view(['GET', 'POST'])
 def API_Access_DesignTest(request, evaluator_id):
     """
@@ -49,20 +53,38 @@ def API_Access_DesignTest(request, evaluator_id):
 
     # Método GET para obtener todas las pruebas accesibles para el evaluador
     if request.method == 'GET':
-        access_entries = EvaluatorAccess.objects.filter(evaluator_id=evaluator_id, is_hidden=False)
-
-        if not access_entries:
-            return Response([], status=status.HTTP_200_OK)
+        # Respuestas completadas del evaluador en la prueba de cada acceso, en la tabla que corresponde al tipo de prueba
+        standard_complete = EvaluatorStandardResponse.objects.filter(
+            test=OuterRef('test_id'), evaluator=OuterRef('evaluator_id'), is_complete=True
+        )
+        heuristic_complete = EvaluatorHeuristicResponse.objects.filter(
+            test=OuterRef('test_id'), evaluator=OuterRef('evaluator_id'), is_complete=True
+        )
+
+        # Una sola consulta: accesos con su prueba de diseño y si el evaluador ya la completó
+        access_entries = (
+            EvaluatorAccess.objects
+            .filter(evaluator_id=evaluator_id, is_hidden=False, test_id__isnull=False)
+            .select_related('test_id')
+            .annotate(responses_complete=Case(
+                When(test_id__has_heuristics=True, then=Exists(heuristic_complete)),
+                default=Exists(standard_complete),
+                output_field=BooleanField(),
+            ))
+        )
+
+        # Paginación por cursor opcional (?page_size=...&cursor=...)
+        paginator = None
+        if wants_pagination(request):
+            paginator = KeysetPagination(ordering='access_id')
+            access_entries = paginator.paginate_queryset(access_entries, request)
+        else:
+            access_entries = access_entries.order_by('access_id')
 
         tests_data = []
-        # Iterar sobre cada acceso y construir la respuesta
+        # Construir la respuesta a partir de los accesos ya cargados
         for access in access_entries:
-            design_test = access.test_id  # Obtener el objeto DesignTest
-
-            # Verificar si hay respuestas completadas para esta prueba
-            responses_complete = EvaluatorStandardResponse.objects.filter(
-                evaluator_id=evaluator_id, test_id=design_test, is_complete=True
-            ).exists()
+            design_test = access.test_id  # Obtener el objeto DesignTest (cargado en la misma consulta)
 
             # Construir los datos de cada prueba accesible
             tests_data.append({
@@ -70,7 +92,7 @@ def API_Access_DesignTest(request, evaluator_id):
                 'acceso_bloqueado': access.acceso_bloqueado,
                 'accessed_at': access.accessed_at,
                 'is_hidden': access.is_hidden,
-                'is_complete': responses_complete,  # Verificar si la prueba está completa
+                'is_complete': access.responses_complete,  # Verificar si la prueba está completa
                 'evaluator_id': access.evaluator_id_id,
                 'test_id': design_test.test_id,
                 'code': design_test.code,
@@ -82,6 +104,8 @@ def API_Access_DesignTest(request, evaluator_id):
                 'has_heuristics': design_test.has_heuristics,
             })
 
+        if paginator is not None:
+            return paginator.get_paginated_response(tests_data)
         return Response(tests_data, status=status.HTTP_200_OK)
 
 # Vista para ocultar el acceso de un evaluador a una prueba de diseño
@@ -1,7 +1,15 @@
+from django.db import transaction
+from django.http import HttpResponse
 from rest_framework.decorators import api_view
+from aplications.db_router import read_only
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
-from aplications.models import EvaluatorHeuristicResponse, EvaluatorAccess, Subprinciple, DesignTest, DesignQuestion
+from aplications.models import EvaluatorHeuristicResponse, EvaluatorAccess, DesignTest, DesignQuestion
+from aplications.results import build_heuristic_results
+from aplications.bulk_writers import get_subprinciples_by_code, save_heuristic_responses
+from aplications import result_cache
+from aplications.metrics import serialization_timer
 
 # Vista para gestionar las respuestas parciales de un evaluador en una prueba de diseño con heurísticas
 @api_view(['GET', 'POST'])
@@ -22,13 +30,20 @@ def API_EvaluatorHeuristicResponse(request, test_id, evaluator_id):
 
     # POST: Guardar respuestas parciales
     if request.method == 'POST':
+        # Después de finalizar, las respuestas ya no se pueden modificar
+        if access.acceso_bloqueado:
+            return Response({"error": "El acceso ya está bloqueado. No puedes enviar más respuestas."}, status=status.HTTP_403_FORBIDDEN)
+
         responses_data = request.data.get('heuristics', [])
 
         if not responses_data:
             return Response({"error": "No se proporcionaron respuestas para guardar."}, status=status.HTTP_400_BAD_REQUEST)
 
+        question_id = request.data.get('question_id')
+
         try:
-            # Procesar cada heurística enviada
+            # Validar cada heurística enviada y reunir sus subprincipios
+            entries = []
             for heuristic_data in responses_data:
                 heuristic_code = heuristic_data.get('heuristic_code')
                 comment = heuristic_data.get('comment', '')  # Comentario a nivel de heurística
@@ -45,25 +60,20 @@ def API_EvaluatorHeuristicResponse(request, test_id, evaluator_id):
                     if not subprinciple_code or response_value is None:
                         return Response({"error": "Faltan datos: se requiere 'subprinciple_code' y 'response_value'."}, status=status.HTTP_400_BAD_REQUEST)
 
-                    # Buscar el subprincipio usando el código proporcionado
-                    try:
-                        subprinciple = Subprinciple.objects.get(code=subprinciple_code)
-                    except Subprinciple.DoesNotExist:
-                        return Response({"error": f"No se encontró el subprincipio con código {subprinciple_code}."}, status=status.HTTP_404_NOT_FOUND)
-
-                    # Guardar o actualizar las respuestas del subprincipio para el evaluador
-                    EvaluatorHeuristicResponse.objects.update_or_create(
-                        evaluator_id=evaluator_id,
-                        test_id=test_id,
-                        question_id=request.data.get('question_id'),
-                        subprinciple=subprinciple,
-                        defaults={
-                            'score': response_value,
-                            'comment': comment,  # Guardamos el comentario a nivel de heurística aquí
-                            'is_complete': False,  # Sigue siendo respuesta parcial
-                            'evaluator_access': access
-                        }
-                    )
+                    entries.append((subprinciple_code, response_value, comment))
+
+            # Resolver los códigos de subprincipio con la tabla de búsqueda del catálogo, sin consultas por puntaje
+            subprinciples = get_subprinciples_by_code(code for code, _, _ in entries)
+            for subprinciple_code, _, _ in entries:
+                if subprinciple_code not in subprinciples:
+                    return Response({"error": f"No se encontró el subprincipio con código {subprinciple_code}."}, status=status.HTTP_404_NOT_FOUND)
+
+            # Guardar o actualizar en bloque las respuestas de los subprincipios (siguen siendo respuestas parciales)
+            save_heuristic_responses(
+                access, test_id, evaluator_id,
+                [(question_id, subprinciples[code].subprinciple_id, value, comment) for code, value, comment in entries],
+                is_complete=False
+            )
 
             return Response({"message": "Respuestas guardadas correctamente."}, status=status.HTTP_201_CREATED)
         
@@ -98,6 +108,7 @@ def API_EvaluatorHeuristicResponse(request, test_id, evaluator_id):
 
 
 # Vista para finalizar las respuestas del evaluador en una prueba de diseño con heurísticas y bloquear el acceso
+@read_only
 @api_view(['GET', 'POST'])
 def API_FinalizeAndGetHeuristicResponses(request, test_id):
     """
@@ -115,90 +126,30 @@ def API_FinalizeAndGetHeuristicResponses(request, test_id):
         return Response({"error": "La prueba de diseño no existe."}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
+        # Devolver los resultados ya renderizados si no han cambiado desde la última consulta
+        version = result_cache.get_version(design_test)
+        body = result_cache.read('heuristic_results', test_id, version)
+        if body is not None:
+            return HttpResponse(body, content_type='application/json')
+
         # Obtener todas las preguntas asociadas a la prueba de diseño
-        questions = DesignQuestion.objects.filter(test_id=test_id)
-        if not questions.exists():
+        questions = list(DesignQuestion.objects.filter(test_id=test_id))
+        if not questions:
             return Response({"error": "No hay preguntas asociadas a esta prueba de diseño."}, status=status.HTTP_404_NOT_FOUND)
 
         # Obtener todos los evaluadores que han completado la prueba de diseño
-        evaluator_accesses = EvaluatorAccess.objects.filter(test_id=test_id, acceso_bloqueado=True)
-        if not evaluator_accesses.exists():
+        evaluator_accesses = list(EvaluatorAccess.objects.filter(test_id=test_id, acceso_bloqueado=True).select_related('evaluator_id'))
+        if not evaluator_accesses:
             return Response({"error": "No hay evaluadores que hayan completado esta prueba."}, status=status.HTTP_404_NOT_FOUND)
 
-        # Estructurar los datos para la respuesta
-        response_data = {
-            "design_test": {
-                "test_id": design_test.test_id,
-                "user_id": design_test.user_id,
-                "username": design_test.user_name,
-                "name": design_test.name,
-                "url": design_test.url,
-                "description": design_test.description,
-                "test_type": design_test.test_type,
-                "has_heuristics": design_test.has_heuristics,
-                "created_at": design_test.created_at,
-                "code": design_test.code
-            },
-            "evaluators": []
-        }
-
-        # Recorrer todos los evaluadores que han completado la prueba
-        for access in evaluator_accesses:
-            evaluator = access.evaluator_id
-
-            # Obtener respuestas completas del evaluador
-            responses = EvaluatorHeuristicResponse.objects.filter(
-                test_id=test_id, evaluator_id=evaluator.id, is_complete=True
-            )
-            if not responses.exists():
-                continue  # Si no hay respuestas, continuar con el siguiente evaluador
-
-            # Estructurar los datos para el evaluador y sus respuestas
-            evaluator_data = {
-                "evaluator_id": evaluator.id,
-                "username": evaluator.username,
-                "email": evaluator.email,
-                "responses": []
-            }
+        # Construir las respuestas completas de los evaluadores con un número constante de consultas
+        response_data = build_heuristic_results(design_test, questions, evaluator_accesses)
 
-            # Recorrer todas las preguntas y añadir las respuestas del evaluador
-            for question in questions:
-                question_data = {
-                    "question_id": question.question_id,
-                    "title": question.title,
-                    "description": question.description,
-                    "url_frame": question.url_frame,
-                    "heuristics": []
-                }
-
-                # Agrupar las respuestas del evaluador por heurística
-                heuristics_dict = {}
-                for response in responses.filter(question=question):
-                    heuristic_code = response.subprinciple.heuristic_id.code
-                    subprinciple_data = {
-                        "subprinciple_code": response.subprinciple.code,
-                        "subprinciple_subtitle": response.subprinciple.subtitle,
-                        "subprinciple_description": response.subprinciple.description,
-                        "response_value": response.score,
-                    }
-
-                    if heuristic_code not in heuristics_dict:
-                        heuristics_dict[heuristic_code] = {
-                            "heuristic_code": heuristic_code,
-                            "heuristic_title": response.subprinciple.heuristic_id.title,
-                            "comment": response.comment,  # Comentario a nivel de heurística
-                            "subprinciples": []
-                        }
-                    heuristics_dict[heuristic_code]["subprinciples"].append(subprinciple_data)
-
-                question_data["heuristics"] = list(heuristics_dict.values())
-                evaluator_data["responses"].append(question_data)
-
-            # Añadir el evaluador y sus respuestas a la lista de evaluadores
-            response_data["evaluators"].append(evaluator_data)
-
-        # Devolver las respuestas completas de los evaluadores
-        return Response(response_data, status=status.HTTP_200_OK)
+        # Guardar y devolver las respuestas completas de los evaluadores
+        with serialization_timer():
+            rendered = JSONRenderer().render(response_data)
+        body = result_cache.write('heuristic_results', test_id, version, rendered)
+        return HttpResponse(body, content_type='application/json')
 
     elif request.method == 'POST':
         evaluator_id = request.data.get('evaluator_id')
@@ -214,8 +165,9 @@ def API_FinalizeAndGetHeuristicResponses(request, test_id):
         if access.acceso_bloqueado:
             return Response({"error": "El acceso ya está bloqueado. No puedes enviar más respuestas."}, status=status.HTTP_403_FORBIDDEN)
 
-        # Procesar las respuestas finales del evaluador
+        # Validar las respuestas finales del evaluador
         responses_data = request.data.get('responses', [])
+        entries = []
         for response_data in responses_data:
             question_id = response_data.get('question_id')
             heuristics = response_data.get('heuristics', [])
@@ -240,29 +192,27 @@ def API_FinalizeAndGetHeuristicResponses(request, test_id):
                     if not subprinciple_code or response_value is None:
                         return Response({"error": "Faltan datos: se requiere 'subprinciple_code' y 'response_value'."}, status=status.HTTP_400_BAD_REQUEST)
 
-                    # Obtener el subprincipio asociado
-                    try:
-                        subprinciple = Subprinciple.objects.get(code=subprinciple_code)
-                    except Subprinciple.DoesNotExist:
-                        return Response({"error": f"No se encontró el subprincipio con código {subprinciple_code}."}, status=status.HTTP_404_NOT_FOUND)
-
-                    # Guardar o actualizar la respuesta del subprincipio, marcándola como completa
-                    EvaluatorHeuristicResponse.objects.update_or_create(
-                        evaluator_id=evaluator_id,
-                        test_id=test_id,
-                        question_id=question_id,
-                        subprinciple=subprinciple,
-                        defaults={
-                            'score': response_value,
-                            'comment': comment,  # Guardar el comentario a nivel de heurística aquí
-                            'is_complete': True,
-                            'evaluator_access': access
-                        }
-                    )
-
-        # Bloquear el acceso al evaluador después de finalizar las respuestas
-        access.acceso_bloqueado = True
-        access.save()
+                    entries.append((question_id, subprinciple_code, response_value, comment))
+
+        # Resolver los códigos de subprincipio con la tabla de búsqueda del catálogo
+        subprinciples_by_code = get_subprinciples_by_code(code for _, code, _, _ in entries)
+        for _, subprinciple_code, _, _ in entries:
+            if subprinciple_code not in subprinciples_by_code:
+                return Response({"error": f"No se encontró el subprincipio con código {subprinciple_code}."}, status=status.HTTP_404_NOT_FOUND)
+
+        # Guardar las respuestas como completas y bloquear el acceso en una sola transacción: si falla el bloqueo,
+        # las respuestas no quedan completas con el acceso abierto
+        with transaction.atomic():
+            # Guardar o actualizar en bloque las respuestas de los subprincipios, marcándolas como completas
+            save_heuristic_responses(
+                access, test_id, evaluator_id,
+                [(question_id, subprinciples_by_code[code].subprinciple_id, value, comment) for question_id, code, value, comment in entries],
+                is_complete=True
+            )
+
+            # Bloquear el acceso al evaluador después de finalizar las respuestas
+            access.acceso_bloqueado = True
+            access.save()
 
         return Response({"message": "Respuestas finalizadas y acceso bloqueado."}, status=status.HTTP_200_OK)
 
@@ -7,16 +7,15 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from aplications.models import  EvaluatorInfo
 from aplications.serializers import EvaluatorInfoSerializer
+from aplications.pagination import list_response
 
 @api_view(['GET','POST'])
 def API_EvaluatorInfo(request):
-    if request.metshod =='GET':
-        Datos_EvaluatorInfo=EvaluatorInfo.objects.all() # select * from HeuristicCheckList
-        serializer_EvaluatorInfo=EvaluatorInfoSerializer(Datos_EvaluatorInfo,many=True)
-        return JsonResponse(serializer_EvaluatorInfo.data,safe=False)
+    if request.method =='GET':
+        return list_response(request, EvaluatorInfo.objects.all(), EvaluatorInfoSerializer) # select * from EvaluatorInfo
     else:
         data_EvaluatorInfo=JSONParser().parse(request)
-        serializer_EvaluatorInfot=EvaluatorInfoSerializer(data=data_EvaluatorInfo)
+        serializer_EvaluatorInfo=EvaluatorInfoSerializer(data=data_EvaluatorInfo)
         if serializer_EvaluatorInfo.is_valid():
            serializer_EvaluatorInfo.save()
            return JsonResponse(serializer_EvaluatorInfo.data,status=status.HTTP_201_CREATED)
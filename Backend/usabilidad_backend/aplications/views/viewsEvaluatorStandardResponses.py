@@ -1,7 +1,15 @@
+from django.db import transaction
+from django.http import HttpResponse
 from rest_framework.decorators import api_view
+from aplications.db_router import read_only
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 from aplications.models import EvaluatorStandardResponse, EvaluatorAccess, DesignQuestion, DesignTest
+from aplications.results import build_standard_results
+from aplications.bulk_writers import get_test_questions, save_standard_responses
+from aplications import result_cache
+from aplications.metrics import serialization_timer
 
 # Vista para gestionar respuestas parciales o en curso de un evaluador en una prueba de diseño
 @api_view(['GET', 'POST'])
@@ -22,38 +30,33 @@ def API_EvaluatorStandardResponse(request, test_id, evaluator_id):
 
     # POST: Guardar respuestas parciales
     if request.method == 'POST':
+        # Después de finalizar, las respuestas ya no se pueden modificar
+        if access.acceso_bloqueado:
+            return Response({"error": "El acceso ya está bloqueado. No puedes enviar más respuestas."}, status=status.HTTP_403_FORBIDDEN)
+
         # Obtener el cuerpo de la solicitud, que contiene una lista de respuestas.
         responses_data = request.data.get('responses', [])
 
-        # Iterar a través de cada respuesta en los datos proporcionados.
+        # Validar cada respuesta en los datos proporcionados.
         for response_data in responses_data:
             question_id = response_data.get('question')
             response_value = response_data.get('response_value')
-            comment = response_data.get('comment', '')
 
             if not question_id or not response_value:
                 return Response({"error": "Faltan datos: se requiere 'question' y 'response_value'."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Intentar obtener la pregunta asociada para validar que existe y que pertenece a la prueba de diseño especificada.
-            try:
-                question = DesignQuestion.objects.get(question_id=question_id, test_id=test_id)
-            except DesignQuestion.DoesNotExist:
-                return Response({"error": f"No se encontró la pregunta con ID {question_id} para este test."}, status=status.HTTP_404_NOT_FOUND)
-
-            # Usar update_or_create para guardar o actualizar la respuesta.
-            # Si la respuesta ya existe, se actualiza; si no, se crea una nueva.
-            response, created = EvaluatorStandardResponse.objects.update_or_create(
-                evaluator_id=evaluator_id,
-                test_id=test_id,
-                question_id=question_id,
-                defaults={
-                    'response_type': question.response_type,
-                    'response_value': response_value,
-                    'comment': comment,
-                    'is_complete': False,
-                    'evaluator_access': access
-                }
-            )
+        # Obtener en una sola consulta las preguntas para validar que existen y que pertenecen a la prueba de diseño especificada.
+        questions = get_test_questions(test_id, [response_data.get('question') for response_data in responses_data])
+        rows = []
+        for response_data in responses_data:
+            question = questions.get(response_data.get('question'))
+            if question is None:
+                return Response({"error": f"No se encontró la pregunta con ID {response_data.get('question')} para este test."}, status=status.HTTP_404_NOT_FOUND)
+            rows.append((question, response_data.get('response_value'), response_data.get('comment', '')))
+
+        # Guardar o actualizar en bloque las respuestas.
+        # Si la respuesta ya existe, se actualiza; si no, se crea una nueva.
+        save_standard_responses(access, test_id, evaluator_id, rows, is_complete=False)
         return Response({"message": "Respuestas guardadas correctamente."}, status=status.HTTP_201_CREATED)
 
     # GET: Recuperar respuestas parciales guardadas del evaluador
@@ -85,6 +88,7 @@ def API_EvaluatorStandardResponse(request, test_id, evaluator_id):
     
 
 # Vista para finalizar las respuestas de un evaluador y bloquear el acceso a la prueba de diseño
+@read_only
 @api_view(['GET', 'POST'])
 def API_FinalizeAndGetStandardResponses(request, test_id):
     """
@@ -115,40 +119,34 @@ def API_FinalizeAndGetStandardResponses(request, test_id):
         if access.acceso_bloqueado:
             return Response({"error": "El acceso ya está bloqueado. No puedes enviar más respuestas."}, status=status.HTTP_403_FORBIDDEN)
 
-        # Procesar cada respuesta enviada en el cuerpo de la solicitud.
+        # Validar cada respuesta enviada en el cuerpo de la solicitud.
         responses_data = request.data.get('responses', [])
         for response_data in responses_data:
             question_id = response_data.get('question')
             response_value = response_data.get('response_value')
-            comment = response_data.get('comment', '')
 
             # Validar que se haya enviado la pregunta y la respuesta.
             if not question_id or response_value is None:
                 return Response({"error": "Faltan datos: se requiere 'question' y 'response_value'."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Verificar que la pregunta existe y pertenece a la prueba de diseño.
-            try:
-                question = DesignQuestion.objects.get(question_id=question_id, test_id=test_id)
-            except DesignQuestion.DoesNotExist:
-                return Response({"error": f"No se encontró la pregunta con ID {question_id} para este test."}, status=status.HTTP_404_NOT_FOUND)
-
-            # Guardar o actualizar la respuesta, marcándola como completa.
-            response, created = EvaluatorStandardResponse.objects.update_or_create(
-                evaluator_id=evaluator_id,
-                test_id=test_id,
-                question_id=question_id,
-                defaults={
-                    'response_type': question.response_type,
-                    'response_value': response_value,
-                    'comment': comment,
-                    'is_complete': True,
-                    'evaluator_access': access
-                }
-            )
-
-        # Bloquear el acceso del evaluador a la prueba de diseño después de finalizar las respuestas.
-        access.acceso_bloqueado = True
-        access.save()
+        # Verificar con una sola consulta que las preguntas existen y pertenecen a la prueba de diseño.
+        questions = get_test_questions(test_id, [response_data.get('question') for response_data in responses_data])
+        rows = []
+        for response_data in responses_data:
+            question = questions.get(response_data.get('question'))
+            if question is None:
+                return Response({"error": f"No se encontró la pregunta con ID {response_data.get('question')} para este test."}, status=status.HTTP_404_NOT_FOUND)
+            rows.append((question, response_data.get('response_value'), response_data.get('comment', '')))
+
+        # Guardar las respuestas como completas y bloquear el acceso en una sola transacción: si falla el bloqueo,
+        # las respuestas no quedan completas con el acceso abierto.
+        with transaction.atomic():
+            # Guardar o actualizar en bloque las respuestas, marcándolas como completas.
+            save_standard_responses(access, test_id, evaluator_id, rows, is_complete=True)
+
+            # Bloquear el acceso del evaluador a la prueba de diseño después de finalizar las respuestas.
+            access.acceso_bloqueado = True
+            access.save()
 
         return Response({"message": "Respuestas finalizadas y acceso bloqueado."}, status=status.HTTP_200_OK)
 
@@ -159,66 +157,25 @@ def API_FinalizeAndGetStandardResponses(request, test_id):
         except DesignTest.DoesNotExist:
             return Response({"error": "La prueba de diseño no existe."}, status=status.HTTP_404_NOT_FOUND)
 
+        # Devolver los resultados ya renderizados si no han cambiado desde la última consulta.
+        version = result_cache.get_version(design_test)
+        body = result_cache.read('standard_results', test_id, version)
+        if body is not None:
+            return HttpResponse(body, content_type='application/json')
+
         # Obtener todas las preguntas asociadas a la prueba de diseño.
-        questions = DesignQuestion.objects.filter(test_id=test_id)
-        if not questions.exists():
+        questions = list(DesignQuestion.objects.filter(test_id=test_id))
+        if not questions:
             return Response({"error": "No hay preguntas asociadas a esta prueba de diseño."}, status=status.HTTP_404_NOT_FOUND)
 
         # Obtener todos los evaluadores que han completado la prueba (acceso bloqueado).
-        evaluator_accesses = EvaluatorAccess.objects.filter(test_id=test_id, acceso_bloqueado=True)
-
-        # Estructurar los datos de las respuestas para cada evaluador.
-        response_data = {
-            "design_test": {
-                "test_id": design_test.test_id,
-                "name": design_test.name,
-                "url": design_test.url,
-                "description": design_test.description,
-                "test_type": design_test.test_type,
-                "has_heuristics": design_test.has_heuristics,
-                "created_at": design_test.created_at,
-                "code": design_test.code
-            },
-            "evaluators": []
-        }
-
-        # Recorrer cada evaluador que haya finalizado la prueba.
-        for access in evaluator_accesses:
-            evaluator = access.evaluator_id
-
-            # Obtener todas las respuestas completas del evaluador.
-            responses = EvaluatorStandardResponse.objects.filter(test_id=test_id, evaluator_id=evaluator.id, is_complete=True)
-
-            # Estructurar los datos del evaluador y sus respuestas.
-            evaluator_data = {
-                "evaluator_id": evaluator.id,
-                "username": evaluator.username,
-                "email": evaluator.email,
-                "responses": []
-            }
+        evaluator_accesses = EvaluatorAccess.objects.filter(test_id=test_id, acceso_bloqueado=True).select_related('evaluator_id')
+
+        # Pivotar todas las respuestas completas de la prueba en una sola consulta.
+        response_data = build_standard_results(design_test, questions, evaluator_accesses)
 
-            # Añadir cada pregunta y la respuesta del evaluador.
-            for question in questions:
-                response = responses.filter(question=question).first()
-
-                question_data = {
-                    "question": {
-                        "question_id": question.question_id,
-                        "title": question.title,
-                        "description": question.description,
-                        "url_frame": question.url_frame
-                    },
-                    "response": {
-                        "response_type": response.response_type if response else None,
-                        "response_value": response.response_value if response else None,
-                        "comment": response.comment if response else None
-                    }
-                }
-
-                evaluator_data["responses"].append(question_data)
-
-            # Añadir el evaluador y sus respuestas a la lista general.
-            response_data["evaluators"].append(evaluator_data)
-
-        # Devolver las respuestas completas de los evaluadores.
-        return Response(response_data, status=status.HTTP_200_OK)
+        # Guardar y devolver las respuestas completas de los evaluadores.
+        with serialization_timer():
+            rendered = JSONRenderer().render(response_data)
+        body = result_cache.write('standard_results', test_id, version, rendered)
+        return HttpResponse(body, content_type='application/json')
@@ -7,13 +7,12 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from aplications.models import HeuristicCheckList
 from aplications.serializers import HeuristicCheckListSerializer
+from aplications.pagination import list_response
 
 @api_view(['GET','POST'])
 def API_HeuristicCheckList(request):
     if request.method =='GET':
-        Datos_HeuristicCheckLists=HeuristicCheckList.objects.all() # select * from HeuristicCheckList
-        serializer_HeuristicCheckList=HeuristicCheckListSerializer(Datos_HeuristicCheckLists,many=True)
-        return JsonResponse(serializer_HeuristicCheckList.data,safe=False)
+        return list_response(request, HeuristicCheckList.objects.all(), HeuristicCheckListSerializer) # select * from HeuristicCheckList
     else:
         data_HeuristicCheckList=JSONParser().parse(request)
         serializer_HeuristicCheckList=HeuristicCheckListSerializer(data=data_HeuristicCheckList)
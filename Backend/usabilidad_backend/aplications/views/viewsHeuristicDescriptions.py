@@ -7,13 +7,12 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from aplications.models import HeuristicDescriptions
 from aplications.serializers import HeuristicDescriptionsSerializer
+from aplications.pagination import list_response
 
 @api_view(['GET','POST'])
 def API_HeuristicDescriptions(request):
-    if request.metshod =='GET':
-        Datos_HeuristicDescriptions=HeuristicDescriptions.objects.all() # select * from HeuristicCheckList
-        serializer_HeuristicDescriptions=HeuristicDescriptionsSerializer(Datos_HeuristicDescriptions,many=True)
-        return JsonResponse(serializer_HeuristicDescriptions.data,safe=False)
+    if request.method =='GET':
+        return list_response(request, HeuristicDescriptions.objects.all(), HeuristicDescriptionsSerializer) # select * from HeuristicDescriptions
     else:
         data_HeuristicDescriptions=JSONParser().parse(request)
         serializer_HeuristicDescriptions=HeuristicDescriptionsSerializer(data=data_HeuristicDescriptions)
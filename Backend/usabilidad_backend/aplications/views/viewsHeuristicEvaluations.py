@@ -7,13 +7,12 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from aplications.models import HeuristicEvaluations
 from aplications.serializers import HeuristicEvaluationsSerializer
+from aplications.pagination import list_response
 
 @api_view(['GET','POST'])
 def API_HeuristicEvaluations(request):
     if request.method =='GET':
-        Datos_HeuristicOwner=HeuristicEvaluations.objects.all() # select * from HeuristicCheckList
-        serializer_HeuristicEvaluations=HeuristicEvaluationsSerializer(Datos_HeuristicOwner,many=True)
-        return JsonResponse(serializer_HeuristicEvaluations.data,safe=False)
+        return list_response(request, HeuristicEvaluations.objects.all(), HeuristicEvaluationsSerializer) # select * from HeuristicEvaluations
     else:
         data_HeuristicEvaluations=JSONParser().parse(request)
         serializer_HeuristicEvaluations=HeuristicEvaluationsSerializer(data=data_HeuristicEvaluations)
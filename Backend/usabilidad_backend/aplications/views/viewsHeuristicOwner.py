@@ -7,13 +7,12 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from aplications.models import HeuristicOwner
 from aplications.serializers import HeuristicOwnerSerializer
+from aplications.pagination import list_response
 
 @api_view(['GET','POST'])
 def API_HeuristicOwner(request):
     if request.method =='GET':
-        Datos_HeuristicOwner=HeuristicOwner.objects.all() # select * from HeuristicCheckList
-        serializer_HeuristicOwner=HeuristicOwnerSerializer(Datos_HeuristicOwner,many=True)
-        return JsonResponse(serializer_HeuristicOwner.data,safe=False)
+        return list_response(request, HeuristicOwner.objects.all(), HeuristicOwnerSerializer) # select * from HeuristicOwner
     else:
         data_HeuristicOwner=JSONParser().parse(request)
         serializer_HeuristicOwner=HeuristicOwnerSerializer(data=data_HeuristicOwner)
@@ -0,0 +1,14 @@
+from django.http import HttpResponse
+from rest_framework.decorators import api_view
+from aplications.metrics import render_prometheus
+
+# Vista para exportar las métricas de las solicitudes en formato Prometheus
+@api_view(['GET'])
+def API_Metrics(request):
+    """
+    GET: Devuelve los cuantiles de tiempo, consultas SQL, serialización y tamaño de respuesta por ruta, y los
+    contadores de la caché de resultados, en el formato de texto de Prometheus.
+
+    Las métricas son del proceso que atiende la solicitud.
+    """
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -7,13 +7,12 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from aplications.models import  PorcentajeCheckList
 from aplications.serializers import PorcentajeCheckListSerializer
+from aplications.pagination import list_response
 
 @api_view(['GET','POST'])
 def API_PorcentajeCheckList(request):
-    if request.metshod =='GET':
-        Datos_PorcentajeCheckList=PorcentajeCheckList.objects.all() # select * from HeuristicCheckList
-        serializer_PorcentajeCheckList=PorcentajeCheckListSerializer(Datos_PorcentajeCheckList,many=True)
-        return JsonResponse(serializer_PorcentajeCheckList.data,safe=False)
+    if request.method =='GET':
+        return list_response(request, PorcentajeCheckList.objects.all(), PorcentajeCheckListSerializer) # select * from PorcentajeCheckList
     else:
         data_PorcentajeCheckList=JSONParser().parse(request)
         serializer_PorcentajeCheckList=PorcentajeCheckListSerializer(data=data_PorcentajeCheckList)
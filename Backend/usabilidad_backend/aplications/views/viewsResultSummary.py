@@ -0,0 +1,36 @@
+from rest_framework.decorators import api_view
+from aplications.db_router import read_only
+from rest_framework.response import Response
+from rest_framework import status
+from aplications.models import DesignTest, DesignQuestion, EvaluatorAccess
+from aplications.result_summary import build_summary
+
+# Vista para obtener el resumen estadístico de los resultados de una prueba de diseño
+@read_only
+@api_view(['GET'])
+def API_ResultSummary(request, test_id):
+    """
+    GET: Devuelve, por pregunta, el número de respuestas completas, el promedio, la desviación estándar, el mínimo,
+    el máximo y la distribución de los puntajes (por heurística y subprincipio en las pruebas con heurísticas).
+
+    El resumen se lee de 'ResultSummary', que se actualiza al guardar las respuestas, por lo que el coste
+    no depende del número de evaluadores.
+
+    Parámetros:
+    - test_id: ID de la prueba de diseño.
+    """
+    try:
+        design_test = DesignTest.objects.get(test_id=test_id)
+    except DesignTest.DoesNotExist:
+        return Response({"error": "La prueba de diseño no existe."}, status=status.HTTP_404_NOT_FOUND)
+
+    # Obtener todas las preguntas asociadas a la prueba de diseño
+    questions = list(DesignQuestion.objects.filter(test_id=test_id).only('question_id', 'title', 'response_type'))
+    if not questions:
+        return Response({"error": "No hay preguntas asociadas a esta prueba de diseño."}, status=status.HTTP_404_NOT_FOUND)
+
+    response_data = build_summary(design_test, questions)
+    # Número de evaluadores que han finalizado la prueba (acceso bloqueado)
+    response_data["evaluators_finalized"] = EvaluatorAccess.objects.filter(test_id=test_id, acceso_bloqueado=True).count()
+
+    return Response(response_data, status=status.HTTP_200_OK)
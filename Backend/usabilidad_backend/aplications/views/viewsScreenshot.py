@@ -1,14 +1,58 @@
-import time, os
+import io
+import json
+import math
+import os
+import zipfile
 from django.conf import settings
-from django.apps import apps
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from django.http import FileResponse
-from selenium.webdriver.common.by import By
+from rest_framework import status
+from django.http import FileResponse, HttpResponse
+from aplications.capture import get_or_capture, get_or_capture_batch, report_frame_url
+from aplications.models import DesignQuestion, DesignTest
+from aplications.screenshot_waits import get_wait_strategy
+from aplications import screenshot_jobs
+
+
+# Función para leer un número positivo del cuerpo de la solicitud
+def _positive_number(data, name, default, cast):
+    """
+    Raises:
+        ValueError: Si el valor no es un número finito mayor que cero.
+    """
+    value = data.get(name, default)
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        number = cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' debe ser un número mayor que cero.")
+    if not math.isfinite(number) or number <= 0:
+        raise ValueError(f"'{name}' debe ser un número mayor que cero.")
+    return number
+
+
+# Función para leer las opciones de captura del cuerpo de la solicitud
+def _capture_options(data):
+    """
+    Devuelve (wait_strategy, timeout, viewport, refresh) a partir del cuerpo de la solicitud.
+
+    El tiempo de espera se limita a SCREENSHOT_WAIT_TIMEOUT y el tamaño de la ventana a SCREENSHOT_MAX_VIEWPORT,
+    para que una solicitud no retenga un navegador del pool más de lo previsto ni pida una ventana enorme.
+
+    Raises:
+        ValueError: Si alguna opción no es válida.
+    """
+    wait_strategy = get_wait_strategy(data.get('wait'))
+    timeout = min(_positive_number(data, 'timeout', settings.SCREENSHOT_WAIT_TIMEOUT, float), settings.SCREENSHOT_WAIT_TIMEOUT)
+    default_width, default_height = settings.SCREENSHOT_VIEWPORT
+    max_width, max_height = settings.SCREENSHOT_MAX_VIEWPORT
+    viewport = (
+        min(_positive_number(data, 'width', default_width, int), max_width),
+        min(_positive_number(data, 'height', default_height, int), max_height),
+    )
+    refresh = str(data.get('refresh', '')).lower() in ('1', 'true', 'yes')
+    return wait_strategy, timeout, viewport, refresh
 
 
 # Vista para capturar una captura de pantalla de una URL utilizando Selenium
@@ -17,62 +61,140 @@ class CaptureScreenshotView(APIView):
     Vista para capturar una captura de pantalla de una URL proporcionada utilizando Selenium y devolverla como respuesta.
     """
 
-    def capture_screenshot(self, url, output_path):
-        """
-        Función para capturar la captura de pantalla de la URL proporcionada y guardarla en una ruta específica.
+    def post(self, request):
         """
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')  # Ejecutar en modo sin interfaz gráfica
-        chrome_options.add_argument('--no-sandbox')  # Para servidores
-        chrome_options.add_argument('--disable-dev-shm-usage')  # Optimización en entornos con poca memoria
-        chrome_options.add_argument('--disable-gpu')  # Evitar el uso de la GPU
+        POST: Recibe una URL y captura una captura de pantalla de la página web, devolviéndola como respuesta.
 
-        service = ChromeService(executable_path=ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        Las capturas se guardan en una caché direccionada por el hash de la URL normalizada y el viewport;
+        si existe una captura vigente se devuelve sin abrir el navegador.
 
-        try:
-            # Acceder a la URL y esperar hasta que se cargue completamente
-            driver.get(url)
-            
-            # Esperar que el iframe de Figma se cargue (esto puede necesitar ajustes)
-            time.sleep(10)  # Aumentar el tiempo de espera si es necesario
-            
-            # Verificar que el iframe de Figma está presente (puedes ajustar el selector si es necesario)
-            iframe = driver.find_element(By.TAG_NAME, 'iframe')
-
-            if iframe:
-                driver.switch_to.frame(iframe)  # Cambiar al contexto del iframe si es necesario
-                time.sleep(5)  # Esperar más tiempo dentro del iframe
-
-            # Tomar la captura
-            driver.save_screenshot(output_path)
-        
-        except Exception as e:
-            print(f"Error capturando la pantalla: {e}")
-        
-        finally:
-            driver.quit()  # Cerrar el navegador
+        Modo trabajo: si se envía 'urls' (lista) o 'async' verdadero, las capturas se encolan y se responde
+        de inmediato con 202 y un 'job_id' por URL, que se consulta en 'capture/jobs/<job_id>/'.
 
-    def post(self, request):
-        """
-        POST: Recibe una URL y captura una captura de pantalla de la página web, devolviéndola como respuesta.
+        Parámetros opcionales del cuerpo:
+        - wait: Estrategia de espera ('ready' o 'fixed').
+        - timeout: Segundos máximos de espera antes de capturar (como mucho SCREENSHOT_WAIT_TIMEOUT).
+        - width, height: Tamaño de la ventana del navegador (como mucho SCREENSHOT_MAX_VIEWPORT).
+        - refresh: Si es verdadero, ignora la caché y vuelve a capturar.
         """
         url = request.data.get('url')
-        if not url:
+        urls = request.data.get('urls')
+        job_mode = urls is not None or str(request.data.get('async', '')).lower() in ('1', 'true', 'yes')
+
+        if not url and not urls:
             return Response({'error': 'URL is required'}, status=400)
+        if urls is not None and (not isinstance(urls, list) or not all(isinstance(item, str) and item for item in urls)):
+            return Response({'error': "'urls' debe ser una lista de URLs."}, status=400)
 
-        app_dir = apps.get_app_config('aplications').path
-        output_path = os.path.join(app_dir, 'screenshots', 'capture.png')
+        try:
+            wait_strategy, timeout, viewport, refresh = _capture_options(request.data)
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=400)
 
-        # Crear la carpeta 'screenshots' si no existe
-        if not os.path.exists(os.path.dirname(output_path)):
-            os.makedirs(os.path.dirname(output_path))
+        # Encolar las capturas y responder sin esperar a que terminen
+        if job_mode:
+            jobs = screenshot_jobs.submit(urls or [url], viewport, wait_strategy, timeout, refresh)
+            return Response({'jobs': [job.as_dict() for job in jobs]}, status=status.HTTP_202_ACCEPTED)
 
-        # Capturar la pantalla
-        self.capture_screenshot(url, output_path)
+        # Capturar la pantalla (o servirla desde la caché)
+        image_path = get_or_capture(url, viewport, wait_strategy, timeout, refresh)
 
         # Devolver la captura como respuesta
-        if os.path.exists(output_path):
-            return FileResponse(open(output_path, 'rb'), content_type='image/png')
+        if image_path is not None:
+            return FileResponse(open(image_path, 'rb'), content_type='image/png')
         else:
-            return Response({'error': 'Screenshot failed'}, status=500)
\ No newline at end of file
+            return Response({'error': 'Screenshot failed'}, status=500)
+
+
+# Vista para consultar el estado de una captura encolada
+class ScreenshotJobView(APIView):
+    """
+    GET: Devuelve el estado de un trabajo de captura ('pending', 'running', 'done' o 'failed').
+    Cuando el trabajo termina correctamente incluye 'image_url' para descargar la imagen.
+    """
+
+    def get(self, request, job_id):
+        job = screenshot_jobs.get_job(job_id)
+        if job is None:
+            return Response({'error': 'El trabajo de captura no existe.'}, status=status.HTTP_404_NOT_FOUND)
+
+        data = job.as_dict()
+        if job.status == screenshot_jobs.DONE:
+            data['image_url'] = request.build_absolute_uri('image/')
+        return Response(data, status=status.HTTP_200_OK)
+
+
+# Vista para descargar la imagen de una captura encolada
+class ScreenshotJobImageView(APIView):
+    """
+    GET: Devuelve la imagen PNG de un trabajo terminado. Si aún no terminó responde 202 con su estado.
+    Si terminó pero la caché ya desalojó la imagen responde 410: hay que solicitar la captura de nuevo.
+    """
+
+    def get(self, request, job_id):
+        job = screenshot_jobs.get_job(job_id)
+        if job is None:
+            return Response({'error': 'El trabajo de captura no existe.'}, status=status.HTTP_404_NOT_FOUND)
+
+        if job.status == screenshot_jobs.FAILED:
+            return Response(job.as_dict(), status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if job.status != screenshot_jobs.DONE:
+            return Response(job.as_dict(), status=status.HTTP_202_ACCEPTED)
+        if not os.path.exists(job.image_path):
+            return Response({**job.as_dict(), 'error': 'La captura ya no está en la caché; solicite una nueva captura.'}, status=status.HTTP_410_GONE)
+
+        return FileResponse(open(job.image_path, 'rb'), content_type='image/png')
+
+
+# Vista para capturar todas las pantallas de una prueba de diseño en una sola solicitud
+class BatchCaptureScreenshotView(APIView):
+    """
+    Vista para capturar las pantallas ('url_frame') de todas las preguntas de una prueba de diseño y devolverlas
+    en un archivo ZIP, de modo que el reporte necesite una solicitud en lugar de una por pregunta.
+    """
+
+    def post(self, request, test_id):
+        """
+        POST: Captura las pantallas de la prueba de diseño en un único navegador, una pestaña por pantalla,
+        sirviendo desde la caché las que ya estén capturadas. Cada pantalla se captura con la misma URL que usa
+        el reporte PDF ('report_frame_url'), por lo que comparte la caché con las capturas individuales.
+
+        El ZIP contiene una imagen '<question_id>.png' por pregunta capturada y un 'manifest.json' con
+        'question_id', 'title', 'url_frame' y 'file' (null si la captura falló) de cada pregunta, en orden.
+
+        Acepta los mismos parámetros opcionales del cuerpo que 'capture/' (wait, timeout, width, height, refresh).
+        """
+        if not DesignTest.objects.filter(pk=test_id).exists():
+            return Response({"error": "La prueba de diseño no existe."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            wait_strategy, timeout, viewport, refresh = _capture_options(request.data)
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=400)
+
+        questions = list(DesignQuestion.objects.filter(test_id=test_id).order_by('question_id').values('question_id', 'title', 'url_frame'))
+        if not questions:
+            return Response({"error": "La prueba de diseño no tiene preguntas."}, status=status.HTTP_404_NOT_FOUND)
+
+        # La misma URL que captura el reporte para cada pregunta (ver 'report_frame_url')
+        capture_urls = {question['question_id']: report_frame_url(question['url_frame']) for question in questions}
+        image_paths = get_or_capture_batch(list(capture_urls.values()), viewport, wait_strategy, timeout, refresh)
+
+        # Las imágenes PNG ya están comprimidas, así que se guardan en el ZIP sin volver a comprimirlas
+        buffer = io.BytesIO()
+        manifest = []
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+            for question in questions:
+                image_path = image_paths.get(capture_urls[question['question_id']])
+                name = f"{question['question_id']}.png" if image_path is not None and os.path.exists(image_path) else None
+                if name is not None:
+                    archive.write(image_path, name)
+                manifest.append({**question, 'file': name})
+            archive.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2))
+
+        if all(item['file'] is None for item in manifest):
+            return Response({"error": "No se pudo capturar ninguna pantalla de la prueba de diseño."}, status=500)
+
+        response = HttpResponse(buffer.getvalue(), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="designtest_{test_id}_screenshots.zip"'
+        return response
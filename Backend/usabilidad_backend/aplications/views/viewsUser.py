@@ -5,6 +5,8 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from aplications.models import User
 from aplications.serializers import UserSerializer
+from aplications.pagination import list_response
+from aplications.fast_serializers import FastSerializer, render_json
 
 # Vista para obtener todos los usuarios o crear un nuevo usuario
 @api_view(['GET', 'POST'])
@@ -14,10 +16,8 @@ def API_User(request):
     POST: Crea un nuevo usuario en la base de datos.
     """
     if request.method == 'GET':
-        # Obtener todos los usuarios
-        Datos_Users = User.objects.all()
-        serializer_User = UserSerializer(Datos_Users, many=True)
-        return JsonResponse(serializer_User.data, safe=False)
+        # Obtener todos los usuarios (sin la contraseña), con ?fields= y paginación por cursor opcionales
+        return list_response(request, User.objects.all(), UserSerializer, fast=True)
 
     elif request.method == 'POST':
         # Crear un nuevo usuario
@@ -43,9 +43,8 @@ def API_User_Details(request, pk):
         return Response(status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
-        # Obtener datos del usuario
-        serializer_User = UserSerializer(Dato_User)
-        return JsonResponse(serializer_User.data, safe=False)
+        # Obtener datos del usuario (serialización rápida de solo lectura)
+        return render_json(FastSerializer(UserSerializer).serialize_instance(Dato_User))
 
     elif request.method == 'PUT':
         # Actualizar datos del usuario
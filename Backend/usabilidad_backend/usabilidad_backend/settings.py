@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -60,6 +61,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'aplications.metrics.RequestMetricsMiddleware',  # Métricas por solicitud (ver 'metrics/')
+    'aplications.query_detector.QueryDetectorMiddleware',  # Consultas N+1 y lentas (solo con QUERY_DETECTOR_ENABLED)
+    'aplications.db_router.ReplicaRoutingMiddleware',  # Vistas de solo lectura en la réplica (solo con réplica configurada)
   
     
 ]
@@ -91,11 +95,70 @@ WSGI_APPLICATION = 'usabilidad_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# La base de datos se elige con variables de entorno (por defecto, SQLite en BASE_DIR / 'db.sqlite3'):
+#   DB_ENGINE: 'sqlite' o 'postgresql'
+#   DB_NAME: ruta del archivo (SQLite) o nombre de la base de datos (PostgreSQL)
+#   DB_USER, DB_PASSWORD, DB_HOST, DB_PORT: datos de conexión de PostgreSQL
+#   DB_CONN_MAX_AGE: segundos que se reutiliza una conexión entre solicitudes (0 = una conexión por solicitud)
+#   DB_POOL: 'pgbouncer' si las conexiones a PostgreSQL pasan por PgBouncer en modo transacción
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'usabilidad'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),  # Conexiones persistentes por proceso
+            'CONN_HEALTH_CHECKS': True,  # Comprueba la conexión persistente antes de reutilizarla (Django 4.1+)
+        }
     }
+    if os.environ.get('DB_POOL') == 'pgbouncer':
+        # PgBouncer mantiene el grupo de conexiones al servidor y lo comparte entre todos los procesos: Django abre
+        # una conexión barata a PgBouncer por solicitud y no usa cursores del servidor (no funcionan en modo transacción)
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        }
+    }
+else:
+    raise ImproperlyConfigured("DB_ENGINE debe ser 'sqlite' o 'postgresql', no %r." % DB_ENGINE)
+
+# Réplica de solo lectura (opcional) para las vistas marcadas con 'aplications.db_router.read_only':
+#   DB_REPLICA_NAME: ruta del archivo SQLite de la réplica (se mantiene con 'manage.py sync_sqlite_replica')
+#                    o nombre de la base de datos PostgreSQL (por defecto, el de la primaria)
+#   DB_REPLICA_HOST, DB_REPLICA_PORT: servidor PostgreSQL de la réplica (por defecto, los de la primaria)
+# El resto de datos de conexión son los de la primaria.
+if os.environ.get('DB_REPLICA_NAME') or os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        NAME=os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        TEST={'MIRROR': 'default'},  # En las pruebas, la réplica es la misma base de datos que la primaria
+    )
+    if DB_ENGINE == 'postgresql':
+        DATABASES['replica']['HOST'] = os.environ.get('DB_REPLICA_HOST', DATABASES['default']['HOST'])
+        DATABASES['replica']['PORT'] = os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT'])
+
+DATABASE_ROUTERS = ['aplications.db_router.PrimaryReplicaRouter']
+DB_REPLICA_STICKY_SECONDS = 10  # Segundos que un cliente lee de la primaria después de escribir (retraso máximo de la réplica)
+DB_REPLICA_STICKY_CACHE = 'default'  # Caché donde se guardan esas marcas (debe ser compartida si hay varios procesos)
+
+# PRAGMA que se aplican a cada conexión SQLite nueva (ver 'aplications/sqlite_tuning.py'); no afectan a PostgreSQL
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # Las lecturas no bloquean las escrituras ni al revés (se guarda en el archivo: solo al servir solicitudes)
+    'synchronous': 'NORMAL',  # Seguro con WAL; evita un fsync por transacción
+    'busy_timeout': 5000,  # Milisegundos de espera por el bloqueo de escritura antes de "database is locked"
+    'mmap_size': 256 * 1024 * 1024,  # Bytes de la base de datos leídos con memoria mapeada
+    'cache_size': -64000,  # Caché de páginas por conexión (negativo = KiB)
+    'temp_store': 'MEMORY',  # Tablas e índices temporales en memoria
 }
 
 
@@ -149,3 +212,53 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # Configurar la ruta de almacenamiento de archivos multimedia (como imágenes)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Pool de navegadores sin interfaz gráfica para las capturas de pantalla
+SCREENSHOT_POOL_SIZE = 2  # Número máximo de navegadores abiertos a la vez
+SCREENSHOT_POOL_MAX_USES = 50  # Capturas por navegador antes de reciclarlo
+SCREENSHOT_POOL_TIMEOUT = 60  # Segundos de espera máxima por un navegador libre
+
+# Espera antes de capturar: 'ready' (documento, iframe, red inactiva y marco estable) o 'fixed' (tiempos fijos)
+SCREENSHOT_WAIT_STRATEGY = 'ready'
+SCREENSHOT_WAIT_TIMEOUT = 15  # Segundos máximos de espera antes de capturar
+SCREENSHOT_POLL_INTERVAL = 0.25  # Segundos entre comprobaciones
+SCREENSHOT_NETWORK_IDLE = 0.5  # Segundos sin nuevas descargas para considerar la red inactiva
+
+# Caché de capturas de pantalla (direccionada por el hash de la URL normalizada y el viewport)
+SCREENSHOT_VIEWPORT = (800, 600)  # Tamaño de ventana por defecto (ancho, alto) del navegador sin interfaz gráfica
+SCREENSHOT_MAX_VIEWPORT = (2560, 1600)  # Tamaño máximo (ancho, alto) que puede pedir una solicitud
+SCREENSHOT_CACHE_DIR = os.path.join(MEDIA_ROOT, 'screenshots')  # Carpeta donde se guardan las capturas
+SCREENSHOT_CACHE_TTL = 24 * 60 * 60  # Segundos que una captura se considera vigente
+SCREENSHOT_CACHE_MAX_ENTRIES = 1000  # Número máximo de capturas guardadas
+SCREENSHOT_CACHE_MAX_BYTES = 500 * 1024 * 1024  # Tamaño máximo total de la caché en bytes
+
+# Capturas encoladas (modo trabajo de 'capture/')
+SCREENSHOT_JOB_TTL = 60 * 60  # Segundos que se conserva el estado de una captura ya terminada
+
+# Capturas por lotes de una prueba de diseño ('capture/designtest/<test_id>/')
+SCREENSHOT_BATCH_TABS = 4  # Pestañas abiertas a la vez en el navegador del lote
+
+# Catálogo de heurísticas: comprobar su huella al iniciar y sincronizarlo si cambió
+HEURISTICS_SYNC_ON_STARTUP = True
+HEURISTIC_CATALOG_MAX_AGE = 24 * 60 * 60  # Segundos que los clientes pueden reutilizar el catálogo ('heuristics/') sin revalidarlo
+
+# Paginación por cursor de los listados (opcional, con ?page_size= o ?cursor=)
+PAGINATION_PAGE_SIZE = 50  # Tamaño de página por defecto
+PAGINATION_MAX_PAGE_SIZE = 500  # Tamaño de página máximo que puede pedir el cliente
+
+# Caché de los resultados renderizados por prueba (se invalida al finalizar un evaluador o editar la prueba o sus preguntas)
+RESULT_CACHE_BACKEND = 'aplications.result_cache.LocMemResultStore'  # O 'aplications.result_cache.FileResultStore', compartido entre procesos
+RESULT_CACHE_OPTIONS = {
+    'max_entries': 256,  # Número máximo de resultados guardados (desalojo LRU)
+    # 'location': os.path.join(BASE_DIR, 'result_cache'),  # Carpeta de FileResultStore
+}
+
+# Métricas por solicitud (RequestMetricsMiddleware)
+METRICS_WINDOW = 1024  # Número de muestras recientes por ruta con las que se calculan los cuantiles
+METRICS_SERVER_TIMING = True  # Añade la cabecera 'Server-Timing' con el tiempo de SQL, serialización y total
+
+# Detector de consultas N+1 y lentas por solicitud (QueryDetectorMiddleware), para desarrollo y pruebas
+QUERY_DETECTOR_ENABLED = DEBUG
+QUERY_DETECTOR_THRESHOLD = 5  # Se avisa cuando la misma consulta (con distintos valores) se ejecuta más veces que este número
+QUERY_DETECTOR_SLOW_MS = 100  # Milisegundos a partir de los cuales una consulta se informa como lenta
+QUERY_DETECTOR_RAISE = False  # Lanza NPlusOneDetected en lugar de solo registrar el aviso (para hacer fallar las pruebas)